@@ -0,0 +1,129 @@
+"""
+Micro-benchmark: summarization throughput by micro-batch size.
+
+The model is replaced by a local stub whose latency grows with the prompt:
+a fixed cost per call plus a smaller cost per abstract. Like a hosted model
+under a per-key quota, the stub serves a limited number of calls at once.
+The numbers show how much of the fixed per-call cost batching amortizes,
+not real model quality.
+
+Usage:
+    python -m benchmarks.bench_micro_batching --papers 200 --concurrency 20 --model-concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import time
+
+from src.config import logger
+from src.models.knowledge_level import KnowledgeLevel
+from src.models.paper import Paper
+from src.processing import summarizer as summarizer_module
+from src.processing.base import AbstractSummarizer
+from src.processing.batcher import SummaryBatcher
+from src.processing.summarizer import Summarizer, SummarizerRegistry
+
+BATCH_SIZES = (1, 2, 5, 10, 20)
+
+
+class StubModel(AbstractSummarizer):
+    def __init__(self, call_latency: float, item_latency: float, max_calls: int):
+        self.call_latency = call_latency
+        self.item_latency = item_latency
+        self.slots = asyncio.Semaphore(max_calls)
+        self.calls = 0
+
+    async def summarize(self, prompt: str) -> str:
+        self.calls += 1
+        indexes = re.findall(r"^\[(\d+)\]$", prompt, re.MULTILINE)
+        async with self.slots:
+            await asyncio.sleep(
+                self.call_latency + self.item_latency * max(len(indexes), 1)
+            )
+        if not indexes:
+            return "Stub summary."
+        return json.dumps(
+            {
+                "summaries": [
+                    {"index": int(i), "summary": "Stub summary."} for i in indexes
+                ]
+            }
+        )
+
+
+def make_papers(n: int):
+    return [
+        Paper(
+            title=f"Paper {i}",
+            abstract=f"Abstract of paper {i}.",
+            url=f"http://arxiv.org/abs/{i}",
+            authors=["Alice"],
+            published_date="2023-01-01",
+        )
+        for i in range(n)
+    ]
+
+
+async def run(papers, concurrency: int, batch_size: int, stub: StubModel) -> float:
+    batcher = SummaryBatcher(max_batch_size=batch_size, max_wait_seconds=0.01)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(paper: Paper):
+        async with semaphore:
+            if batch_size == 1:
+                return await summarizer_module.summarize_paper(
+                    paper, KnowledgeLevel.GENERAL
+                )
+            return await batcher.summarize(paper, KnowledgeLevel.GENERAL)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(paper) for paper in papers))
+    return time.perf_counter() - start
+
+
+async def main(
+    n: int, concurrency: int, model_concurrency: int, call_ms: float, item_ms: float
+) -> None:
+    logger.setLevel(logging.WARNING)
+    papers = make_papers(n)
+    print(f"papers: {n}, concurrency: {concurrency}")
+    print(
+        f"stub latency: {call_ms} ms/call + {item_ms} ms/abstract, "
+        f"{model_concurrency} calls at once"
+    )
+    print(f"{'batch size':>10} {'calls':>6} {'papers/s':>10} {'speedup':>8}")
+    baseline = None
+    for batch_size in BATCH_SIZES:
+        stub = StubModel(call_ms / 1000, item_ms / 1000, model_concurrency)
+        summarizer_module.summarizer_registry = SummarizerRegistry(
+            {Summarizer.GEMINI_SUMMARIZER: lambda: stub}
+        )
+        elapsed = await run(papers, concurrency, batch_size, stub)
+        throughput = n / elapsed
+        baseline = baseline or throughput
+        print(
+            f"{batch_size:>10} {stub.calls:>6} {throughput:>10.1f} "
+            f"{throughput / baseline:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--papers", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--model-concurrency", type=int, default=4)
+    parser.add_argument("--call-ms", type=float, default=300)
+    parser.add_argument("--item-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.papers,
+            args.concurrency,
+            args.model_concurrency,
+            args.call_ms,
+            args.item_ms,
+        )
+    )
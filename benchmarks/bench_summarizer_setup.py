@@ -0,0 +1,75 @@
+"""
+Micro-benchmark: per-request summarizer construction vs. a shared instance.
+
+The Gemini HTTP API is replaced by an httpx.MockTransport, so the numbers
+measure client setup and request plumbing only, not model latency.
+
+Usage:
+    python -m benchmarks.bench_summarizer_setup --requests 200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+from google.genai import types
+
+from src.processing.gemini_summarizer import GeminiSummarizer
+
+STUB_RESPONSE = {
+    "candidates": [
+        {
+            "content": {"role": "model", "parts": [{"text": "Stub summary."}]},
+            "finishReason": "STOP",
+        }
+    ]
+}
+
+
+def stub_http_options() -> types.HttpOptions:
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, json=STUB_RESPONSE)
+    )
+    return types.HttpOptions(async_client_args={"transport": transport})
+
+
+async def per_request(n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        summarizer = GeminiSummarizer(http_options=stub_http_options())
+        await summarizer.summarize("Summarize this.")
+    return time.perf_counter() - start
+
+
+async def shared(n: int) -> float:
+    start = time.perf_counter()
+    summarizer = GeminiSummarizer(http_options=stub_http_options())
+    for _ in range(n):
+        await summarizer.summarize("Summarize this.")
+    await summarizer.aclose()
+    return time.perf_counter() - start
+
+
+async def main(n: int) -> None:
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    for name in ("httpx", "google_genai"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    # Warm up imports and lazy module state before timing.
+    await shared(1)
+
+    before = await per_request(n)
+    after = await shared(n)
+    print(f"requests:            {n}")
+    print(f"per-request client:  {before * 1000 / n:8.3f} ms/request")
+    print(f"shared client:       {after * 1000 / n:8.3f} ms/request")
+    print(f"speedup:             {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,71 @@
+"""
+Local stand-ins for arXiv and Gemini with configurable latency and errors.
+
+Latencies are drawn from a log-normal distribution around the given median,
+so a few calls are much slower than the rest, like real upstreams. Every
+stand-in draws from its own seeded generator, which keeps runs repeatable.
+"""
+
+import asyncio
+import hashlib
+import random
+import time
+from dataclasses import dataclass
+from typing import List
+
+from src.models.paper import Paper
+from src.processing.base import AbstractSummarizer
+from src.retrieval.base import BlockingPaperSource
+
+
+class UpstreamError(RuntimeError):
+    pass
+
+
+@dataclass
+class LatencyProfile:
+    median_ms: float
+    # Spread of the log-normal distribution; 0 gives a constant latency.
+    sigma: float = 0.5
+    error_rate: float = 0.0
+
+    def draw(self, rng: random.Random) -> float:
+        """Return a latency in seconds, or raise to simulate a failure."""
+        if rng.random() < self.error_rate:
+            raise UpstreamError("Simulated upstream failure")
+        return self.median_ms / 1000 * rng.lognormvariate(0, self.sigma)
+
+
+class FakeArxivSource(BlockingPaperSource):
+    """Returns the same made-up papers for a topic on every call."""
+
+    def __init__(self, profile: LatencyProfile, seed: int = 0):
+        self.profile = profile
+        self.rng = random.Random(seed)
+
+    def fetch_papers(self, topic: str, max_results: int = 5) -> List[Paper]:
+        time.sleep(self.profile.draw(self.rng))
+        return [fake_paper(topic, i) for i in range(max_results)]
+
+
+class FakeSummarizer(AbstractSummarizer):
+    model = "fake-model"
+
+    def __init__(self, profile: LatencyProfile, seed: int = 0):
+        self.profile = profile
+        self.rng = random.Random(seed)
+
+    async def summarize(self, prompt: str) -> str:
+        await asyncio.sleep(self.profile.draw(self.rng))
+        return f"Summary of a {len(prompt)} character prompt."
+
+
+def fake_paper(topic: str, index: int) -> Paper:
+    digest = hashlib.sha1(f"{topic}:{index}".encode()).hexdigest()[:10]
+    return Paper(
+        title=f"{topic.title()} paper {index}",
+        abstract=f"We study {topic} from angle {index}. " * 20,
+        url=f"http://arxiv.org/abs/fake.{digest}",
+        authors=["Alice Example", "Bob Example"],
+        published_date="2024-01-01",
+    )
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.routes import limiter
+from src.config import settings
+from src.models.job import SummaryJob
+from src.services.job_service import JobService
+from src.services.paper_service import get_db
+
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}", response_model=SummaryJob)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
+async def get_job(
+    request: Request,
+    job_id: str,
+    wait: float = Query(
+        0,
+        description="Seconds to wait for the job to finish before returning",
+        ge=0,
+        le=settings.JOBS_MAX_WAIT_SECONDS,
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Return the status of a summary job, and its summary once it succeeded.
+    With `wait`, the request is held until the job finishes or the wait
+    elapses (long polling).
+    """
+    job = await JobService.get_job(db, job_id, wait=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
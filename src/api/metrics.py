@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from src.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose the Prometheus metrics of every worker process."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
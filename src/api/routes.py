@@ -1,17 +1,24 @@
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Tuple
+import json
+import math
 import re
 
 from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from src.models.paper import Paper, PaperSummary
-from src.retrieval.factory import fetch_papers
+from src.models.job import SummarizeMode, SummaryJob
+from src.models.paper import Paper, PaperSummary, RelatedPaper
+from src.retrieval.factory import fetch_paper_pages, fetch_papers
 
 from src.models.knowledge_level import KnowledgeLevel
+from src.processing.summarizer import Summarizer
+from src.resilience import Overloaded
 from src.config import settings, logger
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.services.job_service import JobService
 from src.services.paper_service import get_db, PaperService
 
 
@@ -57,7 +64,7 @@ def validate_source(source: str) -> str:
 @router.get("/papers", response_model=List[Paper])
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
-def get_papers(
+async def get_papers(
     request: Request,
     topic: str = Query(
         ...,
@@ -70,11 +77,11 @@ def get_papers(
     ),
     source: str = Query(
         "arxiv",
-        description="Source of research papers (e.g. 'arxiv')",
+        description="Source of research papers: 'arxiv', 'local' (stored papers) or 'hybrid'",
         min_length=1,
         max_length=50,
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve recent research papers from the specified source.
@@ -87,8 +94,8 @@ def get_papers(
         logger.info(
             f"Fetching papers for topic='{topic}', max_results={max_results}, source='{source}'"
         )
-        papers = fetch_papers(topic, max_results=max_results, source=source)
-        result = PaperService.get_papers_and_store(db, papers)
+        papers = await fetch_papers(topic, max_results=max_results, source=source)
+        result = await PaperService.get_papers_and_store(db, papers)
         logger.info(f"Fetched and stored {len(result)} papers.")
         return result
     except ValueError as e:
@@ -99,17 +106,88 @@ def get_papers(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/summarize", response_model=PaperSummary)
+async def format_ndjson(papers: AsyncIterator[Paper]):
+    """Encode papers as newline-delimited JSON, one paper per line."""
+    try:
+        async for paper in papers:
+            yield paper.model_dump_json() + "\n"
+    except Exception as e:
+        logger.exception(f"Error while streaming papers: {e}")
+        yield json.dumps({"error": str(e)}) + "\n"
+
+
+@router.get("/papers/stream")
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
-def summarize_paper(
+async def stream_papers(
+    request: Request,
+    topic: str = Query(
+        ...,
+        description="The research topic to search for.",
+        min_length=1,
+        max_length=200,
+    ),
+    max_results: int = Query(
+        100,
+        description="Maximum number of papers to retrieve",
+        ge=1,
+        le=settings.PAPERS_STREAM_MAX_RESULTS,
+    ),
+    source: str = Query(
+        "arxiv",
+        description="Source of research papers: 'arxiv', 'local' (stored papers) or 'hybrid'",
+        min_length=1,
+        max_length=50,
+    ),
+):
+    """
+    Stream recent research papers as newline-delimited JSON, one paper per
+    line, as the pages of results arrive from the source. Papers are stored
+    in the database page by page. An error after the first page ends the
+    stream with an `{"error": ...}` line.
+    """
+    topic = validate_topic(topic)
+    source = validate_source(source)
+
+    try:
+        pages = fetch_paper_pages(topic, max_results=max_results, source=source)
+    except ValueError as e:
+        logger.error(f"ValueError in stream_papers: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        f"Streaming papers for topic='{topic}', max_results={max_results}, source='{source}'"
+    )
+    return StreamingResponse(
+        format_ndjson(PaperService.stream_and_store_papers(pages)),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/summarize",
+    response_model=PaperSummary,
+    responses={202: {"model": SummaryJob, "description": "Summary job queued"}},
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
+async def summarize_paper(
     request: Request,
     paper: Paper,
     knowledge_level: KnowledgeLevel = Query(
         KnowledgeLevel.GENERAL,
         description="Knowledge level: general, undergraduate, or researcher/professional",
     ),
-    db: Session = Depends(get_db),
+    summarizer: Summarizer = Query(
+        Summarizer.GEMINI_SUMMARIZER,
+        description="Summarizer: gemini_summarizer, or extractive_summarizer for fast local extracts",
+    ),
+    mode: SummarizeMode = Query(
+        SummarizeMode.SYNC,
+        description="'sync' waits for the summary; 'async' queues a job (202) unless it is cached",
+    ),
+    db: AsyncSession = Depends(get_db),
 ) -> PaperSummary:
     """
     Summarize a research paper based on the user's knowledge level.
@@ -119,15 +197,158 @@ def summarize_paper(
         logger.info(
             f"Summarizing paper '{paper.title}' for knowledge_level='{knowledge_level}'"
         )
-        db_paper = PaperService.get_or_create_paper(db, paper)
-        summary = PaperService.get_or_create_summary(
-            db, db_paper, paper, knowledge_level
+        db_paper = await PaperService.get_or_create_paper(db, paper)
+        if mode == SummarizeMode.ASYNC:
+            job, summary = await JobService.submit_summary_job(
+                db, db_paper, knowledge_level, summarizer
+            )
+            if job is None:
+                return summary
+            return JSONResponse(
+                status_code=202,
+                content=job.model_dump(mode="json"),
+                headers={"Location": str(request.url_for("get_job", job_id=job.id))},
+            )
+        summary = await PaperService.get_or_create_summary(
+            db, db_paper, paper, knowledge_level, summarizer
         )
         logger.info(f"Summary created for paper '{paper.title}'")
         return summary
+    except Overloaded as e:
+        logger.warning(f"Summarizer overloaded in summarize_paper: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
     except ValueError as e:
         logger.error(f"ValueError in summarize_paper: {e}")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception(f"Unexpected error in summarize_paper: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/summarize/batch", response_model=List[PaperSummary])
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
+async def summarize_papers(
+    request: Request,
+    papers: List[Paper],
+    knowledge_level: KnowledgeLevel = Query(
+        KnowledgeLevel.GENERAL,
+        description="Knowledge level: general, undergraduate, or researcher/professional",
+    ),
+    summarizer: Summarizer = Query(
+        Summarizer.GEMINI_SUMMARIZER,
+        description="Summarizer: gemini_summarizer, or extractive_summarizer for fast local extracts",
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> List[PaperSummary]:
+    """
+    Summarize a batch of research papers based on the user's knowledge level.
+    Cached summaries are reused and the rest are generated concurrently.
+    """
+    if not papers:
+        logger.warning("Validation failed: Batch cannot be empty")
+        raise HTTPException(status_code=400, detail="Batch cannot be empty")
+    if len(papers) > settings.SUMMARIZE_BATCH_MAX_PAPERS:
+        logger.warning("Validation failed: Batch too large")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch must contain {settings.SUMMARIZE_BATCH_MAX_PAPERS} papers or less",
+        )
+
+    try:
+        logger.info(
+            f"Summarizing batch of {len(papers)} papers for knowledge_level='{knowledge_level}'"
+        )
+        summaries = await PaperService.get_or_create_summaries(
+            db, papers, knowledge_level, summarizer
+        )
+        logger.info(f"Batch summary created for {len(summaries)} papers")
+        return summaries
+    except Overloaded as e:
+        logger.warning(f"Summarizer overloaded in summarize_papers: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except ValueError as e:
+        logger.error(f"ValueError in summarize_papers: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Unexpected error in summarize_papers: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def format_sse(events: AsyncIterator[Tuple[str, Dict[str, Any]]]):
+    """Encode (event, data) pairs as Server-Sent Events."""
+    try:
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    except Exception as e:
+        logger.exception(f"Error while streaming summary: {e}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+
+@router.get("/papers/{paper_id}/related", response_model=List[RelatedPaper])
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
+async def get_related_papers(
+    request: Request,
+    paper_id: int,
+    k: int = Query(
+        10,
+        description="Number of related papers to return",
+        ge=1,
+        le=settings.SIMILARITY_MAX_RELATED,
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stored papers most similar to a stored paper, by the BM25 similarity of
+    their titles and abstracts.
+    """
+    db_paper = await PaperService.get_paper(db, paper_id)
+    if db_paper is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+
+    logger.info(f"Finding {k} papers related to paper_id={paper_id}")
+    return await PaperService.get_related_papers(db, db_paper, k)
+
+
+@router.get("/papers/{paper_id}/summary/stream")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
+async def stream_summary(
+    request: Request,
+    paper_id: int,
+    knowledge_level: KnowledgeLevel = Query(
+        KnowledgeLevel.GENERAL,
+        description="Knowledge level: general, undergraduate, or researcher/professional",
+    ),
+    summarizer: Summarizer = Query(
+        Summarizer.GEMINI_SUMMARIZER,
+        description="Summarizer: gemini_summarizer, or extractive_summarizer for fast local extracts",
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream the summary of a stored paper as Server-Sent Events: `token`
+    events as text is generated, then a final `summary` event with the full
+    text. Cached summaries are sent as the `summary` event alone.
+    """
+    db_paper = await PaperService.get_paper(db, paper_id)
+    if db_paper is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+
+    logger.info(
+        f"Streaming summary for paper_id={paper_id}, knowledge_level='{knowledge_level}'"
+    )
+    return StreamingResponse(
+        format_sse(PaperService.stream_summary(db_paper, knowledge_level, summarizer)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
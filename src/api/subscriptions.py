@@ -0,0 +1,96 @@
+import secrets
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.routes import limiter, validate_source, validate_topic
+from src.config import settings, logger
+from src.database.repositories import (
+    create_subscription,
+    delete_subscription,
+    get_subscriptions,
+)
+from src.models.subscription import Subscription, SubscriptionCreate
+from src.retrieval.factory import SOURCES
+from src.services.paper_service import get_db
+
+
+router = APIRouter()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Only let operators change subscriptions, since every subscription makes
+    the harvester spend upstream requests and summaries on its topic.
+    """
+    if settings.ADMIN_TOKEN is None:
+        raise HTTPException(
+            status_code=403, detail="Subscriptions are disabled without ADMIN_TOKEN"
+        )
+    if x_admin_token is None or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.post(
+    "/subscriptions",
+    response_model=Subscription,
+    status_code=201,
+    dependencies=[Depends(require_admin)],
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
+async def subscribe_topic(
+    request: Request,
+    subscription: SubscriptionCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Subscribe to a topic so that the background harvester keeps its papers
+    and summaries pre-fetched.
+    """
+    topic = validate_topic(subscription.topic)
+    source = validate_source(subscription.source)
+    if source not in SOURCES:
+        raise HTTPException(status_code=400, detail=f"Unknown source '{source}'")
+
+    try:
+        db_subscription = await create_subscription(
+            db,
+            {"topic": topic, "source": source, "max_results": subscription.max_results},
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409, detail=f"Topic '{topic}' is already subscribed"
+        )
+    logger.info(f"Subscribed to topic='{topic}', source='{source}'")
+    return db_subscription
+
+
+@router.get("/subscriptions", response_model=List[Subscription])
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
+async def list_subscriptions(request: Request, db: AsyncSession = Depends(get_db)):
+    """List the topics the harvester keeps pre-fetched."""
+    return await get_subscriptions(db)
+
+
+@router.delete(
+    "/subscriptions/{subscription_id}",
+    status_code=204,
+    dependencies=[Depends(require_admin)],
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS_PER_HOUR}/hour")
+async def unsubscribe_topic(
+    request: Request, subscription_id: int, db: AsyncSession = Depends(get_db)
+):
+    """Stop harvesting a topic. Already stored papers and summaries are kept."""
+    if not await delete_subscription(db, subscription_id):
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    logger.info(f"Removed subscription {subscription_id}")
+    return Response(status_code=204)
@@ -1,4 +1,6 @@
 import logging
+import tempfile
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +12,156 @@ class Settings(BaseSettings):
     RATE_LIMIT_REQUESTS_PER_MINUTE: int = 10
     RATE_LIMIT_REQUESTS_PER_HOUR: int = 100
 
+    # Batch summarization settings
+    SUMMARIZE_BATCH_MAX_PAPERS: int = 20
+    SUMMARIZE_BATCH_MAX_CONCURRENCY: int = 5
+
+    # Generate the summaries for every knowledge level in one model call
+    SUMMARY_MULTI_LEVEL_ENABLED: bool = False
+
+    # Micro-batching of concurrent summary generations into one model call
+    SUMMARY_MICRO_BATCH_ENABLED: bool = False
+    SUMMARY_MICRO_BATCH_MAX_SIZE: int = 10
+    SUMMARY_MICRO_BATCH_WINDOW_SECONDS: float = 0.05
+
+    # Request tracing ("none", "memory" or "jsonl" exporter)
+    TRACING_EXPORTER: str = "none"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SAMPLE_RATE: float = 0.01
+
+    # Upstream resilience settings. Every API request gets a latency budget
+    # that bounds the deadlines of the upstream calls it makes.
+    REQUEST_LATENCY_BUDGET_SECONDS: float = 30
+    SOURCE_TIMEOUT_SECONDS: float = 10
+    SOURCE_MAX_ATTEMPTS: int = 3
+    # Hedged requests would only queue behind the source rate governor.
+    SOURCE_HEDGE_ENABLED: bool = False
+    SUMMARIZER_TIMEOUT_SECONDS: float = 20
+    SUMMARIZER_MAX_ATTEMPTS: int = 2
+    # Hedged model calls are billed twice, so they are opt-in.
+    SUMMARIZER_HEDGE_ENABLED: bool = False
+    UPSTREAM_RETRY_BACKOFF_SECONDS: float = 0.5
+    UPSTREAM_RETRY_BACKOFF_MAX_SECONDS: float = 5
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RESET_SECONDS: float = 30
+    # Adaptive (AIMD) concurrency limit on remote summarizer calls. The limit
+    # grows while calls succeed within the latency target and is cut by the
+    # backoff factor on rate limit errors and timeouts.
+    SUMMARIZER_CONCURRENCY_INITIAL: int = 8
+    SUMMARIZER_CONCURRENCY_MIN: int = 1
+    SUMMARIZER_CONCURRENCY_MAX: int = 64
+    SUMMARIZER_CONCURRENCY_BACKOFF: float = 0.5
+    SUMMARIZER_LATENCY_TARGET_SECONDS: float = 10
+    SUMMARIZER_QUEUE_MAX: int = 100
+    SUMMARIZER_QUEUE_MAX_WAIT_SECONDS: float = 10
+    # What to return when the model fails to generate a summary, tried in
+    # order: "other_level" (a stored summary at another level), "extractive"
+    # (the local extractive summary) and "abstract" (the raw abstract). With
+    # none available the request fails, e.g. with a 503 when overloaded.
+    SUMMARY_FALLBACKS: List[str] = ["other_level"]
+
+    # Reuse the summary of another version of the paper, or of a paper with
+    # a near-identical abstract, when their abstracts' shingle Jaccard
+    # similarity reaches SUMMARY_REUSE_MIN_SIMILARITY
+    SUMMARY_REUSE_ENABLED: bool = True
+    SUMMARY_REUSE_MIN_SIMILARITY: float = 0.9
+    SUMMARY_REUSE_MAX_CANDIDATES: int = 20
+
+    # Version of the prompts in src.processing.prompts used for new summaries.
+    # Summaries of another prompt version or model are served marked stale,
+    # with a job queued to regenerate them, while SUMMARY_SERVE_STALE is set.
+    SUMMARY_PROMPT_VERSION: str = "v1"
+    SUMMARY_SERVE_STALE: bool = True
+    # How often, at most, serving a summary is recorded for the sweep.
+    SUMMARY_TOUCH_SECONDS: float = 3600
+
+    # Paper source rate governor. Worker processes on one host share each
+    # source's token bucket through a state file in SOURCE_RATE_STATE_DIR.
+    SOURCE_RATE_LIMIT_ENABLED: bool = True
+    SOURCE_REQUESTS_PER_SECOND: float = 1 / 3
+    SOURCE_RATE_BURST: float = 1
+    SOURCE_RATE_STATE_DIR: str = tempfile.gettempdir()
+
+    # arXiv client settings. Without the rate governor, the client waits
+    # ARXIV_DELAY_SECONDS between its own page requests. It retries empty or
+    # failed pages ARXIV_NUM_RETRIES times. Searches request pages of the
+    # smallest of ARXIV_PAGE_SIZE_BUCKETS that holds them, up to
+    # ARXIV_PAGE_SIZE.
+    ARXIV_PAGE_SIZE: int = 100
+    ARXIV_PAGE_SIZE_BUCKETS: List[int] = [10, 25, 50]
+    ARXIV_DELAY_SECONDS: float = 3.0
+    ARXIV_NUM_RETRIES: int = 3
+
+    # Largest result set of the NDJSON papers stream
+    PAPERS_STREAM_MAX_RESULTS: int = 500
+
+    # Gemini model, part of the cache key of its summaries
+    GEMINI_MODEL: str = "gemini-2.5-flash"
+
+    # Gemini HTTP connection pool settings
+    GEMINI_MAX_CONNECTIONS: int = 100
+    GEMINI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    GEMINI_KEEPALIVE_EXPIRY: float = 60.0
+
+    # Search result cache settings ("memory" or "postgres" backend)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_BACKEND: str = "memory"
+    SEARCH_CACHE_TTL_SECONDS: float = 900
+    SEARCH_CACHE_STALE_SECONDS: float = 3600
+    SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    # How stale the recorded last access of a Postgres entry may get before
+    # a read refreshes it
+    SEARCH_CACHE_TOUCH_SECONDS: float = 60
+
+    # Hybrid source: serve stored papers when the newest match was published
+    # within this many days, otherwise search arXiv
+    HYBRID_MAX_AGE_DAYS: float = 7
+
+    # Related papers index. Build it with `python -m src.similarity`; papers
+    # stored since the build are indexed in memory by each worker.
+    SIMILARITY_INDEX_DIR: str = "similarity-index"
+    SIMILARITY_HASH_BUCKETS: int = 2**20
+    SIMILARITY_QUERY_TERMS: int = 32
+    SIMILARITY_MAX_RELATED: int = 50
+    # Workers index at most this many papers stored since the last build;
+    # past it, rebuild with `python -m src.similarity`.
+    SIMILARITY_MAX_CATCH_UP: int = 20000
+    # How often workers pick up a new build and index new papers
+    SIMILARITY_REFRESH_SECONDS: float = 10
+    # Papers stored this long before a catch-up are looked at again, for
+    # those committed after papers with higher ids had been indexed.
+    SIMILARITY_CATCH_UP_OVERLAP_SECONDS: float = 300
+
+    # Background topic harvester settings
+    HARVEST_ENABLED: bool = False
+    HARVEST_INTERVAL_SECONDS: float = 3600
+    HARVEST_POLL_SECONDS: float = 60
+    HARVEST_MAX_RESULTS: int = 10
+    HARVEST_SUMMARY_CONCURRENCY: int = 4
+    HARVEST_MAX_SUMMARIES_PER_RUN: int = 100
+    # Token operators send in the X-Admin-Token header to add and remove
+    # subscriptions; without one, subscriptions cannot be changed.
+    ADMIN_TOKEN: Optional[str] = None
+
+    # Asynchronous summary job settings. Like the harvester and the sweep
+    # below, the worker pool runs in every API process when enabled; run it
+    # once instead with `python -m src.jobs --sweep`.
+    JOBS_WORKER_ENABLED: bool = False
+    JOBS_WORKER_CONCURRENCY: int = 4
+    JOBS_POLL_SECONDS: float = 1.0
+    JOBS_STALE_AFTER_SECONDS: float = 300
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_RETRY_BACKOFF_SECONDS: float = 10
+    JOBS_MAX_WAIT_SECONDS: float = 30
+
+    # Re-summarization sweep: queues jobs for the summaries of an older prompt
+    # version or model that were served within RESUMMARIZE_HOT_SECONDS, most
+    # recently served first, RESUMMARIZE_BATCH_SIZE at a time
+    RESUMMARIZE_ENABLED: bool = False
+    RESUMMARIZE_INTERVAL_SECONDS: float = 60
+    RESUMMARIZE_BATCH_SIZE: int = 20
+    RESUMMARIZE_HOT_SECONDS: float = 7 * 24 * 3600
+
 
 # Logging configuration
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
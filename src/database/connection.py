@@ -1,22 +1,52 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 import os
-from src.database import Base
+
+from src.metrics import instrument_pool
 
 POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
 POSTGRES_DB = os.getenv("POSTGRES_DB", "arxiv_db")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "db")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 
-DATABASE_URL = (
-    f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
+# DATABASE_URL takes precedence, e.g. to point benchmarks at a throwaway DB.
+DATABASE_URL = os.getenv("DATABASE_URL") or (
+    f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
     f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ALEMBIC_CONFIG = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "alembic.ini"
+)
+# Advisory lock key taken while migrating, so that several workers starting
+# at once apply migrations one after the other.
+MIGRATION_LOCK_ID = 0x6172786976
+
+engine = create_async_engine(
+    DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW
+)
+instrument_pool(engine.sync_engine.pool)
+# Rows are read after commit (e.g. to build responses), so keep them loaded
+# instead of triggering an implicit, unsupported async refresh.
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine, autoflush=False, expire_on_commit=False
+)
+
+
+def _upgrade_to_head(connection: Connection) -> None:
+    config = Config(ALEMBIC_CONFIG)
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
 
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+async def init_db():
+    """Bring the database schema up to date by applying pending migrations."""
+    async with engine.begin() as conn:
+        await conn.execute(select(func.pg_advisory_xact_lock(MIGRATION_LOCK_ID)))
+        await conn.run_sync(_upgrade_to_head)
@@ -0,0 +1,63 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created before migrations were introduced already have these
+tables (from Base.metadata.create_all), so they are only created when
+missing.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if "papers" not in tables:
+        op.create_table(
+            "papers",
+            sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("abstract", sa.String(), nullable=False),
+            sa.Column("url", sa.String(), nullable=False, unique=True),
+            sa.Column("authors", sa.String(), nullable=False),
+            sa.Column("published_date", sa.String(), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.TIMESTAMP(timezone=True),
+                server_default=sa.text("now()"),
+            ),
+        )
+
+    if "summaries" not in tables:
+        op.create_table(
+            "summaries",
+            sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+            sa.Column(
+                "paper_id", sa.Integer(), sa.ForeignKey("papers.id"), nullable=False
+            ),
+            sa.Column("knowledge_level", sa.String(), nullable=False),
+            sa.Column("summarizer", sa.String(), nullable=False),
+            sa.Column("summary", sa.String(), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.TIMESTAMP(timezone=True),
+                server_default=sa.text("now()"),
+            ),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("summaries")
+    op.drop_table("papers")
@@ -0,0 +1,64 @@
+"""Index the summary cache lookup and store published_date as DATE
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Concurrent cache misses could store the same summary more than once;
+    # keep the oldest row so the unique index can be built.
+    op.execute(
+        """
+        DELETE FROM summaries s
+        USING summaries older
+        WHERE s.paper_id = older.paper_id
+          AND s.knowledge_level = older.knowledge_level
+          AND s.summarizer = older.summarizer
+          AND s.id > older.id
+        """
+    )
+    op.create_index(
+        "ux_summaries_paper_level_summarizer",
+        "summaries",
+        ["paper_id", "knowledge_level", "summarizer"],
+        unique=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_papers_created_at", "papers", ["created_at"], if_not_exists=True
+    )
+    op.alter_column(
+        "papers",
+        "published_date",
+        type_=sa.Date(),
+        existing_type=sa.String(),
+        existing_nullable=False,
+        postgresql_using="published_date::date",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "papers",
+        "published_date",
+        type_=sa.String(),
+        existing_type=sa.Date(),
+        existing_nullable=False,
+        postgresql_using="to_char(published_date, 'YYYY-MM-DD')",
+    )
+    op.drop_index("ix_papers_created_at", table_name="papers")
+    op.drop_index("ux_summaries_paper_level_summarizer", table_name="summaries")
@@ -0,0 +1,35 @@
+"""Add the search_cache table shared by search result cache workers
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_cache",
+        sa.Column("key", sa.String(), primary_key=True, nullable=False),
+        sa.Column("papers", postgresql.JSONB(), nullable=False),
+        sa.Column("fetched_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("accessed_at", sa.TIMESTAMP(timezone=True), nullable=False),
+    )
+    op.create_index("ix_search_cache_accessed_at", "search_cache", ["accessed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_search_cache_accessed_at", table_name="search_cache")
+    op.drop_table("search_cache")
@@ -0,0 +1,42 @@
+"""Add topic_subscriptions for the background harvester
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "topic_subscriptions",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("topic", sa.String(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("max_results", sa.Integer(), nullable=False),
+        sa.Column(
+            "enabled", sa.Boolean(), nullable=False, server_default=sa.text("true")
+        ),
+        sa.Column("last_harvested_at", sa.TIMESTAMP(timezone=True)),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()")
+        ),
+        sa.UniqueConstraint(
+            "source", "topic", name="uq_topic_subscriptions_source_topic"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("topic_subscriptions")
@@ -0,0 +1,59 @@
+"""Add summary_jobs, the queue of asynchronous summarization jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "summary_jobs",
+        sa.Column("id", sa.String(), primary_key=True, nullable=False),
+        sa.Column("paper_id", sa.Integer(), sa.ForeignKey("papers.id"), nullable=False),
+        sa.Column("knowledge_level", sa.String(), nullable=False),
+        sa.Column("summarizer", sa.String(), nullable=False),
+        sa.Column(
+            "status", sa.String(), nullable=False, server_default=sa.text("'pending'")
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.String()),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()")
+        ),
+        sa.Column(
+            "available_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+        ),
+        sa.Column("started_at", sa.TIMESTAMP(timezone=True)),
+        sa.Column("finished_at", sa.TIMESTAMP(timezone=True)),
+    )
+    op.create_index(
+        "ux_summary_jobs_active",
+        "summary_jobs",
+        ["paper_id", "knowledge_level", "summarizer"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+    op.create_index(
+        "ix_summary_jobs_status_available_at",
+        "summary_jobs",
+        ["status", "available_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("summary_jobs")
@@ -0,0 +1,45 @@
+"""Add a full-text search vector over paper titles and abstracts
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "papers",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', title), 'A') || "
+                "setweight(to_tsvector('english', abstract), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "ix_papers_search_vector",
+        "papers",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_papers_search_vector", table_name="papers")
+    op.drop_column("papers", "search_vector")
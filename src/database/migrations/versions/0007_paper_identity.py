@@ -0,0 +1,52 @@
+"""Add the versionless arXiv id and abstract LSH bands to papers
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("papers", sa.Column("arxiv_id", sa.String()))
+    op.add_column(
+        "papers", sa.Column("abstract_bands", postgresql.ARRAY(sa.BigInteger()))
+    )
+    # Bands need the Python MinHash functions, so only new papers get them.
+    # Same pattern as src.retrieval.normalize.ARXIV_URL_ID.
+    op.execute(
+        r"""
+        UPDATE papers
+        SET arxiv_id = substring(
+            url from '(?i)arxiv\.org/(?:abs|pdf)/'
+            '([a-z\-]+(?:\.[a-z]{2})?/[0-9]{7}|[0-9]{4}\.[0-9]{4,5})'
+            '(?:v[0-9]+)?(?:\.pdf)?$'
+        )
+        """
+    )
+    op.create_index("ix_papers_arxiv_id", "papers", ["arxiv_id"])
+    op.create_index(
+        "ix_papers_abstract_bands",
+        "papers",
+        ["abstract_bands"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_papers_abstract_bands", table_name="papers")
+    op.drop_index("ix_papers_arxiv_id", table_name="papers")
+    op.drop_column("papers", "abstract_bands")
+    op.drop_column("papers", "arxiv_id")
@@ -0,0 +1,71 @@
+"""Key summaries by content, prompt version and model
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("summaries", sa.Column("content_key", sa.String()))
+    op.add_column("summaries", sa.Column("prompt_version", sa.String()))
+    op.add_column("summaries", sa.Column("model", sa.String()))
+    # Added without a default first, so existing summaries are not all
+    # considered just served.
+    op.add_column("summaries", sa.Column("last_served_at", sa.TIMESTAMP(timezone=True)))
+    op.alter_column("summaries", "last_served_at", server_default=sa.text("now()"))
+
+    # Existing summaries were generated with the first prompts and models.
+    # Their keys are computed like src.processing.summarizer.summary_key.
+    op.execute(
+        r"""
+        UPDATE summaries
+        SET prompt_version = CASE summarizer
+                WHEN 'extractive_summarizer' THEN '-' ELSE 'v1' END,
+            model = CASE summarizer
+                WHEN 'extractive_summarizer' THEN 'tfidf-extractive'
+                ELSE 'gemini-2.5-flash' END
+        """
+    )
+    op.execute(
+        r"""
+        UPDATE summaries
+        SET content_key = encode(
+            sha256(convert_to(concat_ws(
+                E'\x1f',
+                btrim(regexp_replace(papers.abstract, '\s+', ' ', 'g')),
+                summaries.prompt_version,
+                summaries.model,
+                summaries.knowledge_level
+            ), 'UTF8')),
+            'hex'
+        )
+        FROM papers
+        WHERE papers.id = summaries.paper_id
+        """
+    )
+    for column in ("content_key", "prompt_version", "model"):
+        op.alter_column("summaries", column, nullable=False)
+    op.create_index("ix_summaries_content_key", "summaries", ["content_key"])
+    op.create_index("ix_summaries_last_served_at", "summaries", ["last_served_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_summaries_last_served_at", table_name="summaries")
+    op.drop_index("ix_summaries_content_key", table_name="summaries")
+    op.drop_column("summaries", "last_served_at")
+    op.drop_column("summaries", "model")
+    op.drop_column("summaries", "prompt_version")
+    op.drop_column("summaries", "content_key")
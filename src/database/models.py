@@ -1,29 +1,141 @@
+import uuid
+
 from src.database import Base
-from sqlalchemy import Column, Integer, String, TIMESTAMP, text
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Computed,
+    Date,
+    Index,
+    Integer,
+    String,
+    TIMESTAMP,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy import ForeignKey
 
 
+# Text search configuration of the papers full-text index.
+SEARCH_CONFIG = "english"
+
+
 class Paper(Base):
     __tablename__ = "papers"
+    __table_args__ = (
+        Index("ix_papers_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_papers_abstract_bands", "abstract_bands", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     title = Column(String, nullable=False)
     abstract = Column(String, nullable=False)
     url = Column(String, nullable=False, unique=True)
+    # The arXiv id without version, shared by every version of a paper.
+    arxiv_id = Column(String, index=True)
     authors = Column(String, nullable=False)  # Comma-separated list
-    published_date = Column(String, nullable=False)
-    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+    published_date = Column(Date, nullable=False)
+    created_at = Column(
+        TIMESTAMP(timezone=True), server_default=text("now()"), index=True
+    )
+    # Title terms rank above abstract terms. Deferred: only searches need it.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', abstract), 'B')",
+                persisted=True,
+            ),
+        )
+    )
+    # MinHash LSH bands of the abstract, see src.similarity.minhash.
+    abstract_bands = deferred(Column(ARRAY(BigInteger)))
     summaries = relationship("Summary", back_populates="paper")
 
 
 class Summary(Base):
     __tablename__ = "summaries"
+    __table_args__ = (
+        Index(
+            "ux_summaries_paper_level_summarizer",
+            "paper_id",
+            "knowledge_level",
+            "summarizer",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     paper_id = Column(Integer, ForeignKey("papers.id"), nullable=False)
     knowledge_level = Column(String, nullable=False)
     summarizer = Column(String, nullable=False)
     summary = Column(String, nullable=False)
+    # Hash of the abstract, prompt version, model and level, see
+    # src.processing.summarizer.summary_key.
+    content_key = Column(String, nullable=False, index=True)
+    prompt_version = Column(String, nullable=False)
+    model = Column(String, nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+    # Updated at most every SUMMARY_TOUCH_SECONDS, to find the hot summaries.
+    last_served_at = Column(
+        TIMESTAMP(timezone=True), server_default=text("now()"), index=True
+    )
     paper = relationship("Paper", back_populates="summaries")
+
+
+class SearchCacheEntry(Base):
+    __tablename__ = "search_cache"
+
+    key = Column(String, primary_key=True, nullable=False)
+    papers = Column(JSONB, nullable=False)
+    fetched_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    accessed_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+
+
+class TopicSubscription(Base):
+    __tablename__ = "topic_subscriptions"
+    __table_args__ = (
+        UniqueConstraint("source", "topic", name="uq_topic_subscriptions_source_topic"),
+    )
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    topic = Column(String, nullable=False)
+    source = Column(String, nullable=False)
+    max_results = Column(Integer, nullable=False)
+    enabled = Column(Boolean, nullable=False, server_default=text("true"))
+    last_harvested_at = Column(TIMESTAMP(timezone=True))
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+
+
+class SummaryJob(Base):
+    __tablename__ = "summary_jobs"
+    __table_args__ = (
+        # At most one queued or running job per summary.
+        Index(
+            "ux_summary_jobs_active",
+            "paper_id",
+            "knowledge_level",
+            "summarizer",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+        Index("ix_summary_jobs_status_available_at", "status", "available_at"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    paper_id = Column(Integer, ForeignKey("papers.id"), nullable=False)
+    knowledge_level = Column(String, nullable=False)
+    summarizer = Column(String, nullable=False)
+    status = Column(String, nullable=False, server_default=text("'pending'"))
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    error = Column(String)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+    # Retried jobs are not picked up again before this time.
+    available_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+    started_at = Column(TIMESTAMP(timezone=True))
+    finished_at = Column(TIMESTAMP(timezone=True))
+    paper = relationship("Paper")
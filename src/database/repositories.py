@@ -1,34 +1,670 @@
-from sqlalchemy.orm import Session
-from src.database.models import Paper, Summary
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Union
 
+from datetime import datetime, timedelta, timezone
 
-def get_paper_by_url(db: Session, url: str):
-    return db.query(Paper).filter(Paper.url == url).first()
+from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from src.database.models import (
+    SEARCH_CONFIG,
+    Paper,
+    Summary,
+    SummaryJob,
+    TopicSubscription,
+)
+from src.metrics import PAPERS_STORED, observe_repository
+from src.retrieval.normalize import ARXIV_ABS_URL, arxiv_url, canonical_arxiv_id
 
 
-def create_paper(db: Session, paper_data: dict):
-    db_paper = Paper(**paper_data)
-    db.add(db_paper)
-    db.commit()
-    db.refresh(db_paper)
-    return db_paper
+@observe_repository
+async def get_paper_by_url(db: AsyncSession, url: str):
+    result = await db.execute(select(Paper).where(Paper.url == url))
+    return result.scalars().first()
 
 
-def get_summary(db: Session, paper_id: int, knowledge_level: str, summarizer: str):
-    return (
-        db.query(Summary)
-        .filter(
+@observe_repository
+async def get_paper_by_id(db: AsyncSession, paper_id: int):
+    return await db.get(Paper, paper_id)
+
+
+@observe_repository
+async def get_papers_by_ids(db: AsyncSession, paper_ids: List[int]) -> List[Paper]:
+    """The papers with the given ids, in the order of the ids."""
+    if not paper_ids:
+        return []
+    result = await db.execute(select(Paper).where(Paper.id.in_(paper_ids)))
+    by_id = {paper.id: paper for paper in result.scalars().all()}
+    return [by_id[paper_id] for paper_id in paper_ids if paper_id in by_id]
+
+
+@observe_repository
+async def get_paper_texts_after(db: AsyncSession, after_id: int, limit: int):
+    """(id, title, abstract) of the papers stored after after_id, by id."""
+    result = await db.execute(
+        select(Paper.id, Paper.title, Paper.abstract)
+        .where(Paper.id > after_id)
+        .order_by(Paper.id)
+        .limit(limit)
+    )
+    return result.all()
+
+
+@observe_repository
+async def count_papers_after(db: AsyncSession, after_id: int) -> int:
+    result = await db.execute(select(func.count()).where(Paper.id > after_id))
+    return result.scalar_one()
+
+
+@observe_repository
+async def get_paper_ids_created_since(
+    db: AsyncSession, since: datetime, max_id: int
+) -> List[int]:
+    """Ids up to max_id of the papers stored since the given time."""
+    result = await db.execute(
+        select(Paper.id).where(Paper.created_at >= since, Paper.id <= max_id)
+    )
+    return list(result.scalars().all())
+
+
+@observe_repository
+async def upsert_papers(db: AsyncSession, papers_data: List[dict]) -> List[Paper]:
+    """
+    Return the stored rows for the given papers, inserting the missing ones.
+
+    Existing rows are resolved with one query and the missing ones are
+    inserted with one statement in a single transaction. Rows inserted
+    concurrently by another writer are picked up by re-reading the URLs
+    that the insert skipped. Results follow the order of papers_data.
+
+    Snapshots without version history store arXiv papers under versionless
+    URLs, while the arXiv API names every version. So that a paper is not
+    stored twice, a versionless URL resolves to the newest stored version,
+    and the first version seen of a paper stored versionless takes over its
+    row, summaries included.
+    """
+    if not papers_data:
+        return []
+    urls = list(dict.fromkeys(data["url"] for data in papers_data))
+    arxiv_ids = {url: canonical_arxiv_id(url) for url in urls}
+    unversioned = {
+        url: arxiv_url(arxiv_id)
+        for url, arxiv_id in arxiv_ids.items()
+        if arxiv_id is not None
+    }
+
+    matches = [Paper.url.in_(urls + list(set(unversioned.values()) - set(urls)))]
+    versions_of = [arxiv_ids[url] for url in urls if unversioned.get(url) == url]
+    if versions_of:
+        matches.append(Paper.arxiv_id.in_(versions_of))
+    result = await db.execute(select(Paper).where(or_(*matches)))
+    stored = result.scalars().all()
+    by_url = {paper.url: paper for paper in stored}
+
+    claims = 0
+    for url in urls:
+        if url in by_url or url not in unversioned:
+            continue
+        if unversioned[url] == url:
+            versions = [p for p in stored if p.arxiv_id == arxiv_ids[url]]
+            if versions:
+                by_url[url] = max(versions, key=lambda paper: paper.id)
+        elif unversioned[url] in by_url and unversioned[url] not in urls:
+            placeholder = by_url.pop(unversioned[url])
+            claims += 1
+            claimed = await db.execute(
+                update(Paper)
+                .where(Paper.id == placeholder.id, Paper.url == placeholder.url)
+                .values(url=url)
+                .returning(Paper)
+            )
+            if (paper := claimed.scalars().first()) is not None:
+                by_url[url] = paper
+
+    missing = {}
+    for data in papers_data:
+        if data["url"] not in by_url:
+            missing.setdefault(data["url"], data)
+    inserted = 0
+    if missing:
+        result = await db.execute(
+            insert(Paper)
+            .values(list(missing.values()))
+            .on_conflict_do_nothing(index_elements=["url"])
+            .returning(Paper)
+        )
+        inserted_rows = result.scalars().all()
+        inserted = len(inserted_rows)
+        by_url.update({paper.url: paper for paper in inserted_rows})
+
+        raced = [url for url in missing if url not in by_url]
+        if raced:
+            result = await db.execute(select(Paper).where(Paper.url.in_(raced)))
+            by_url.update({paper.url: paper for paper in result.scalars().all()})
+    if missing or claims:
+        await db.commit()
+
+    PAPERS_STORED.labels(outcome="inserted").inc(inserted)
+    PAPERS_STORED.labels(outcome="existing").inc(len(urls) - inserted)
+    return [by_url[url] for url in urls]
+
+
+PAPER_COPY_COLUMNS = (
+    "title",
+    "abstract",
+    "url",
+    "authors",
+    "published_date",
+    "arxiv_id",
+    "abstract_bands",
+)
+
+
+@observe_repository
+async def copy_papers(conn: AsyncConnection, rows: List[tuple]) -> int:
+    """
+    Bulk load paper rows, given as tuples in PAPER_COPY_COLUMNS order, and
+    return how many of them were new.
+
+    The rows are streamed with COPY into a temporary staging table, then
+    merged into papers with one INSERT that skips the URLs already stored,
+    and the versionless URLs of papers stored or staged with a version.
+    Runs in the caller's transaction; the staging table empties on commit.
+    """
+    await conn.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS papers_staging "
+            "(title text, abstract text, url text, authors text, published_date date, "
+            "arxiv_id text, abstract_bands bigint[]) "
+            "ON COMMIT DELETE ROWS"
+        )
+    )
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "papers_staging", records=rows, columns=PAPER_COPY_COLUMNS
+    )
+    columns = ", ".join(PAPER_COPY_COLUMNS)
+    result = await conn.execute(
+        text(
+            "WITH inserted AS ("
+            f" INSERT INTO papers ({columns})"
+            f" SELECT DISTINCT ON (url) {columns}"
+            " FROM papers_staging staged"
+            # Skip versionless rows of papers stored or staged by version.
+            " WHERE staged.arxiv_id IS NULL"
+            " OR staged.url <> :abs_url || staged.arxiv_id"
+            " OR NOT EXISTS (SELECT 1 FROM papers"
+            " WHERE papers.arxiv_id = staged.arxiv_id)"
+            " AND NOT EXISTS (SELECT 1 FROM papers_staging version"
+            " WHERE version.arxiv_id = staged.arxiv_id"
+            " AND version.url <> staged.url)"
+            " ORDER BY url"
+            " ON CONFLICT (url) DO NOTHING RETURNING 1"
+            ") SELECT count(*) FROM inserted"
+        ),
+        {"abs_url": ARXIV_ABS_URL},
+    )
+    inserted = result.scalar_one()
+    PAPERS_STORED.labels(outcome="inserted").inc(inserted)
+    PAPERS_STORED.labels(outcome="existing").inc(len(rows) - inserted)
+    return inserted
+
+
+@observe_repository
+async def search_papers(db: AsyncSession, query: str, limit: int) -> List[Paper]:
+    """
+    Full-text search over stored titles and abstracts, best matches first
+    and newer papers first among equally ranked ones.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    result = await db.execute(
+        select(Paper)
+        .where(Paper.search_vector.op("@@")(tsquery))
+        .order_by(
+            func.ts_rank_cd(Paper.search_vector, tsquery).desc(),
+            Paper.published_date.desc(),
+        )
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+@observe_repository
+async def get_summary_candidates(
+    db: AsyncSession,
+    paper_id: int,
+    arxiv_id: Optional[str],
+    abstract_bands: List[int],
+    knowledge_level: str,
+    summarizer: str,
+    prompt_version: str,
+    model: str,
+    limit: int,
+):
+    """
+    (paper abstract, summary) of the other papers with a current summary for
+    the level and summarizer that are versions of the same arXiv paper or
+    share an LSH band of their abstract, newest first.
+    """
+    matches = []
+    if arxiv_id is not None:
+        matches.append(Paper.arxiv_id == arxiv_id)
+    if abstract_bands:
+        matches.append(Paper.abstract_bands.overlap(abstract_bands))
+    if not matches:
+        return []
+    result = await db.execute(
+        select(Paper.abstract, Summary.summary)
+        .join(Summary, Summary.paper_id == Paper.id)
+        .where(
+            Paper.id != paper_id,
+            or_(*matches),
+            Summary.knowledge_level == knowledge_level,
+            Summary.summarizer == summarizer,
+            Summary.prompt_version == prompt_version,
+            Summary.model == model,
+        )
+        .order_by(Paper.id.desc())
+        .limit(limit)
+    )
+    return result.all()
+
+
+@observe_repository
+async def get_summary(
+    db: AsyncSession, paper_id: int, knowledge_level: str, summarizer: str
+):
+    result = await db.execute(
+        select(Summary).where(
             Summary.paper_id == paper_id,
             Summary.knowledge_level == knowledge_level,
             Summary.summarizer == summarizer,
         )
-        .first()
     )
+    return result.scalars().first()
+
+
+@observe_repository
+async def get_summary_by_key(db: AsyncSession, content_key: str, paper_id: int):
+    """
+    A summary stored under the content key, the paper's own if it has one,
+    otherwise that of another paper with the same abstract.
+    """
+    result = await db.execute(
+        select(Summary)
+        .where(Summary.content_key == content_key)
+        .order_by(Summary.paper_id != paper_id)
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+@observe_repository
+async def get_summaries_by_keys(db: AsyncSession, content_keys: List[str]):
+    if not content_keys:
+        return []
+    result = await db.execute(
+        select(Summary).where(Summary.content_key.in_(content_keys))
+    )
+    return result.scalars().all()
 
 
-def create_summary(db: Session, summary_data: dict):
-    db_summary = Summary(**summary_data)
-    db.add(db_summary)
-    db.commit()
-    db.refresh(db_summary)
+@observe_repository
+async def get_summaries_for_papers(
+    db: AsyncSession, paper_ids: List[int], knowledge_level: str, summarizer: str
+):
+    if not paper_ids:
+        return []
+    result = await db.execute(
+        select(Summary).where(
+            Summary.paper_id.in_(paper_ids),
+            Summary.knowledge_level == knowledge_level,
+            Summary.summarizer == summarizer,
+        )
+    )
+    return result.scalars().all()
+
+
+def upsert_summaries(summaries_data: Union[dict, List[dict]]):
+    """
+    Insert summaries, replacing the stored summary of the same paper, level
+    and summarizer only when it has another content key, i.e. was generated
+    with other prompts or another model. Concurrent inserts of the same
+    summary keep the first one.
+    """
+    stmt = insert(Summary).values(summaries_data)
+    return stmt.on_conflict_do_update(
+        index_elements=["paper_id", "knowledge_level", "summarizer"],
+        set_={
+            "summary": stmt.excluded.summary,
+            "content_key": stmt.excluded.content_key,
+            "prompt_version": stmt.excluded.prompt_version,
+            "model": stmt.excluded.model,
+            "created_at": func.now(),
+        },
+        where=Summary.content_key.is_distinct_from(stmt.excluded.content_key),
+    )
+
+
+@observe_repository
+async def create_summary(db: AsyncSession, summary_data: dict):
+    """
+    Store a summary, or return the one already stored with the same paper,
+    level, summarizer and content key.
+    """
+    result = await db.execute(upsert_summaries(summary_data).returning(Summary))
+    db_summary = result.scalars().first()
+    await db.commit()
+    if db_summary is None:
+        db_summary = await get_summary(
+            db,
+            summary_data["paper_id"],
+            summary_data["knowledge_level"],
+            summary_data["summarizer"],
+        )
     return db_summary
+
+
+@observe_repository
+async def create_summaries(db: AsyncSession, summaries_data: List[dict]):
+    """Store several summaries at once, keeping any that are current."""
+    if not summaries_data:
+        return
+    await db.execute(upsert_summaries(summaries_data))
+    await db.commit()
+
+
+@asynccontextmanager
+async def summary_connection(db: AsyncSession) -> AsyncIterator[AsyncConnection]:
+    """
+    Open a short transaction on a connection of its own, so that concurrent
+    generations sharing `db` do not use its connection at once.
+
+    Generations read and store summaries in separate blocks and hold no
+    connection while the model is called, so the pool does not bound how
+    many summaries are generated at once. Identical generations racing
+    across processes are settled by the upsert, which keeps the first.
+    """
+    async with db.bind.connect() as conn:
+        async with conn.begin():
+            yield conn
+
+
+@observe_repository
+async def get_summary_text(conn: AsyncConnection, content_key: str) -> Optional[str]:
+    result = await conn.execute(
+        select(Summary.summary).where(Summary.content_key == content_key).limit(1)
+    )
+    return result.scalar()
+
+
+@observe_repository
+async def insert_summary(conn: AsyncConnection, summary_data: dict) -> str:
+    """
+    Store a summary and return the stored text, which is the one stored first
+    when the same summary was stored concurrently.
+    """
+    result = await conn.execute(
+        upsert_summaries(summary_data).returning(Summary.summary)
+    )
+    stored = result.scalar()
+    if stored is None:
+        stored = await get_summary_text(conn, summary_data["content_key"])
+    return stored
+
+
+@observe_repository
+async def get_summary_texts(
+    conn: Union[AsyncConnection, AsyncSession], paper_id: int, summarizer: str
+) -> Dict[str, str]:
+    """Return the stored summaries of a paper keyed by knowledge level."""
+    result = await conn.execute(
+        select(Summary.knowledge_level, Summary.summary).where(
+            Summary.paper_id == paper_id,
+            Summary.summarizer == summarizer,
+        )
+    )
+    return {knowledge_level: summary for knowledge_level, summary in result.all()}
+
+
+@observe_repository
+async def get_summary_texts_by_keys(
+    conn: AsyncConnection, content_keys: List[str]
+) -> Dict[str, str]:
+    """Return the stored summaries with the content keys, keyed by content key."""
+    result = await conn.execute(
+        select(Summary.content_key, Summary.summary).where(
+            Summary.content_key.in_(content_keys)
+        )
+    )
+    return {content_key: summary for content_key, summary in result.all()}
+
+
+@observe_repository
+async def insert_summaries(conn: AsyncConnection, summaries_data: List[dict]):
+    if not summaries_data:
+        return
+    await conn.execute(upsert_summaries(summaries_data))
+
+
+@observe_repository
+async def touch_summaries(db: AsyncSession, summary_ids: List[int]):
+    """Record that the summaries were served."""
+    if not summary_ids:
+        return
+    await db.execute(
+        update(Summary)
+        .where(Summary.id.in_(summary_ids))
+        .values(last_served_at=func.now())
+    )
+    await db.commit()
+
+
+@observe_repository
+async def get_summaries_to_refresh(
+    db: AsyncSession,
+    summarizer: str,
+    prompt_version: str,
+    model: str,
+    served_since: datetime,
+    limit: int,
+):
+    """
+    The summaries of the summarizer generated with other prompts or another
+    model that were served since the given time, most recently served first,
+    leaving out those with a job queued or running.
+    """
+    queued = (
+        select(SummaryJob.id)
+        .where(
+            SummaryJob.paper_id == Summary.paper_id,
+            SummaryJob.knowledge_level == Summary.knowledge_level,
+            SummaryJob.summarizer == Summary.summarizer,
+            SummaryJob.status.in_(ACTIVE_JOB_STATUSES),
+        )
+        .exists()
+    )
+    result = await db.execute(
+        select(Summary)
+        .where(
+            Summary.summarizer == summarizer,
+            or_(Summary.prompt_version != prompt_version, Summary.model != model),
+            Summary.last_served_at >= served_since,
+            ~queued,
+        )
+        .order_by(Summary.last_served_at.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+@observe_repository
+async def create_subscription(db: AsyncSession, subscription_data: dict):
+    db_subscription = TopicSubscription(**subscription_data)
+    db.add(db_subscription)
+    await db.commit()
+    await db.refresh(db_subscription)
+    return db_subscription
+
+
+@observe_repository
+async def get_subscriptions(db: AsyncSession):
+    result = await db.execute(select(TopicSubscription).order_by(TopicSubscription.id))
+    return result.scalars().all()
+
+
+@observe_repository
+async def delete_subscription(db: AsyncSession, subscription_id: int) -> bool:
+    result = await db.execute(
+        delete(TopicSubscription).where(TopicSubscription.id == subscription_id)
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+@observe_repository
+async def claim_due_subscription(db: AsyncSession, interval_seconds: float):
+    """
+    Claim one enabled subscription that has not been harvested within the
+    interval by stamping its last_harvested_at.
+
+    Rows being claimed by other workers are skipped, so several harvesters
+    can run at once without harvesting the same topic twice.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=interval_seconds)
+    due = (
+        select(TopicSubscription.id)
+        .where(
+            TopicSubscription.enabled.is_(True),
+            or_(
+                TopicSubscription.last_harvested_at.is_(None),
+                TopicSubscription.last_harvested_at < cutoff,
+            ),
+        )
+        .order_by(TopicSubscription.last_harvested_at.asc().nulls_first())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(TopicSubscription)
+        .where(TopicSubscription.id == due)
+        .values(last_harvested_at=func.now())
+        .returning(TopicSubscription)
+    )
+    db_subscription = result.scalars().first()
+    await db.commit()
+    return db_subscription
+
+
+ACTIVE_JOB_STATUSES = ("pending", "running")
+
+
+@observe_repository
+async def create_summary_job(db: AsyncSession, job_data: dict):
+    """
+    Queue a summary job, or return the job already queued or running for the
+    same paper, level and summarizer.
+    """
+    while True:
+        result = await db.execute(
+            insert(SummaryJob)
+            .values(**job_data)
+            .on_conflict_do_nothing(
+                index_elements=["paper_id", "knowledge_level", "summarizer"],
+                index_where=text("status IN ('pending', 'running')"),
+            )
+            .returning(SummaryJob)
+        )
+        db_job = result.scalars().first()
+        if db_job is None:
+            result = await db.execute(
+                select(SummaryJob).where(
+                    SummaryJob.paper_id == job_data["paper_id"],
+                    SummaryJob.knowledge_level == job_data["knowledge_level"],
+                    SummaryJob.summarizer == job_data["summarizer"],
+                    SummaryJob.status.in_(ACTIVE_JOB_STATUSES),
+                )
+            )
+            db_job = result.scalars().first()
+        await db.commit()
+        # None means the conflicting job finished in between; queue again.
+        if db_job is not None:
+            return db_job
+
+
+@observe_repository
+async def get_summary_job(db: AsyncSession, job_id: str):
+    result = await db.execute(
+        select(SummaryJob)
+        .where(SummaryJob.id == job_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+@observe_repository
+async def claim_summary_job(db: AsyncSession, stale_after_seconds: float):
+    """
+    Claim the oldest pending job, or a running job whose worker has not
+    finished it within stale_after_seconds (e.g. because it crashed), and
+    mark it running. Jobs locked by other workers are skipped.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)
+    claimable = (
+        select(SummaryJob.id)
+        .where(
+            or_(
+                and_(
+                    SummaryJob.status == "pending",
+                    SummaryJob.available_at <= func.now(),
+                ),
+                and_(SummaryJob.status == "running", SummaryJob.started_at < cutoff),
+            )
+        )
+        .order_by(SummaryJob.available_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(SummaryJob)
+        .where(SummaryJob.id == claimable)
+        .values(
+            status="running",
+            started_at=func.now(),
+            attempts=SummaryJob.attempts + 1,
+        )
+        .returning(SummaryJob)
+    )
+    db_job = result.scalars().first()
+    await db.commit()
+    return db_job
+
+
+@observe_repository
+async def finish_summary_job(
+    db: AsyncSession, job_id: str, status: str, error: Optional[str] = None
+):
+    await db.execute(
+        update(SummaryJob)
+        .where(SummaryJob.id == job_id)
+        .values(status=status, error=error, finished_at=func.now())
+    )
+    await db.commit()
+
+
+@observe_repository
+async def retry_summary_job(
+    db: AsyncSession, job_id: str, delay_seconds: float, error: str
+):
+    await db.execute(
+        update(SummaryJob)
+        .where(SummaryJob.id == job_id)
+        .values(
+            status="pending",
+            error=error,
+            available_at=func.now() + timedelta(seconds=delay_seconds),
+        )
+    )
+    await db.commit()
@@ -0,0 +1,28 @@
+"""
+Run the topic harvester as a standalone process.
+
+    python -m src.harvest          # poll forever
+    python -m src.harvest --once   # harvest due topics once and exit
+"""
+
+import argparse
+import asyncio
+
+from src.harvest.harvester import harvester
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Harvest subscribed topics.")
+    parser.add_argument(
+        "--once", action="store_true", help="Harvest due topics once and exit."
+    )
+    args = parser.parse_args()
+
+    if args.once:
+        asyncio.run(harvester.run_once())
+    else:
+        asyncio.run(harvester.run_forever())
+
+
+if __name__ == "__main__":
+    main()
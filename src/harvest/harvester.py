@@ -0,0 +1,160 @@
+import asyncio
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings, logger
+from src.database.connection import AsyncSessionLocal
+from src.database.repositories import claim_due_subscription, get_summaries_for_papers
+from src.models.knowledge_level import KnowledgeLevel
+from src.models.paper import Paper
+from src.processing.summarizer import Summarizer, summary_key
+from src.retrieval.factory import SOURCES, fetch_from_source, search_cache
+from src.retrieval.governor import background_priority
+from src.services.paper_service import PaperService
+
+
+@dataclass
+class HarvestReport:
+    topics: int = 0
+    papers: int = 0
+    summaries_generated: int = 0
+    summaries_failed: int = 0
+    budget_exhausted: bool = False
+
+
+class Harvester:
+    """
+    Periodically fetches the papers of every subscribed topic and
+    pre-generates their summaries at every knowledge level, so that
+    interactive requests for those topics are served from the database.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        interval_seconds: float = settings.HARVEST_INTERVAL_SECONDS,
+        concurrency: int = settings.HARVEST_SUMMARY_CONCURRENCY,
+        max_summaries_per_run: int = settings.HARVEST_MAX_SUMMARIES_PER_RUN,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.concurrency = concurrency
+        self.max_summaries_per_run = max_summaries_per_run
+
+    async def run_once(self) -> HarvestReport:
+        """Harvest every subscription that is due, within the summary budget."""
+        report = HarvestReport()
+        async with self.session_factory() as db:
+            while True:
+                subscription = await claim_due_subscription(db, self.interval_seconds)
+                if subscription is None:
+                    break
+                try:
+                    await self._harvest(db, subscription, report)
+                except Exception as e:
+                    await db.rollback()
+                    logger.exception(
+                        f"Harvest of topic '{subscription.topic}' failed: {e}"
+                    )
+        logger.info(
+            f"Harvest run finished: {report.topics} topics, {report.papers} papers, "
+            f"{report.summaries_generated} summaries generated, "
+            f"{report.summaries_failed} failed."
+        )
+        return report
+
+    async def run_forever(self, poll_seconds: float = settings.HARVEST_POLL_SECONDS):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.exception(f"Harvest run failed: {e}")
+            await asyncio.sleep(poll_seconds)
+
+    async def _harvest(self, db: AsyncSession, subscription, report: HarvestReport):
+        if subscription.source not in SOURCES:
+            logger.error(
+                f"Skipping subscription {subscription.id}: "
+                f"unknown source '{subscription.source}'"
+            )
+            return
+
+        logger.info(f"Harvesting topic '{subscription.topic}'")
+        with background_priority():
+            papers = await fetch_from_source(
+                subscription.source, subscription.topic, subscription.max_results
+            )
+        db_papers = await PaperService.store_papers(db, papers)
+        await search_cache.prime(
+            subscription.source, subscription.topic, subscription.max_results, papers
+        )
+        report.topics += 1
+        report.papers += len(db_papers)
+
+        pending = await self._missing_summaries(db, db_papers)
+        # Failed generations are billed too, so they count against the budget.
+        remaining = self.max_summaries_per_run - (
+            report.summaries_generated + report.summaries_failed
+        )
+        if len(pending) > remaining:
+            report.budget_exhausted = True
+            pending = pending[: max(remaining, 0)]
+        if not pending:
+            return
+
+        # The generations share the session and each holds a connection of
+        # its own, so the session's transaction is ended once beforehand.
+        await db.commit()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def generate(db_paper, level: KnowledgeLevel):
+            async with semaphore:
+                return await PaperService.generate_summary_once(
+                    db, db_paper, Paper.model_validate(db_paper), level
+                )
+
+        results = await asyncio.gather(
+            *(generate(db_paper, level) for db_paper, level in pending),
+            return_exceptions=True,
+        )
+        for (db_paper, level), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                report.summaries_failed += 1
+                logger.error(
+                    f"Pre-summarizing paper_id={db_paper.id} at level={level.value} "
+                    f"failed: {result}"
+                )
+            else:
+                report.summaries_generated += 1
+
+    @staticmethod
+    async def _missing_summaries(
+        db: AsyncSession, db_papers
+    ) -> List[Tuple[object, KnowledgeLevel]]:
+        paper_ids = [db_paper.id for db_paper in db_papers]
+        pending = []
+        for level in KnowledgeLevel:
+            # Summaries of older prompts or another model are regenerated too.
+            summarized = {
+                (summary.paper_id, summary.content_key)
+                for summary in await get_summaries_for_papers(
+                    db, paper_ids, level.value, Summarizer.GEMINI_SUMMARIZER.value
+                )
+            }
+            pending.extend(
+                (db_paper, level)
+                for db_paper in db_papers
+                if (
+                    db_paper.id,
+                    summary_key(
+                        db_paper.abstract, level.value, Summarizer.GEMINI_SUMMARIZER
+                    ),
+                )
+                not in summarized
+            )
+        return pending
+
+
+harvester = Harvester()
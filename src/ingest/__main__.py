@@ -0,0 +1,44 @@
+"""
+Bulk load local arXiv metadata snapshots into the papers table.
+
+    python -m src.ingest arxiv-metadata-oai-snapshot.json
+    python -m src.ingest harvest/*.xml.gz --batch-size 20000
+
+Progress is saved to the checkpoint file after every batch, so running the
+same command again after an interruption resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+
+from src.database.connection import engine, init_db
+from src.ingest.loader import Checkpoint, SnapshotIngester
+
+
+async def run(args: argparse.Namespace) -> None:
+    await init_db()
+    ingester = SnapshotIngester(engine, Checkpoint(args.checkpoint), args.batch_size)
+    try:
+        await ingester.ingest(args.snapshots)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load arXiv metadata snapshots (JSON lines or OAI-PMH XML)."
+    )
+    parser.add_argument("snapshots", nargs="+", help="Snapshot files, optionally .gz")
+    parser.add_argument(
+        "--batch-size", type=int, default=10000, help="Papers per COPY batch."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default="ingest-checkpoint.json",
+        help="File recording how far each snapshot has been loaded.",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Streaming readers for local arXiv metadata snapshots.
+
+Two formats are supported:
+
+- the JSON-lines metadata dump, one paper per line, as published on Kaggle;
+- OAI-PMH ListRecords responses in the `arXiv` or `arXivRaw` metadata
+  formats, as saved by an OAI harvester.
+
+Both may be gzip-compressed. Files are read record by record, so memory use
+does not depend on the size of the snapshot.
+
+Every record is yielded with a position to resume from: the byte offset of
+the next line for JSON lines, and the number of records read for XML.
+Records that cannot be turned into a paper are yielded as None, so their
+position still counts as read.
+"""
+
+import gzip
+import json
+import xml.etree.ElementTree as ElementTree
+from typing import IO, Iterator, Optional, Tuple
+
+from src.config import logger
+from src.models.paper import Paper
+from src.retrieval.normalize import (
+    arxiv_url,
+    author_name,
+    collapse_whitespace,
+    parse_arxiv_date,
+    split_authors,
+)
+
+SnapshotRecord = Tuple[Optional[Paper], int]
+
+
+def open_snapshot(path: str) -> IO[bytes]:
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def snapshot_format(path: str) -> str:
+    name = path.removesuffix(".gz")
+    if name.endswith((".json", ".jsonl")):
+        return "jsonl"
+    if name.endswith(".xml"):
+        return "oai"
+    raise ValueError(f"Unknown snapshot format of '{path}'")
+
+
+def iter_snapshot(path: str, position: int = 0) -> Iterator[SnapshotRecord]:
+    """Read the snapshot at path, resuming from a position it yielded."""
+    if snapshot_format(path) == "jsonl":
+        return iter_json_lines(path, position)
+    return iter_oai_records(path, position)
+
+
+def iter_json_lines(path: str, offset: int = 0) -> Iterator[SnapshotRecord]:
+    with open_snapshot(path) as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                paper = paper_from_json(json.loads(line))
+            except (ValueError, KeyError, TypeError, IndexError) as e:
+                logger.warning(f"Skipping malformed record before byte {offset}: {e}")
+                paper = None
+            yield paper, offset
+
+
+def paper_from_json(record: dict) -> Paper:
+    versions = record.get("versions") or []
+    if versions:
+        published = parse_arxiv_date(versions[0]["created"])
+        version = versions[-1]["version"]
+    else:
+        published = parse_arxiv_date(record["update_date"])
+        version = ""
+
+    if record.get("authors_parsed"):
+        # Parsed names are [keyname, forenames, suffix].
+        authors = [
+            author_name(name[1], name[0], name[2] if len(name) > 2 else "")
+            for name in record["authors_parsed"]
+        ]
+    else:
+        authors = split_authors(record["authors"])
+
+    return Paper(
+        title=collapse_whitespace(record["title"]),
+        abstract=collapse_whitespace(record["abstract"]),
+        url=arxiv_url(record["id"], version),
+        authors=authors,
+        published_date=published.isoformat(),
+    )
+
+
+def iter_oai_records(path: str, skip: int = 0) -> Iterator[SnapshotRecord]:
+    read = 0
+    with open_snapshot(path) as f:
+        parent = None
+        for event, element in ElementTree.iterparse(f, events=("start", "end")):
+            name = local_name(element.tag)
+            if event == "start":
+                if name == "ListRecords":
+                    parent = element
+                continue
+            if name != "record":
+                continue
+
+            read += 1
+            if read > skip:
+                try:
+                    paper = paper_from_oai(element)
+                except (ValueError, KeyError, TypeError, IndexError) as e:
+                    logger.warning(f"Skipping malformed record {read}: {e}")
+                    paper = None
+                yield paper, read
+            # Drop parsed records so memory stays flat.
+            element.clear()
+            if parent is not None:
+                parent.clear()
+
+
+def paper_from_oai(record: ElementTree.Element) -> Optional[Paper]:
+    """Build a paper from an OAI record, or None for deleted records."""
+    header = child(record, "header")
+    if header is not None and header.get("status") == "deleted":
+        return None
+    metadata = child(record, "metadata")
+    if metadata is None or len(metadata) == 0:
+        return None
+    fields = metadata[0]
+    metadata_format = local_name(fields.tag)
+
+    if metadata_format == "arXiv":
+        author_list = child(fields, "authors")
+        authors = [
+            author_name(
+                text(author, "forenames"),
+                text(author, "keyname"),
+                text(author, "suffix"),
+            )
+            for author in (author_list if author_list is not None else [])
+        ]
+        published = parse_arxiv_date(text(fields, "created"))
+        version = ""
+    elif metadata_format == "arXivRaw":
+        authors = split_authors(text(fields, "authors"))
+        versions = [v for v in fields if local_name(v.tag) == "version"]
+        published = parse_arxiv_date(text(versions[0], "date"))
+        version = versions[-1].get("version", "")
+    else:
+        raise ValueError(f"Unsupported metadata format '{metadata_format}'")
+
+    arxiv_id = text(fields, "id").strip()
+    if not arxiv_id:
+        raise ValueError("Record has no arXiv id")
+
+    return Paper(
+        title=collapse_whitespace(text(fields, "title")),
+        abstract=collapse_whitespace(text(fields, "abstract")),
+        url=arxiv_url(arxiv_id, version),
+        authors=authors,
+        published_date=published.isoformat(),
+    )
+
+
+def local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def child(element: ElementTree.Element, name: str) -> Optional[ElementTree.Element]:
+    for candidate in element:
+        if local_name(candidate.tag) == name:
+            return candidate
+    return None
+
+
+def text(element: ElementTree.Element, name: str) -> str:
+    found = child(element, name)
+    return (found.text or "") if found is not None else ""
@@ -0,0 +1,36 @@
+"""
+Run a summary job worker pool as a standalone process.
+
+    python -m src.jobs           # process queued jobs
+    python -m src.jobs --sweep   # also queue jobs for stale summaries
+
+Run the sweep in a single process, so that it is not repeated by every
+worker.
+"""
+
+import argparse
+import asyncio
+
+from src.jobs.sweep import resummarize_sweep
+from src.jobs.worker import job_worker
+
+
+async def run(args: argparse.Namespace) -> None:
+    tasks = [job_worker.run_forever()]
+    if args.sweep:
+        tasks.append(resummarize_sweep.run_forever())
+    await asyncio.gather(*tasks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process summary jobs.")
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Also queue jobs to replace the stale summaries in demand.",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
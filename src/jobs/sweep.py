@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from src.config import settings, logger
+from src.database.connection import AsyncSessionLocal
+from src.database.repositories import create_summary_job, get_summaries_to_refresh
+from src.processing.summarizer import Summarizer, is_local, summary_version
+from src.services.job_service import job_events
+
+
+class ResummarizeSweep:
+    """
+    Moves the summaries in demand to the current prompt version and model.
+
+    After SUMMARY_PROMPT_VERSION or a model changes, every stored summary is
+    stale. Requests are served the stale summary while a job replaces it, and
+    this sweep queues those jobs ahead of the requests, for the summaries
+    served most recently first and a batch at a time, so the job workers
+    regenerate the hot papers at a steady rate instead of all at once.
+    Summaries not served within hot_seconds are left until they are asked for.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        interval_seconds: float = settings.RESUMMARIZE_INTERVAL_SECONDS,
+        batch_size: int = settings.RESUMMARIZE_BATCH_SIZE,
+        hot_seconds: float = settings.RESUMMARIZE_HOT_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.hot_seconds = hot_seconds
+
+    async def run_once(self) -> int:
+        """Queue a batch of jobs per summarizer. Returns the jobs queued."""
+        served_since = datetime.now(timezone.utc) - timedelta(seconds=self.hot_seconds)
+        queued = 0
+        async with self.session_factory() as db:
+            for summarizer in Summarizer:
+                if is_local(summarizer):
+                    continue
+                stale = await get_summaries_to_refresh(
+                    db,
+                    summarizer.value,
+                    *summary_version(summarizer),
+                    served_since,
+                    self.batch_size,
+                )
+                for summary in stale:
+                    await create_summary_job(
+                        db,
+                        {
+                            "paper_id": summary.paper_id,
+                            "knowledge_level": summary.knowledge_level,
+                            "summarizer": summary.summarizer,
+                        },
+                    )
+                queued += len(stale)
+        if queued:
+            job_events.job_submitted()
+            logger.info(f"Queued {queued} jobs to replace stale summaries.")
+        return queued
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.exception(f"Re-summarization sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+
+resummarize_sweep = ResummarizeSweep()
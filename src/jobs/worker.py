@@ -0,0 +1,96 @@
+import asyncio
+
+from src.config import settings, logger
+from src.database.connection import AsyncSessionLocal
+from src.database.repositories import (
+    claim_summary_job,
+    finish_summary_job,
+    get_paper_by_id,
+    retry_summary_job,
+)
+from src.models.job import JobStatus
+from src.models.knowledge_level import KnowledgeLevel
+from src.models.paper import Paper
+from src.processing.summarizer import Summarizer
+from src.services.job_service import job_events
+from src.services.paper_service import PaperService
+
+
+class JobWorker:
+    """
+    Pool of coroutines that take summary jobs from the summary_jobs table and
+    generate the summaries. Any number of pools, in the API processes or in
+    dedicated ones, can consume the same queue.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        concurrency: int = settings.JOBS_WORKER_CONCURRENCY,
+        poll_seconds: float = settings.JOBS_POLL_SECONDS,
+        stale_after_seconds: float = settings.JOBS_STALE_AFTER_SECONDS,
+        max_attempts: int = settings.JOBS_MAX_ATTEMPTS,
+        retry_backoff_seconds: float = settings.JOBS_RETRY_BACKOFF_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    async def run_forever(self) -> None:
+        await asyncio.gather(*(self._consume() for _ in range(self.concurrency)))
+
+    async def run_once(self) -> bool:
+        """Process one job. Returns False when the queue is empty."""
+        async with self.session_factory() as db:
+            db_job = await claim_summary_job(db, self.stale_after_seconds)
+            if db_job is None:
+                return False
+
+            logger.info(
+                f"Processing summary job {db_job.id} (attempt {db_job.attempts})"
+            )
+            try:
+                if db_job.attempts > self.max_attempts:
+                    raise RuntimeError(
+                        f"Job abandoned after {self.max_attempts} attempts"
+                    )
+                db_paper = await get_paper_by_id(db, db_job.paper_id)
+                await PaperService.generate_summary_once(
+                    db,
+                    db_paper,
+                    Paper.model_validate(db_paper),
+                    KnowledgeLevel(db_job.knowledge_level),
+                    Summarizer(db_job.summarizer),
+                )
+                await finish_summary_job(db, db_job.id, JobStatus.SUCCEEDED.value)
+            except Exception as e:
+                await db.rollback()
+                if db_job.attempts < self.max_attempts:
+                    delay = self.retry_backoff_seconds * 2 ** (db_job.attempts - 1)
+                    logger.error(
+                        f"Summary job {db_job.id} failed, retrying in {delay:.0f}s: {e}"
+                    )
+                    await retry_summary_job(db, db_job.id, delay, str(e))
+                    return True
+                logger.error(f"Summary job {db_job.id} failed: {e}")
+                await finish_summary_job(
+                    db, db_job.id, JobStatus.FAILED.value, error=str(e)
+                )
+            job_events.job_finished(db_job.id)
+            return True
+
+    async def _consume(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.exception(f"Summary job worker error: {e}")
+                processed = False
+            if not processed:
+                await job_events.wait_for_submission(self.poll_seconds)
+
+
+job_worker = JobWorker()
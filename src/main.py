@@ -2,13 +2,42 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from slowapi.errors import RateLimitExceeded
 from contextlib import asynccontextmanager
+import asyncio
+import time
+import uuid
 
 from src.api.routes import router as api_router, limiter
-from src.database.connection import init_db
+from src.api.jobs import router as jobs_router
+from src.api.metrics import router as metrics_router
+from src.api.subscriptions import router as subscriptions_router
+from src.config import settings
+from src.database.connection import AsyncSessionLocal, init_db
+from src.harvest.harvester import harvester
+from src.jobs.sweep import resummarize_sweep
+from src.jobs.worker import job_worker
+from src.metrics import HTTP_REQUEST_SECONDS, RATE_LIMIT_REJECTIONS, mark_process_dead
+from src.processing.summarizer import summarizer_registry
+from src.resilience import request_budget
+from src.similarity.index import similarity_index
+from src.tracing import span_name, tracer
+
+
+def route_template(request: Request) -> str:
+    """Path template of the matched route, which keeps metric labels bounded."""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Routes of included routers may only know their path within the router,
+    # so take the prefix back from the request path.
+    path = request.scope["path"]
+    matched = route.path_format.format(**request.path_params)
+    prefix = path[: len(path) - len(matched)] if path.endswith(matched) else ""
+    return prefix + route.path
 
 
 def custom_rate_limit_handler(request: Request, exc: RateLimitExceeded):
     """Custom rate limit exceeded handler with informative error message."""
+    RATE_LIMIT_REJECTIONS.labels(route=route_template(request)).inc()
     response = JSONResponse(
         status_code=429,
         content={
@@ -21,19 +50,79 @@ def custom_rate_limit_handler(request: Request, exc: RateLimitExceeded):
     return response
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    summarizer_registry.startup()
+    background_tasks = [
+        asyncio.create_task(similarity_index.run_forever(AsyncSessionLocal))
+    ]
+    if settings.HARVEST_ENABLED:
+        background_tasks.append(asyncio.create_task(harvester.run_forever()))
+    if settings.JOBS_WORKER_ENABLED:
+        background_tasks.append(asyncio.create_task(job_worker.run_forever()))
+    if settings.RESUMMARIZE_ENABLED:
+        background_tasks.append(asyncio.create_task(resummarize_sweep.run_forever()))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await summarizer_registry.shutdown()
+    mark_process_dead()
+    if tracer.exporter is not None:
+        tracer.exporter.shutdown()
+
+
 app = FastAPI(
     title="Research Paper Summarizer",
     description="Retrieves and summarizes the latest arXiv papers based on your knowledge level.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, custom_rate_limit_handler)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    init_db()
-    yield
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    # Reuse the caller's request id so traces can be joined across services.
+    request_id = request.headers.get("X-Request-ID", "")[:64] or uuid.uuid4().hex
+    with tracer.span(
+        "http.request",
+        trace_id=request_id,
+        method=request.method,
+        path=request.url.path,
+    ) as span:
+        response = await call_next(request)
+        if span is not None:
+            endpoint = request.scope.get("endpoint")
+            if endpoint is not None:
+                span.name = span_name(endpoint)
+            span.set_attribute("status", response.status_code)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+@app.middleware("http")
+async def apply_latency_budget(request: Request, call_next):
+    # Upstream calls made for the request share its budget, so retries stop
+    # while there is still time to answer with a fallback.
+    with request_budget(settings.REQUEST_LATENCY_BUDGET_SECONDS):
+        return await call_next(request)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    # Streaming responses are timed up to their first byte.
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.labels(
+            method=request.method, route=route_template(request), status=status
+        ).observe(time.perf_counter() - start)
 
 
 # app.add_middleware(
@@ -45,6 +134,9 @@ async def lifespan(app: FastAPI):
 # )
 
 app.include_router(api_router, prefix="/api")
+app.include_router(subscriptions_router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     import uvicorn
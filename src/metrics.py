@@ -0,0 +1,216 @@
+"""
+Prometheus metrics for the API, the background workers and their upstreams.
+
+When uvicorn runs several worker processes, set PROMETHEUS_MULTIPROC_DIR to
+an empty directory before the processes start. Every process then writes its
+samples there and /metrics aggregates them across processes.
+"""
+
+import functools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Tuple, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+from src.tracing import span_name, tracer
+
+T = TypeVar("T")
+
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response, by route template.",
+    ["method", "route", "status"],
+    buckets=SLOW_BUCKETS,
+)
+SOURCE_FETCH_SECONDS = Histogram(
+    "paper_source_fetch_seconds",
+    "Time spent fetching papers from an upstream source.",
+    ["source"],
+    buckets=SLOW_BUCKETS,
+)
+SOURCE_QUEUE_SECONDS = Histogram(
+    "paper_source_queue_seconds",
+    "Time spent waiting for the source rate governor before a fetch.",
+    ["source", "priority"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds",
+    "Time spent in summarizer model calls.",
+    ["summarizer", "model"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_CALLS_IN_FLIGHT = Gauge(
+    "llm_calls_in_flight",
+    "Summarizer model calls currently awaiting a response.",
+    ["summarizer", "model"],
+    multiprocess_mode="livesum",
+)
+DB_REPOSITORY_SECONDS = Histogram(
+    "db_repository_duration_seconds",
+    "Time spent in each repository function.",
+    ["function"],
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+SUMMARY_CACHE_LOOKUPS = Counter(
+    "summary_cache_lookups_total",
+    "Summary lookups, by whether a stored summary was found (hit), copied from "
+    "another version or a near-duplicate (reused), served while a job replaces "
+    "it (stale), or had to be generated (miss).",
+    ["result"],
+)
+SEARCH_CACHE_LOOKUPS = Counter(
+    "search_cache_lookups_total",
+    "Search cache lookups, by whether fresh results were found (hit), stale "
+    "results were served while they are refreshed (stale), or the search had "
+    "to run (miss).",
+    ["result"],
+)
+SEARCH_CACHE_REFRESHES = Counter(
+    "search_cache_refreshes_total",
+    "Background refreshes of stale search results, by outcome.",
+    ["outcome"],
+)
+PAPERS_STORED = Counter(
+    "papers_stored_total",
+    "Papers passed to the store, by whether they were inserted or already present.",
+    ["outcome"],
+)
+HYBRID_SEARCHES = Counter(
+    "hybrid_searches_total",
+    "Hybrid searches, by the reason stored papers did or did not answer them.",
+    ["outcome"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter.",
+    ["route"],
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total",
+    "Failed calls to paper sources and summarizer models.",
+    ["upstream"],
+)
+CONCURRENCY_LIMIT = Gauge(
+    "upstream_concurrency_limit",
+    "Current adaptive limit on calls in flight to an upstream.",
+    ["upstream"],
+    multiprocess_mode="livesum",
+)
+CONCURRENCY_IN_FLIGHT = Gauge(
+    "upstream_concurrency_in_flight",
+    "Calls holding a slot of an upstream's concurrency limit.",
+    ["upstream"],
+    multiprocess_mode="livesum",
+)
+CONCURRENCY_QUEUE_DEPTH = Gauge(
+    "upstream_concurrency_queue_depth",
+    "Calls waiting for a slot of an upstream's concurrency limit.",
+    ["upstream"],
+    multiprocess_mode="livesum",
+)
+CONCURRENCY_SHED = Counter(
+    "upstream_concurrency_shed_total",
+    "Calls shed by an upstream's concurrency limit, by reason.",
+    ["upstream", "reason"],
+)
+UPSTREAM_RESILIENCE_EVENTS = Counter(
+    "upstream_resilience_events_total",
+    "Retries, hedged requests, calls rejected by an open circuit and degraded "
+    "fallbacks, by upstream.",
+    ["upstream", "event"],
+)
+
+
+@asynccontextmanager
+async def observe_source_fetch(source: str) -> AsyncIterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.labels(upstream=source).inc()
+        raise
+    finally:
+        SOURCE_FETCH_SECONDS.labels(source=source).observe(time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def observe_llm_call(summarizer: str, model: str) -> AsyncIterator[None]:
+    in_flight = LLM_CALLS_IN_FLIGHT.labels(summarizer=summarizer, model=model)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.labels(upstream=summarizer).inc()
+        raise
+    finally:
+        in_flight.dec()
+        LLM_CALL_SECONDS.labels(summarizer=summarizer, model=model).observe(
+            time.perf_counter() - start
+        )
+
+
+def observe_repository(
+    fn: Callable[..., Awaitable[T]],
+) -> Callable[..., Awaitable[T]]:
+    """Record the duration of an async repository function, and a span."""
+    histogram = DB_REPOSITORY_SECONDS.labels(function=fn.__name__)
+    name = span_name(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs) -> T:
+        start = time.perf_counter()
+        try:
+            with tracer.span(name):
+                return await fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+def instrument_pool(pool) -> None:
+    """Track checked out connections of a SQLAlchemy pool."""
+    event.listen(pool, "checkout", lambda *args: DB_POOL_CHECKED_OUT.inc())
+    event.listen(pool, "checkin", lambda *args: DB_POOL_CHECKED_OUT.dec())
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the exposition of all metrics and its content type."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop the live gauges of this process from the aggregated metrics."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,32 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from src.models.paper import PaperSummary
+
+
+class SummarizeMode(str, Enum):
+    SYNC = "sync"
+    ASYNC = "async"
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class SummaryJob(BaseModel):
+    id: str
+    status: JobStatus
+    knowledge_level: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[PaperSummary] = None
+
+    model_config = ConfigDict(from_attributes=True)
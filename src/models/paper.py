@@ -1,5 +1,6 @@
-from pydantic import BaseModel, field_validator, ConfigDict
-from typing import List, Any
+from pydantic import BaseModel, Field, field_validator, ConfigDict
+from datetime import date
+from typing import List, Any, Optional
 
 
 class Paper(BaseModel):
@@ -16,15 +17,31 @@ class Paper(BaseModel):
             return [a.strip() for a in v.split(",") if a.strip()]
         return v
 
+    @field_validator("published_date", mode="before")
+    @classmethod
+    def format_published_date(cls, v: Any) -> str:
+        if isinstance(v, date):
+            return v.isoformat()
+        return v
+
     model_config = ConfigDict(from_attributes=True)
 
 
+class RelatedPaper(Paper):
+    id: int
+    # BM25 similarity to the paper the related papers were asked for.
+    score: float
+
+
 class PaperSummary(BaseModel):
     title: str
     authors: List[str]
     published_date: str
     summary: str
     url: str
+    # Set to the fallback used when the summary could not be generated, or to
+    # "stale" for a summary of older prompts or another model being replaced.
+    degraded: Optional[str] = None
 
     @field_validator("authors", mode="before")
     @classmethod
@@ -33,4 +50,30 @@ class PaperSummary(BaseModel):
             return [a.strip() for a in v.split(",") if a.strip()]
         return v
 
+    @field_validator("published_date", mode="before")
+    @classmethod
+    def format_published_date(cls, v: Any) -> str:
+        if isinstance(v, date):
+            return v.isoformat()
+        return v
+
     model_config = ConfigDict(from_attributes=True)
+
+
+class MultiLevelSummary(BaseModel):
+    """Summaries of one paper at every knowledge level."""
+
+    general: str = Field(min_length=1)
+    undergraduate: str = Field(min_length=1)
+    researcher: str = Field(min_length=1)
+
+
+class IndexedSummary(BaseModel):
+    """Summary of the paper at the given position of a batch prompt."""
+
+    index: int
+    summary: str = Field(min_length=1)
+
+
+class BatchSummaries(BaseModel):
+    summaries: List[IndexedSummary]
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.config import settings
+
+
+class SubscriptionCreate(BaseModel):
+    topic: str = Field(..., min_length=1, max_length=200)
+    source: str = Field("arxiv", min_length=1, max_length=50)
+    max_results: int = Field(settings.HARVEST_MAX_RESULTS, ge=1, le=10)
+
+
+class Subscription(BaseModel):
+    id: int
+    topic: str
+    source: str
+    max_results: int
+    enabled: bool
+    last_harvested_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
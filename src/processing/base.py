@@ -1,13 +1,60 @@
 from abc import ABC, abstractmethod
-from typing import List
+import asyncio
+from typing import AsyncIterator, List, Tuple, Type
+
+from pydantic import BaseModel
 
-from src.models.paper import Paper, PaperSummary
 from src.models.knowledge_level import KnowledgeLevel
+from src.processing.prompts import build_prompt
 
 
 class AbstractSummarizer(ABC):
+    # Name of the underlying model, used to label metrics and, with the
+    # prompt version, to key the summaries it generates.
+    model: str = "unknown"
+    # Whether the summaries depend on the prompts of src.processing.prompts.
+    uses_prompts: bool = True
+    # Errors raised when the model's service fails, rather than this one.
+    upstream_errors: Tuple[Type[Exception], ...] = ()
+
     @abstractmethod
-    def summarize(
-        self, papers: List[Paper], level: KnowledgeLevel
-    ) -> List[PaperSummary]:
+    async def summarize(self, prompt: str) -> str:
+        pass
+
+    async def summarize_abstract(self, abstract: str, level: KnowledgeLevel) -> str:
+        """Summarize an abstract for a knowledge level."""
+        return await self.summarize(build_prompt(abstract, level))
+
+    async def summarize_abstracts(
+        self, abstracts: List[str], level: KnowledgeLevel
+    ) -> List[str]:
+        """Summarize several abstracts. Summarizers may do this in one pass."""
+        return await asyncio.gather(
+            *(self.summarize_abstract(abstract, level) for abstract in abstracts)
+        )
+
+    async def summarize_abstract_stream(
+        self, abstract: str, level: KnowledgeLevel
+    ) -> AsyncIterator[str]:
+        async for chunk in self.summarize_stream(build_prompt(abstract, level)):
+            yield chunk
+
+    async def summarize_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield the summary in chunks as it is generated. Summarizers without
+        a streaming API yield the whole summary at once.
+        """
+        yield await self.summarize(prompt)
+
+    async def summarize_structured(
+        self, prompt: str, response_schema: Type[BaseModel]
+    ) -> str:
+        """
+        Return a JSON document matching the response schema. Summarizers
+        without structured output rely on the prompt asking for JSON.
+        """
+        return await self.summarize(prompt)
+
+    async def aclose(self) -> None:
+        """Release network resources held by the summarizer."""
         pass
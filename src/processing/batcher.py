@@ -0,0 +1,125 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from src.config import settings, logger
+from src.models.knowledge_level import KnowledgeLevel
+from src.models.paper import Paper, PaperSummary
+from src.processing.summarizer import (
+    Summarizer,
+    summarize_paper,
+    summarize_papers_batch,
+)
+
+
+@dataclass
+class _PendingSummary:
+    paper: Paper
+    future: asyncio.Future
+
+
+class SummaryBatcher:
+    """
+    Collects concurrent summarization requests for the same knowledge level
+    and sends them to the model as one prompt.
+
+    A batch is sent once it holds max_batch_size requests or max_wait_seconds
+    after its first request arrived, whichever comes first. Papers whose
+    summary cannot be read from the batch response are summarized on their
+    own, so a malformed item only costs that item an extra call. When the
+    batch call itself fails, e.g. because the model is overloaded or its
+    circuit is open, every request in the batch fails with its error rather
+    than retrying alone against the same upstream.
+    """
+
+    def __init__(
+        self,
+        summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+        max_batch_size: int = settings.SUMMARY_MICRO_BATCH_MAX_SIZE,
+        max_wait_seconds: float = settings.SUMMARY_MICRO_BATCH_WINDOW_SECONDS,
+    ):
+        self.summarizer = summarizer
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: Dict[KnowledgeLevel, List[_PendingSummary]] = {}
+        self._timers: Dict[KnowledgeLevel, asyncio.TimerHandle] = {}
+        self._batches: Set[asyncio.Task] = set()
+
+    async def summarize(self, paper: Paper, level: KnowledgeLevel) -> PaperSummary:
+        """Drop-in replacement for summarize_paper that joins the next batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(level, [])
+        pending.append(_PendingSummary(paper, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(level)
+        elif len(pending) == 1:
+            self._timers[level] = loop.call_later(
+                self.max_wait_seconds, self._flush, level
+            )
+        return await future
+
+    def _flush(self, level: KnowledgeLevel) -> None:
+        timer = self._timers.pop(level, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(level, [])
+        if batch:
+            task = asyncio.ensure_future(self._send(batch, level))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _send(self, batch: List[_PendingSummary], level: KnowledgeLevel):
+        # Callers that were cancelled while waiting are left out.
+        batch = [pending for pending in batch if not pending.future.done()]
+        if not batch:
+            return
+
+        summaries: List[Optional[str]] = [None] * len(batch)
+        if len(batch) > 1:
+            logger.info(
+                f"Summarizing a batch of {len(batch)} papers at level={level.value}"
+            )
+            try:
+                summaries = await summarize_papers_batch(
+                    [pending.paper for pending in batch], level, self.summarizer
+                )
+            except Exception as e:
+                logger.error(f"Batch summarization failed: {e!r}")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                return
+
+        await asyncio.gather(
+            *(
+                self._resolve(pending, summary, level)
+                for pending, summary in zip(batch, summaries)
+            )
+        )
+
+    async def _resolve(
+        self, pending: _PendingSummary, summary: Optional[str], level: KnowledgeLevel
+    ) -> None:
+        paper = pending.paper
+        try:
+            if summary is None:
+                result = await summarize_paper(paper, level, self.summarizer)
+            else:
+                result = PaperSummary(
+                    title=paper.title,
+                    authors=paper.authors,
+                    published_date=paper.published_date,
+                    url=paper.url,
+                    summary=summary,
+                )
+        except Exception as e:
+            if not pending.future.done():
+                pending.future.set_exception(e)
+            return
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+
+summary_batcher = SummaryBatcher()
@@ -0,0 +1,139 @@
+import re
+from typing import AsyncIterator, Dict, List
+
+import numpy as np
+
+from src.models.knowledge_level import KnowledgeLevel
+from src.processing.base import AbstractSummarizer
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\[])")
+TOKEN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "their this to was were which with we our these those can also than such".split()
+)
+
+
+class ExtractiveSummarizer(AbstractSummarizer):
+    """
+    Builds summaries locally by picking the most central sentences of the
+    abstract, without calling a model.
+
+    Sentences are scored by the cosine similarity of their TF-IDF vector to
+    the TF-IDF vector of the whole abstract. Batches of abstracts share one
+    vocabulary and are scored together with NumPy matrix operations.
+    """
+
+    model = "tfidf-extractive"
+    uses_prompts = False
+
+    SENTENCES_PER_LEVEL: Dict[KnowledgeLevel, int] = {
+        KnowledgeLevel.GENERAL: 2,
+        KnowledgeLevel.UNDERGRADUATE: 3,
+        KnowledgeLevel.RESEARCHER: 5,
+    }
+
+    async def summarize(self, prompt: str) -> str:
+        # Sentences are extracted from the abstract itself, which callers
+        # pass to summarize_abstract; prompts are for models.
+        raise NotImplementedError(
+            "ExtractiveSummarizer summarizes abstracts, not prompts"
+        )
+
+    async def summarize_abstract(self, abstract: str, level: KnowledgeLevel) -> str:
+        return self.extract([abstract], level)[0]
+
+    async def summarize_abstract_stream(
+        self, abstract: str, level: KnowledgeLevel
+    ) -> AsyncIterator[str]:
+        yield self.extract([abstract], level)[0]
+
+    async def summarize_abstracts(
+        self, abstracts: List[str], level: KnowledgeLevel
+    ) -> List[str]:
+        return self.extract(abstracts, level)
+
+    def extract(self, abstracts: List[str], level: KnowledgeLevel) -> List[str]:
+        """Return the top sentences of every abstract, in their original order."""
+        if not abstracts:
+            return []
+        count = self.SENTENCES_PER_LEVEL[level]
+
+        sentences: List[str] = []
+        doc_ids: List[int] = []
+        for doc_id, abstract in enumerate(abstracts):
+            split = [s.strip() for s in SENTENCE_BOUNDARY.split(abstract.strip())]
+            split = [s for s in split if s] or [abstract.strip()]
+            sentences.extend(split)
+            doc_ids.extend([doc_id] * len(split))
+        docs = np.array(doc_ids)
+
+        scores = self._score(sentences, docs, len(abstracts))
+
+        # Rank sentences within their abstract and keep the best `count`.
+        order = np.lexsort((-scores, docs))
+        starts = np.searchsorted(docs[order], np.arange(len(abstracts)))
+        rank = np.empty(len(sentences), dtype=int)
+        rank[order] = np.arange(len(sentences)) - starts[docs[order]]
+        keep = rank < count
+
+        summaries: List[List[str]] = [[] for _ in abstracts]
+        for index in np.flatnonzero(keep):
+            summaries[docs[index]].append(sentences[index])
+        return [" ".join(parts) for parts in summaries]
+
+    @staticmethod
+    def _score(sentences: List[str], docs: np.ndarray, n_docs: int) -> np.ndarray:
+        """
+        Cosine similarity of every sentence to its abstract in TF-IDF space.
+
+        The term matrices are kept as (row, column, value) arrays rather than
+        dense matrices, so memory grows with the text, not with the batch
+        size times the vocabulary.
+        """
+        tokens: List[str] = []
+        rows: List[int] = []
+        for row, sentence in enumerate(sentences):
+            words = [w for w in TOKEN.findall(sentence.lower()) if w not in STOP_WORDS]
+            tokens.extend(words)
+            rows.extend([row] * len(words))
+        if not tokens:
+            return np.zeros(len(sentences))
+
+        vocabulary, token_cols = np.unique(np.array(tokens), return_inverse=True)
+        n_terms = len(vocabulary)
+
+        # Term frequency of every (sentence, term) pair.
+        keys, tf = np.unique(np.array(rows) * n_terms + token_cols, return_counts=True)
+        entry_rows, entry_cols = np.divmod(keys, n_terms)
+
+        # Terms are weighted within their own abstract, treating its
+        # sentences as the documents, so a summary does not depend on the
+        # other abstracts of the batch.
+        _, centroid_index = np.unique(
+            docs[entry_rows] * n_terms + entry_cols, return_inverse=True
+        )
+        df = np.bincount(centroid_index)
+        doc_sentences = np.bincount(docs, minlength=n_docs)
+        idf = np.log((1 + doc_sentences[docs[entry_rows]]) / (1 + df[centroid_index]))
+        weights = tf * (idf + 1)
+
+        # Abstract vectors are the sums of their sentence vectors.
+        centroid_weights = np.bincount(centroid_index, weights=weights)
+        centroid_docs = np.zeros(len(centroid_weights), dtype=int)
+        centroid_docs[centroid_index] = docs[entry_rows]
+
+        dots = np.bincount(
+            entry_rows,
+            weights=weights * centroid_weights[centroid_index],
+            minlength=len(sentences),
+        )
+        sentence_norms = np.sqrt(
+            np.bincount(entry_rows, weights=weights**2, minlength=len(sentences))
+        )
+        centroid_norms = np.sqrt(
+            np.bincount(centroid_docs, weights=centroid_weights**2, minlength=n_docs)
+        )[docs]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = dots / (sentence_norms * centroid_norms)
+        return np.nan_to_num(scores)
@@ -1,20 +1,75 @@
+from typing import AsyncIterator, Optional, Type
+
+import httpx
 from google import genai
+from google.genai import errors
 from google.genai import types
+from pydantic import BaseModel
 
+from src.config import settings
 from src.processing.base import AbstractSummarizer
+from src.tracing import traced
 
 
 class GeminiSummarizer(AbstractSummarizer):
-    def __init__(self):
-        self.client = genai.Client()
+    model = settings.GEMINI_MODEL
+    upstream_errors = (errors.APIError, httpx.HTTPError)
+
+    def __init__(self, http_options: Optional[types.HttpOptions] = None):
+        if http_options is None:
+            http_options = types.HttpOptions(
+                async_client_args={
+                    "limits": httpx.Limits(
+                        max_connections=settings.GEMINI_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=settings.GEMINI_KEEPALIVE_EXPIRY,
+                    )
+                }
+            )
+        self.client = genai.Client(http_options=http_options)
+
+    @traced
+    async def summarize(self, prompt: str) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                thinking_config=types.ThinkingConfig(thinking_budget=0)
+            ),
+        )
 
-    def summarize(self, prompt) -> str:
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
+        return response.text
+
+    async def summarize_stream(self, prompt: str) -> AsyncIterator[str]:
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
             contents=prompt,
             config=types.GenerateContentConfig(
                 thinking_config=types.ThinkingConfig(thinking_budget=0)
             ),
         )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+    @traced
+    async def summarize_structured(
+        self, prompt: str, response_schema: Type[BaseModel]
+    ) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                thinking_config=types.ThinkingConfig(thinking_budget=0),
+                response_mime_type="application/json",
+                response_schema=response_schema,
+            ),
+        )
 
         return response.text
+
+    async def aclose(self) -> None:
+        # Older google-genai releases do not expose aclose on the async client.
+        aclose = getattr(self.client.aio, "aclose", None)
+        if aclose is not None:
+            await aclose()
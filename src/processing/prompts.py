@@ -1,21 +1,21 @@
-from src.models.knowledge_level import KnowledgeLevel
+"""
+Registry of the summarization prompts, by version.
 
+Stored summaries record the prompt version they were generated with, and are
+looked up by a key that includes it. To change the prompts, add a new
+version here and point SUMMARY_PROMPT_VERSION at it: summaries of the
+previous version keep being served, marked stale, until the background
+sweep and the job workers have regenerated them.
+"""
 
-def build_prompt(abstract: str, level: KnowledgeLevel) -> str:
-    """
-    Build a summarization prompt tailored to the user's knowledge level.
+from typing import Dict, List
 
-    Args:
-        abstract: The abstract text of the research paper.
-        level: Target knowledge level for the summary.
+from src.config import settings
+from src.models.knowledge_level import KnowledgeLevel
 
-    Returns:
-        The formatted prompt string for the summarization model.
 
-    Raises:
-        ValueError: If the provided knowledge level is not supported.
-    """
-    instructions = {
+PROMPT_VERSIONS: Dict[str, Dict[KnowledgeLevel, str]] = {
+    "v1": {
         KnowledgeLevel.GENERAL: (
             "Summarize this research paper in plain language for a general audience. "
             "Avoid technical jargon and focus on the main idea and why it matters."
@@ -28,9 +28,90 @@ def build_prompt(abstract: str, level: KnowledgeLevel) -> str:
             "Summarize this research paper for a professional or researcher in the field. "
             "Include technical details, key findings, limitations, implications as well as other technical aspects."
         ),
-    }
+    },
+}
+
+
+def level_instructions() -> Dict[KnowledgeLevel, str]:
+    """The instructions for every knowledge level, in the configured version."""
+    version = settings.SUMMARY_PROMPT_VERSION
+    if version not in PROMPT_VERSIONS:
+        raise ValueError(f"Unknown prompt version: {version}")
+    return PROMPT_VERSIONS[version]
 
+
+def build_prompt(abstract: str, level: KnowledgeLevel) -> str:
+    """
+    Build a summarization prompt tailored to the user's knowledge level.
+
+    Args:
+        abstract: The abstract text of the research paper.
+        level: Target knowledge level for the summary.
+
+    Returns:
+        The formatted prompt string for the summarization model.
+
+    Raises:
+        ValueError: If the provided knowledge level is not supported.
+    """
+    instructions = level_instructions()
     if level not in instructions:
         raise ValueError(f"Unsupported knowledge level: {level}")
 
     return f"{instructions[level]}\n\nAbstract:\n{abstract}"
+
+
+def build_multi_level_prompt(abstract: str) -> str:
+    """
+    Build a prompt asking for a summary at every knowledge level at once.
+
+    The model is asked for a JSON object with one key per knowledge level,
+    each holding the summary written for that audience.
+
+    Args:
+        abstract: The abstract text of the research paper.
+
+    Returns:
+        The formatted prompt string for the summarization model.
+    """
+    sections = "\n".join(
+        f'- "{level.value}": {text}' for level, text in level_instructions().items()
+    )
+    return (
+        "Summarize this research paper for several audiences. Respond with a JSON object "
+        "with exactly the following keys, each holding the summary for that audience:\n"
+        f"{sections}\n\nAbstract:\n{abstract}"
+    )
+
+
+def build_batch_prompt(abstracts: List[str], level: KnowledgeLevel) -> str:
+    """
+    Build a prompt asking for separate summaries of several papers at once.
+
+    Each abstract is preceded by its index, which the model is asked to echo
+    back next to the matching summary.
+
+    Args:
+        abstracts: The abstract texts of the research papers.
+        level: Target knowledge level for the summaries.
+
+    Returns:
+        The formatted prompt string for the summarization model.
+
+    Raises:
+        ValueError: If the provided knowledge level is not supported.
+    """
+    instructions = level_instructions()
+    if level not in instructions:
+        raise ValueError(f"Unsupported knowledge level: {level}")
+
+    numbered = "\n\n".join(
+        f"[{index}]\n{abstract}" for index, abstract in enumerate(abstracts)
+    )
+    return (
+        f"{instructions[level]}\n\n"
+        f"Apply these instructions to each of the following {len(abstracts)} research papers "
+        'separately. Respond with a JSON object with a "summaries" list holding one '
+        '{"index": ..., "summary": ...} entry per paper, using the index shown before its abstract.'
+        f"\n\nAbstracts:\n{numbered}"
+    )
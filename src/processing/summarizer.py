@@ -1,27 +1,179 @@
+import asyncio
+from contextlib import nullcontext
 from enum import Enum
+import hashlib
+import json
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
-from src.processing.prompts import build_prompt
+from pydantic import ValidationError
+
+from src.config import logger, settings
+from src.metrics import observe_llm_call
+from src.processing.base import AbstractSummarizer
+from src.processing.prompts import (
+    build_batch_prompt,
+    build_multi_level_prompt,
+)
+from src.processing.extractive_summarizer import ExtractiveSummarizer
 from src.processing.gemini_summarizer import GeminiSummarizer
-from src.models.paper import Paper, PaperSummary
+from src.models.paper import (
+    BatchSummaries,
+    IndexedSummary,
+    MultiLevelSummary,
+    Paper,
+    PaperSummary,
+)
 from src.models.knowledge_level import KnowledgeLevel
+from src.resilience import CircuitOpenError, Overloaded, summarizer_policy
+from src.retrieval.normalize import collapse_whitespace
+
+T = TypeVar("T")
 
 
 class Summarizer(str, Enum):
     GEMINI_SUMMARIZER = "gemini_summarizer"
+    EXTRACTIVE_SUMMARIZER = "extractive_summarizer"
+
+
+# Summarizers that run in-process. They are cheap and deterministic, so their
+# summaries are generated directly instead of being coalesced, locked or
+# batched into model calls.
+LOCAL_SUMMARIZERS = frozenset({Summarizer.EXTRACTIVE_SUMMARIZER})
+
+# Prompt version of the summaries of backends that use no prompt.
+NO_PROMPT = "-"
+
+
+class SummarizerRegistry:
+    """
+    Holds one long-lived instance per summarizer backend so that HTTP clients
+    and their keep-alive connection pools are shared across requests.
+    """
+
+    def __init__(self, factories: Dict[Summarizer, Callable[[], AbstractSummarizer]]):
+        self._factories = factories
+        self._instances: Dict[Summarizer, AbstractSummarizer] = {}
+
+    def register(
+        self, summarizer: Summarizer, factory: Callable[[], AbstractSummarizer]
+    ) -> None:
+        self._factories[summarizer] = factory
+        self._instances.pop(summarizer, None)
+
+    def get(self, summarizer: Summarizer) -> AbstractSummarizer:
+        if summarizer not in self._factories:
+            raise ValueError(f"Unsupported summarizer: {summarizer}")
+        if summarizer not in self._instances:
+            logger.info(f"Creating summarizer backend '{summarizer.value}'")
+            self._instances[summarizer] = self._factories[summarizer]()
+        return self._instances[summarizer]
+
+    def version(self, summarizer: Summarizer) -> Tuple[str, str]:
+        """
+        The prompt version and model of the summaries the summarizer
+        generates now, read from the backend class when no instance exists
+        yet so that it need not be created.
+        """
+        if summarizer not in self._factories:
+            raise ValueError(f"Unsupported summarizer: {summarizer}")
+        backend = self._instances.get(summarizer, self._factories[summarizer])
+        prompt_version = (
+            settings.SUMMARY_PROMPT_VERSION
+            if getattr(backend, "uses_prompts", True)
+            else NO_PROMPT
+        )
+        return prompt_version, getattr(backend, "model", "unknown")
+
+    def upstream_errors(self, summarizer: Summarizer) -> Tuple[type, ...]:
+        """The errors the backend raises when the model's service fails."""
+        backend = self._instances.get(summarizer, self._factories.get(summarizer))
+        return getattr(backend, "upstream_errors", ())
+
+    def startup(self) -> None:
+        """Eagerly create every registered backend."""
+        for summarizer in self._factories:
+            try:
+                self.get(summarizer)
+            except Exception as e:
+                # Leave it to be created lazily so the API can still start,
+                # e.g. when credentials are only provided later.
+                logger.error(f"Could not create summarizer '{summarizer.value}': {e}")
+
+    async def shutdown(self) -> None:
+        for summarizer, instance in list(self._instances.items()):
+            try:
+                await instance.aclose()
+            except Exception as e:
+                logger.error(f"Error closing summarizer '{summarizer.value}': {e}")
+        self._instances.clear()
+
+
+summarizer_registry = SummarizerRegistry(
+    {
+        Summarizer.GEMINI_SUMMARIZER: GeminiSummarizer,
+        Summarizer.EXTRACTIVE_SUMMARIZER: ExtractiveSummarizer,
+    }
+)
 
 
-def summarize_paper(
+def summary_version(summarizer: Summarizer) -> Tuple[str, str]:
+    """The (prompt version, model) that new summaries of the summarizer get."""
+    return summarizer_registry.version(summarizer)
+
+
+def summary_key(abstract: str, level: str, summarizer: Summarizer) -> str:
+    """
+    Content key of a summary: a hash of the normalized abstract, the prompt
+    version, the model and the knowledge level. A summary stored under the
+    key is current; changing any of them gives the summary a new key.
+    """
+    prompt_version, model = summary_version(summarizer)
+    parts = [collapse_whitespace(abstract), prompt_version, model, level]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def get_summarizer(
+    summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+) -> AbstractSummarizer:
+    """Return the shared instance of the requested summarizer."""
+    return summarizer_registry.get(summarizer)
+
+
+async def call_backend(
+    summarizer: Summarizer, fn: Callable[[AbstractSummarizer], Awaitable[T]]
+) -> T:
+    """
+    Call a summarizer backend, observing every attempt. Remote backends are
+    called under their resilience policy.
+    """
+    backend = get_summarizer(summarizer)
+
+    async def attempt() -> T:
+        async with observe_llm_call(summarizer.value, backend.model):
+            return await fn(backend)
+
+    if summarizer in LOCAL_SUMMARIZERS:
+        return await attempt()
+    return await summarizer_policy(summarizer.value).call(attempt)
+
+
+async def summarize_paper(
     paper: Paper,
     level: KnowledgeLevel,
     summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
 ) -> PaperSummary:
-    if summarizer == Summarizer.GEMINI_SUMMARIZER:
-        summarizer = GeminiSummarizer()
-    else:
-        raise ValueError(f"Unsupported summarizer: {summarizer}")
-
-    prompt = build_prompt(paper.abstract, level)
-    summary = summarizer.summarize(prompt)
+    summary = await call_backend(
+        summarizer, lambda backend: backend.summarize_abstract(paper.abstract, level)
+    )
 
     return PaperSummary(
         title=paper.title,
@@ -30,3 +182,106 @@ def summarize_paper(
         url=paper.url,
         summary=summary,
     )
+
+
+async def summarize_papers(
+    papers: List[Paper],
+    level: KnowledgeLevel,
+    summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+) -> List[str]:
+    """Summarize several papers with the summarizer's batch mode."""
+    abstracts = [paper.abstract for paper in papers]
+    return await call_backend(
+        summarizer, lambda backend: backend.summarize_abstracts(abstracts, level)
+    )
+
+
+def is_local(summarizer: Summarizer) -> bool:
+    return summarizer in LOCAL_SUMMARIZERS
+
+
+def is_upstream_failure(summarizer: Summarizer, error: BaseException) -> bool:
+    """
+    Whether a generation failed because the model could not answer: it
+    timed out, its circuit is open, it is overloaded or its service returned
+    an error. Failures of this service itself, such as database errors or
+    bugs, are not.
+    """
+    if isinstance(error, (asyncio.TimeoutError, CircuitOpenError, Overloaded)):
+        return True
+    return isinstance(error, summarizer_registry.upstream_errors(summarizer))
+
+
+def strip_code_fence(response: str) -> str:
+    # Backends without structured output may wrap the JSON in a code fence.
+    return response.strip().removeprefix("```json").strip("`").strip()
+
+
+async def summarize_papers_batch(
+    papers: List[Paper],
+    level: KnowledgeLevel,
+    summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+) -> List[Optional[str]]:
+    """
+    Summarize several papers with a single model call.
+
+    Returns the summaries in the order of the papers, with None for every
+    paper whose summary is missing or malformed in the response.
+    """
+    prompt = build_batch_prompt([paper.abstract for paper in papers], level)
+    response = await call_backend(
+        summarizer, lambda backend: backend.summarize_structured(prompt, BatchSummaries)
+    )
+
+    try:
+        items = json.loads(strip_code_fence(response))["summaries"]
+    except (ValueError, TypeError, KeyError) as e:
+        logger.warning(f"Could not parse batch summary response: {e}")
+        return [None] * len(papers)
+
+    summaries: List[Optional[str]] = [None] * len(papers)
+    for item in items if isinstance(items, list) else []:
+        try:
+            indexed = IndexedSummary.model_validate(item)
+        except ValidationError:
+            continue
+        if 0 <= indexed.index < len(papers):
+            summaries[indexed.index] = indexed.summary
+    return summaries
+
+
+async def summarize_paper_all_levels(
+    paper: Paper,
+    summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+) -> Dict[KnowledgeLevel, str]:
+    """Summarize a paper at every knowledge level with a single model call."""
+    prompt = build_multi_level_prompt(paper.abstract)
+    response = await call_backend(
+        summarizer,
+        lambda backend: backend.summarize_structured(prompt, MultiLevelSummary),
+    )
+
+    try:
+        summaries = MultiLevelSummary.model_validate_json(strip_code_fence(response))
+    except ValidationError as e:
+        raise ValueError(f"Invalid multi-level summary response: {e}") from e
+
+    return {level: getattr(summaries, level.value) for level in KnowledgeLevel}
+
+
+async def summarize_paper_stream(
+    paper: Paper,
+    level: KnowledgeLevel,
+    summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+) -> AsyncIterator[str]:
+    backend = get_summarizer(summarizer)
+
+    # Streams are not retried, but they count against the concurrency limit.
+    limited = (
+        nullcontext()
+        if summarizer in LOCAL_SUMMARIZERS
+        else summarizer_policy(summarizer.value).limited()
+    )
+    async with limited, observe_llm_call(summarizer.value, backend.model):
+        async for chunk in backend.summarize_abstract_stream(paper.abstract, level):
+            yield chunk
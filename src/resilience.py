@@ -0,0 +1,513 @@
+"""
+Deadlines, retries, hedging and circuit breaking for upstream calls.
+
+Every call to a paper source or a remote summarizer goes through the
+ResiliencePolicy of its upstream:
+
+- Each attempt gets a deadline: the upstream's timeout, shortened to what is
+  left of the request's latency budget when one is set.
+- Failed attempts are retried a bounded number of times, with exponential
+  backoff and full jitter, as long as the budget allows.
+- When hedging is enabled, a second identical request is sent if the first
+  has not answered by the upstream's recent p95 latency, and whichever
+  answers first wins.
+- A circuit breaker per upstream fails calls fast after repeated failures,
+  and lets a single probe through once its reset timeout has passed.
+- Remote summarizers also have an adaptive concurrency limit, which finds
+  the highest concurrency their quota allows and queues calls above it.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import (
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from src.config import settings, logger
+from src.metrics import (
+    CONCURRENCY_IN_FLIGHT,
+    CONCURRENCY_LIMIT,
+    CONCURRENCY_QUEUE_DEPTH,
+    CONCURRENCY_SHED,
+    UPSTREAM_RESILIENCE_EVENTS,
+)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The upstream did not answer before its deadline."""
+
+
+class CircuitOpenError(Exception):
+    """The upstream's circuit is open, so the call was not attempted."""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def request_budget(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound the upstream calls made within the block to a total of `seconds`.
+
+    Nested budgets can only shorten the deadline of the enclosing one.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current request budget, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class AttemptDeadline:
+    """The deadline of one attempt, in event loop time."""
+
+    def __init__(self, timeout: float):
+        self.at = asyncio.get_running_loop().time() + timeout
+        self.deferred = 0.0
+
+
+_attempt_deadline: ContextVar[Optional[AttemptDeadline]] = ContextVar(
+    "attempt_deadline", default=None
+)
+
+
+def defer_deadline(seconds: float) -> None:
+    """
+    Leave the next `seconds` out of the current attempt's deadline.
+
+    For waits before the upstream is called, such as for a rate limit token:
+    they say nothing about how fast the upstream answers, so only the
+    request budget bounds them.
+    """
+    deadline = _attempt_deadline.get()
+    if deadline is not None:
+        deadline.at += seconds
+        deadline.deferred += seconds
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now."""
+        if self.state == self.CLOSED:
+            return True
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            # Open, or a probe is already in flight.
+            return False
+        # Let one probe through; it decides whether the circuit closes. A
+        # probe that never reports back, e.g. because it was cancelled, is
+        # replaced by another one after the reset timeout.
+        self.state = self.HALF_OPEN
+        self.opened_at = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls."""
+
+    MIN_SAMPLES = 20
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        """The 95th percentile, or None until there are enough samples."""
+        if len(self._samples) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class Overloaded(Exception):
+    """The call was shed because the upstream's concurrency limit was reached."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_overload(error: BaseException) -> bool:
+    """Whether an upstream error means it is past its capacity or quota."""
+    if isinstance(error, DeadlineExceeded):
+        # The caller's budget ran out, which says nothing about the upstream.
+        return False
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return status == 429
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the calls in flight to an upstream, adjusting the limit with
+    AIMD: it grows by about one per limit's worth of healthy calls made
+    while the limit was in use, and is multiplied by `backoff` when a call
+    is rate limited or times out. The failures of calls that were already
+    in flight when the limit was cut do not cut it again.
+
+    Calls above the limit queue in FIFO order, and are shed with Overloaded
+    when the queue is full or they waited longer than max_wait_seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        backoff: float,
+        latency_target_seconds: float,
+        max_queue: int,
+        max_wait_seconds: float,
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_target_seconds = latency_target_seconds
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._started = 0
+        self._last_cut = 0
+        self._report()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self._acquire()
+        self._started += 1
+        call = self._started
+        start = time.monotonic()
+        outcome: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            outcome = e
+            raise
+        finally:
+            self._release(call, time.monotonic() - start, outcome)
+
+    async def _acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._shed("queue_full")
+
+        wait = self.max_wait_seconds
+        remaining = remaining_budget()
+        if remaining is not None:
+            wait = max(0.0, min(wait, remaining))
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._report()
+        try:
+            await asyncio.wait_for(waiter, wait)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended.
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._report()
+            if isinstance(e, asyncio.TimeoutError):
+                self._shed("timeout")
+            raise
+        self._report()
+
+    def _release(
+        self, call: int, latency: float, outcome: Optional[BaseException]
+    ) -> None:
+        self.in_flight -= 1
+        if outcome is None:
+            saturated = self.in_flight + 1 >= int(self.limit)
+            if saturated and latency <= self.latency_target_seconds:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        elif is_overload(outcome) and call > self._last_cut:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._last_cut = self._started
+            logger.warning(
+                f"Cut concurrency limit of '{self.name}' to {int(self.limit)} "
+                f"after {outcome!r}"
+            )
+        self._wake()
+        self._report()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _shed(self, reason: str) -> None:
+        CONCURRENCY_SHED.labels(upstream=self.name, reason=reason).inc()
+        raise Overloaded(
+            f"'{self.name}' is at its concurrency limit ({reason})",
+            retry_after=self.max_wait_seconds,
+        )
+
+    def _report(self) -> None:
+        CONCURRENCY_LIMIT.labels(upstream=self.name).set(int(self.limit))
+        CONCURRENCY_IN_FLIGHT.labels(upstream=self.name).set(self.in_flight)
+        CONCURRENCY_QUEUE_DEPTH.labels(upstream=self.name).set(len(self._waiters))
+
+
+class ResiliencePolicy:
+    # Errors that a retry would only repeat.
+    NON_RETRYABLE = (CircuitOpenError, Overloaded)
+    # Errors in the request or in this service's own code.
+    CALLER_ERRORS = (ValueError, TypeError)
+
+    def __init__(
+        self,
+        name: str,
+        timeout_seconds: float,
+        max_attempts: int,
+        backoff_seconds: float,
+        backoff_max_seconds: float,
+        hedge: bool,
+        breaker: CircuitBreaker,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ):
+        self.name = name
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge = hedge
+        self.breaker = breaker
+        self.limiter = limiter
+        self.latency = LatencyWindow()
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await fn() under this policy. fn is called once per attempt, so it
+        must start a fresh request every time.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            timeout = self._attempt_timeout()
+            if not self.breaker.allow():
+                self._record("circuit_open")
+                raise CircuitOpenError(f"Circuit for '{self.name}' is open")
+
+            try:
+                async with self.limited():
+                    # Time spent queued for a slot comes out of the budget.
+                    timeout = self._attempt_timeout()
+                    start = time.monotonic()
+                    deadline = AttemptDeadline(timeout)
+                    result = await self._attempt(fn, deadline, timeout)
+            except Overloaded:
+                # Shed before reaching the upstream, so it says nothing
+                # about the upstream's health.
+                raise
+            except self.CALLER_ERRORS:
+                # Neither do these, and a retry would only repeat them.
+                raise
+            except DeadlineExceeded:
+                # Attempts time out with a plain TimeoutError, so this is the
+                # request budget running out, while queued for a slot or for
+                # an upstream token: nothing is left to retry with.
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                if (
+                    isinstance(e, self.NON_RETRYABLE)
+                    or attempt == self.max_attempts
+                    or self.breaker.state == CircuitBreaker.OPEN
+                ):
+                    self._give_up(e, timeout)
+                delay = self._backoff(attempt)
+                remaining = remaining_budget()
+                if remaining is not None and remaining <= delay:
+                    self._give_up(e, timeout)
+                logger.warning(
+                    f"Call to '{self.name}' failed (attempt {attempt} of "
+                    f"{self.max_attempts}), retrying in {delay:.2f}s: {e!r}"
+                )
+                self._record("retry")
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            self.latency.record(time.monotonic() - start - deadline.deferred)
+            return result
+
+    def limited(self) -> AsyncContextManager[None]:
+        """Hold a slot of the upstream's concurrency limit, if it has one."""
+        return self.limiter.slot() if self.limiter else nullcontext()
+
+    def _attempt_timeout(self) -> float:
+        remaining = remaining_budget()
+        if remaining is None:
+            return self.timeout_seconds
+        if remaining <= 0:
+            raise DeadlineExceeded(f"No budget left to call '{self.name}'")
+        return min(self.timeout_seconds, remaining)
+
+    def _give_up(self, error: Exception, timeout: float) -> None:
+        if isinstance(error, asyncio.TimeoutError) and not isinstance(
+            error, DeadlineExceeded
+        ):
+            raise DeadlineExceeded(
+                f"'{self.name}' did not answer within {timeout:.2f}s"
+            ) from error
+        raise error
+
+    def _backoff(self, attempt: int) -> float:
+        cap = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+        return random.uniform(0, cap)
+
+    async def _attempt(
+        self, fn: Callable[[], Awaitable[T]], deadline: AttemptDeadline, timeout: float
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        hedge_after = self.latency.p95() if self.hedge else None
+        hedge = hedge_after is not None and hedge_after < timeout
+        pending = {self._start(fn, deadline)}
+
+        def next_step() -> float:
+            # The hedge is sent hedge_after into the attempt, measured like
+            # the deadline so that deferrals move both.
+            return deadline.at - timeout + hedge_after if hedge else deadline.at
+
+        try:
+            while True:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(next_step() - loop.time(), 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not pending:
+                    raise done.pop().exception()
+                if loop.time() < next_step():
+                    continue
+                if hedge:
+                    # The first request is slower than usual: send the second.
+                    self._record("hedge")
+                    pending.add(self._start(fn, deadline))
+                    hedge = False
+                else:
+                    raise asyncio.TimeoutError()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def _start(
+        fn: Callable[[], Awaitable[T]], deadline: AttemptDeadline
+    ) -> asyncio.Task:
+        """Start a request whose waits can defer the attempt's deadline."""
+        token = _attempt_deadline.set(deadline)
+        try:
+            return asyncio.ensure_future(fn())
+        finally:
+            _attempt_deadline.reset(token)
+
+    def _record(self, event: str) -> None:
+        UPSTREAM_RESILIENCE_EVENTS.labels(upstream=self.name, event=event).inc()
+
+
+_policies: Dict[str, ResiliencePolicy] = {}
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        settings.CIRCUIT_BREAKER_RESET_SECONDS,
+    )
+
+
+def source_policy(source: str) -> ResiliencePolicy:
+    """The shared policy for calls to a paper source."""
+    if source not in _policies:
+        _policies[source] = ResiliencePolicy(
+            source,
+            timeout_seconds=settings.SOURCE_TIMEOUT_SECONDS,
+            max_attempts=settings.SOURCE_MAX_ATTEMPTS,
+            backoff_seconds=settings.UPSTREAM_RETRY_BACKOFF_SECONDS,
+            backoff_max_seconds=settings.UPSTREAM_RETRY_BACKOFF_MAX_SECONDS,
+            hedge=settings.SOURCE_HEDGE_ENABLED,
+            breaker=_breaker(),
+        )
+    return _policies[source]
+
+
+def summarizer_policy(summarizer: str) -> ResiliencePolicy:
+    """The shared policy for calls to a remote summarizer model."""
+    if summarizer not in _policies:
+        _policies[summarizer] = ResiliencePolicy(
+            summarizer,
+            timeout_seconds=settings.SUMMARIZER_TIMEOUT_SECONDS,
+            max_attempts=settings.SUMMARIZER_MAX_ATTEMPTS,
+            backoff_seconds=settings.UPSTREAM_RETRY_BACKOFF_SECONDS,
+            backoff_max_seconds=settings.UPSTREAM_RETRY_BACKOFF_MAX_SECONDS,
+            hedge=settings.SUMMARIZER_HEDGE_ENABLED,
+            breaker=_breaker(),
+            limiter=AdaptiveConcurrencyLimiter(
+                summarizer,
+                initial_limit=settings.SUMMARIZER_CONCURRENCY_INITIAL,
+                min_limit=settings.SUMMARIZER_CONCURRENCY_MIN,
+                max_limit=settings.SUMMARIZER_CONCURRENCY_MAX,
+                backoff=settings.SUMMARIZER_CONCURRENCY_BACKOFF,
+                latency_target_seconds=settings.SUMMARIZER_LATENCY_TARGET_SECONDS,
+                max_queue=settings.SUMMARIZER_QUEUE_MAX,
+                max_wait_seconds=settings.SUMMARIZER_QUEUE_MAX_WAIT_SECONDS,
+            ),
+        )
+    return _policies[summarizer]
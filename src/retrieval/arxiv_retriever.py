@@ -1,14 +1,65 @@
-from src.retrieval.base import PaperSource
+from src.retrieval.base import BlockingPaperSource
 import arxiv
-from typing import List
+import threading
+from typing import Dict, Iterator, List
+from src.config import settings
 from src.models.paper import Paper
+from src.retrieval.normalize import collapse_whitespace
+from src.tracing import traced
 
 
-class ArxivSource(PaperSource):
+class ArxivSource(BlockingPaperSource):
+    """
+    Searches arXiv through long-lived clients, which keep their HTTP
+    connections open between searches.
+
+    The client requests a whole page per API call, so searches for fewer
+    papers than ARXIV_PAGE_SIZE use a client with a smaller page: the
+    smallest of ARXIV_PAGE_SIZE_BUCKETS that holds them. Each bucket has one
+    client.
+
+    The clients wait delay_seconds between their requests; a source paced
+    by a governor passes 0.
+    """
+
+    def __init__(self, delay_seconds: float = settings.ARXIV_DELAY_SECONDS):
+        self.delay_seconds = delay_seconds
+        self._clients: Dict[int, arxiv.Client] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def page_size(max_results: int) -> int:
+        for size in sorted(settings.ARXIV_PAGE_SIZE_BUCKETS):
+            if max_results <= size < settings.ARXIV_PAGE_SIZE:
+                return size
+        return settings.ARXIV_PAGE_SIZE
+
+    def client(self, page_size: int) -> arxiv.Client:
+        with self._lock:
+            if page_size not in self._clients:
+                self._clients[page_size] = arxiv.Client(
+                    page_size=page_size,
+                    delay_seconds=self.delay_seconds,
+                    num_retries=settings.ARXIV_NUM_RETRIES,
+                )
+            return self._clients[page_size]
+
+    @traced
     def fetch_papers(self, topic: str, max_results: int = 5) -> List[Paper]:
         """
         Fetches recent papers from arXiv matching the topic.
         """
+        return [
+            paper for page in self.iter_papers(topic, max_results) for paper in page
+        ]
+
+    def iter_papers(self, topic: str, max_results: int = 5) -> Iterator[List[Paper]]:
+        """
+        Yields recent papers from arXiv matching the topic, one API page at a
+        time. The next page is only requested once the previous one has been
+        consumed.
+        """
+        page_size = self.page_size(max_results)
         search = arxiv.Search(
             query=topic,
             max_results=max_results,
@@ -16,15 +67,19 @@ class ArxivSource(PaperSource):
             sort_order=arxiv.SortOrder.Descending,
         )
 
-        papers = []
-        for result in search.results():
-            paper = Paper(
-                title=result.title,
-                abstract=result.summary.strip().replace("\n", " "),
-                url=result.entry_id,
-                authors=[author.name for author in result.authors],
-                published_date=result.published.strftime("%Y-%m-%d"),
+        page = []
+        for result in self.client(page_size).results(search):
+            page.append(
+                Paper(
+                    title=collapse_whitespace(result.title),
+                    abstract=collapse_whitespace(result.summary),
+                    url=result.entry_id,
+                    authors=[author.name for author in result.authors],
+                    published_date=result.published.strftime("%Y-%m-%d"),
+                )
             )
-            papers.append(paper)
-
-        return papers
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
@@ -1,10 +1,56 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, Iterator, List
 from src.models.paper import Paper
 
 
 class PaperSource(ABC):
+    """
+    A source of papers, searched from the event loop. Sources backed by a
+    blocking client derive from BlockingPaperSource instead.
+    """
+
+    @abstractmethod
+    async def fetch_papers_async(self, topic: str, max_results: int = 5) -> List[Paper]:
+        pass
+
+    async def iter_papers_async(
+        self, topic: str, max_results: int = 5
+    ) -> AsyncIterator[List[Paper]]:
+        """
+        Yield the papers page by page. Sources whose API is paginated should
+        override this to fetch each page only when it is needed.
+        """
+        yield await self.fetch_papers_async(topic, max_results)
+
+
+class BlockingPaperSource(PaperSource):
+    """
+    A source backed by a blocking client. It implements fetch_papers, and is
+    searched from the event loop through worker threads.
+    """
 
     @abstractmethod
     def fetch_papers(self, topic: str, max_results: int = 5) -> List[Paper]:
         pass
+
+    async def fetch_papers_async(self, topic: str, max_results: int = 5) -> List[Paper]:
+        return await asyncio.to_thread(self.fetch_papers, topic, max_results)
+
+    def iter_papers(self, topic: str, max_results: int = 5) -> Iterator[List[Paper]]:
+        """
+        Yield the papers page by page. Sources whose API is paginated should
+        override this to fetch each page only when it is needed.
+        """
+        yield self.fetch_papers(topic, max_results)
+
+    async def iter_papers_async(
+        self, topic: str, max_results: int = 5
+    ) -> AsyncIterator[List[Paper]]:
+        """Async variant of iter_papers, fetching each page in a worker thread."""
+        pages = self.iter_papers(topic, max_results)
+        while True:
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                return
+            yield page
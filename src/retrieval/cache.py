@@ -0,0 +1,260 @@
+import asyncio
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.config import logger
+from src.database.models import SearchCacheEntry
+from src.metrics import SEARCH_CACHE_LOOKUPS, SEARCH_CACHE_REFRESHES
+from src.models.paper import Paper
+
+
+@dataclass
+class CacheEntry:
+    papers: List[Paper]
+    fetched_at: float
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+
+class SearchCacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        pass
+
+    async def set_many(self, entries: Dict[str, CacheEntry]) -> None:
+        """Store several entries. Backends should override this to store them
+        at once."""
+        for key, entry in entries.items():
+            await self.set(key, entry)
+
+
+class InMemorySearchCache(SearchCacheBackend):
+    """Per-process LRU cache bounded to max_entries."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class PostgresSearchCache(SearchCacheBackend):
+    """
+    Cache stored in the search_cache table, shared by every worker and
+    replica. Least recently used entries beyond max_entries are pruned
+    whenever new entries are written.
+
+    Reads only record the access when the recorded one is older than
+    touch_interval_seconds, so that hits stay read-only most of the time;
+    the LRU order is that coarse.
+    """
+
+    def __init__(
+        self, session_factory, max_entries: int, touch_interval_seconds: float = 60
+    ):
+        self.session_factory = session_factory
+        self.max_entries = max_entries
+        self.touch_interval_seconds = touch_interval_seconds
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(
+                    SearchCacheEntry.papers,
+                    SearchCacheEntry.fetched_at,
+                    SearchCacheEntry.accessed_at,
+                ).where(SearchCacheEntry.key == key)
+            )
+            row = result.first()
+            if row is None:
+                return None
+            now = datetime.now(timezone.utc)
+            if (now - row.accessed_at).total_seconds() >= self.touch_interval_seconds:
+                await db.execute(
+                    update(SearchCacheEntry)
+                    .where(SearchCacheEntry.key == key)
+                    .values(accessed_at=now)
+                )
+                await db.commit()
+        return CacheEntry(
+            papers=[Paper.model_validate(paper) for paper in row.papers],
+            fetched_at=row.fetched_at.timestamp(),
+        )
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await self.set_many({key: entry})
+
+    async def set_many(self, entries: Dict[str, CacheEntry]) -> None:
+        """Store the entries and prune the cache in a single transaction."""
+        if not entries:
+            return
+        now = datetime.now(timezone.utc)
+        stmt = insert(SearchCacheEntry).values(
+            [
+                {
+                    "key": key,
+                    "papers": [paper.model_dump() for paper in entry.papers],
+                    "fetched_at": datetime.fromtimestamp(
+                        entry.fetched_at, timezone.utc
+                    ),
+                    "accessed_at": now,
+                }
+                for key, entry in entries.items()
+            ]
+        )
+        async with self.session_factory() as db:
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["key"],
+                    set_={
+                        "papers": stmt.excluded.papers,
+                        "fetched_at": stmt.excluded.fetched_at,
+                        "accessed_at": stmt.excluded.accessed_at,
+                    },
+                )
+            )
+            evicted = (
+                select(SearchCacheEntry.key)
+                .order_by(SearchCacheEntry.accessed_at.desc())
+                .offset(self.max_entries)
+                .scalar_subquery()
+            )
+            await db.execute(
+                delete(SearchCacheEntry).where(SearchCacheEntry.key.in_(evicted))
+            )
+            await db.commit()
+
+
+def make_cache_key(source: str, topic: str, max_results: int) -> str:
+    normalized_topic = re.sub(r"\s+", " ", topic.strip().lower())
+    return f"{source.strip().lower()}|{max_results}|{normalized_topic}"
+
+
+class SearchCache:
+    """
+    Serves search results from a backend for ttl seconds. For a further
+    stale_ttl seconds, stale results are still served while a refresh runs
+    in the background; after that the search is a miss.
+    """
+
+    def __init__(
+        self,
+        backend: SearchCacheBackend,
+        ttl: float,
+        stale_ttl: float = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def fetch(
+        self,
+        source: str,
+        topic: str,
+        max_results: int,
+        loader: Callable[[], Awaitable[List[Paper]]],
+    ) -> List[Paper]:
+        key = make_cache_key(source, topic, max_results)
+        entry = await self.backend.get(key)
+        if entry is not None:
+            age = self.clock() - entry.fetched_at
+            if age < self.ttl:
+                self.stats.hits += 1
+                SEARCH_CACHE_LOOKUPS.labels(result="hit").inc()
+                return entry.papers
+            if age < self.ttl + self.stale_ttl:
+                self.stats.stale_hits += 1
+                SEARCH_CACHE_LOOKUPS.labels(result="stale").inc()
+                self._schedule_refresh(key, loader)
+                return entry.papers
+
+        self.stats.misses += 1
+        SEARCH_CACHE_LOOKUPS.labels(result="miss").inc()
+        return await self._load(key, loader)
+
+    async def prime(
+        self, source: str, topic: str, max_results: int, papers: List[Paper]
+    ) -> None:
+        """
+        Store freshly fetched results for every max_results up to the given
+        one. Results are sorted newest first, so a prefix of a larger search
+        is the answer to the smaller one.
+        """
+        fetched_at = self.clock()
+        await self.backend.set_many(
+            {
+                make_cache_key(source, topic, n): CacheEntry(
+                    papers=papers[:n], fetched_at=fetched_at
+                )
+                for n in range(1, max_results + 1)
+            }
+        )
+
+    async def _load(
+        self, key: str, loader: Callable[[], Awaitable[List[Paper]]]
+    ) -> List[Paper]:
+        papers = await loader()
+        await self.backend.set(key, CacheEntry(papers=papers, fetched_at=self.clock()))
+        return papers
+
+    def _schedule_refresh(
+        self, key: str, loader: Callable[[], Awaitable[List[Paper]]]
+    ) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, loader))
+        # Keep a reference so the task is not garbage collected mid-flight.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(
+        self, key: str, loader: Callable[[], Awaitable[List[Paper]]]
+    ) -> None:
+        try:
+            await self._load(key, loader)
+            self.stats.refreshes += 1
+            SEARCH_CACHE_REFRESHES.labels(outcome="refreshed").inc()
+        except Exception as e:
+            self.stats.refresh_errors += 1
+            SEARCH_CACHE_REFRESHES.labels(outcome="error").inc()
+            logger.error(f"Background refresh of search '{key}' failed: {e}")
+        finally:
+            self._refreshing.discard(key)
@@ -1,18 +1,114 @@
-from typing import List
+from typing import AsyncIterator, List
 
+from src.config import settings
+from src.database.connection import AsyncSessionLocal
+from src.metrics import observe_source_fetch
 from src.models.paper import Paper
 from src.retrieval.arxiv_retriever import ArxivSource
+from src.resilience import source_policy
+from src.retrieval.cache import (
+    InMemorySearchCache,
+    PostgresSearchCache,
+    SearchCache,
+    SearchCacheBackend,
+    make_cache_key,
+)
+from src.retrieval.governor import governed
+from src.retrieval.local import LocalSource, hybrid
+from src.services.singleflight import SingleFlight
 
 
+# The governor spaces the requests of every process, so the client need not.
+arxiv_delay_seconds = (
+    0 if settings.SOURCE_RATE_LIMIT_ENABLED else settings.ARXIV_DELAY_SECONDS
+)
 SOURCES = {
-    "arxiv": ArxivSource(),
+    "arxiv": governed("arxiv", ArxivSource(arxiv_delay_seconds)),
+    "local": LocalSource(AsyncSessionLocal),
 }
+SOURCES["hybrid"] = hybrid(SOURCES["local"], SOURCES["arxiv"])
 
+# Source fetches in flight in this process, keyed like the search cache.
+source_flights = SingleFlight()
 
-def fetch_papers(
+
+def build_search_cache_backend() -> SearchCacheBackend:
+    if settings.SEARCH_CACHE_BACKEND == "memory":
+        return InMemorySearchCache(settings.SEARCH_CACHE_MAX_ENTRIES)
+    if settings.SEARCH_CACHE_BACKEND == "postgres":
+        return PostgresSearchCache(
+            AsyncSessionLocal,
+            settings.SEARCH_CACHE_MAX_ENTRIES,
+            settings.SEARCH_CACHE_TOUCH_SECONDS,
+        )
+    raise ValueError(f"Unknown search cache backend '{settings.SEARCH_CACHE_BACKEND}'")
+
+
+search_cache = SearchCache(
+    build_search_cache_backend(),
+    ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+    stale_ttl=settings.SEARCH_CACHE_STALE_SECONDS,
+)
+
+
+async def fetch_papers(
     topic: str, max_results: int = 5, source: str = "arxiv"
 ) -> List[Paper]:
     if source not in SOURCES:
         raise ValueError(f"Unknown source '{source}'")
 
-    return SOURCES[source].fetch_papers(topic, max_results)
+    async def load() -> List[Paper]:
+        return await fetch_from_source(source, topic, max_results)
+
+    if not settings.SEARCH_CACHE_ENABLED:
+        return await load()
+    return await search_cache.fetch(source, topic, max_results, load)
+
+
+def fetch_paper_pages(
+    topic: str, max_results: int, source: str = "arxiv"
+) -> AsyncIterator[List[Paper]]:
+    """
+    Return an iterator over the search results, page by page, fetching each
+    page only once the previous one has been consumed.
+
+    Result streams are meant for large result sets, so they bypass the
+    search cache and are not retried: a page that fails ends the stream.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source '{source}'")
+
+    async def pages() -> AsyncIterator[List[Paper]]:
+        source_pages = SOURCES[source].iter_papers_async(topic, max_results)
+        try:
+            while True:
+                async with observe_source_fetch(source):
+                    page = await anext(source_pages, None)
+                if page is None:
+                    return
+                yield page
+        finally:
+            await source_pages.aclose()
+
+    return pages()
+
+
+async def fetch_from_source(source: str, topic: str, max_results: int) -> List[Paper]:
+    """
+    Fetch from the source itself, under its resilience policy.
+
+    Concurrent identical searches in this process, up to case and whitespace
+    in the topic as in the search cache, share one fetch, which keeps the
+    priority and request budget of the caller that started it. The callers
+    that join it make no attempts of their own, so its time in the rate
+    governor's queue never counts against their attempt deadlines.
+    """
+
+    async def attempt() -> List[Paper]:
+        async with observe_source_fetch(source):
+            return await SOURCES[source].fetch_papers_async(topic, max_results)
+
+    async def search() -> List[Paper]:
+        return await source_policy(source).call(attempt)
+
+    return await source_flights.do(make_cache_key(source, topic, max_results), search)
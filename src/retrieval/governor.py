@@ -0,0 +1,221 @@
+"""
+Rate governor shared by every worker process on a host.
+
+arXiv asks clients to leave about three seconds between requests. Each
+uvicorn worker and the harvester run their own event loop, so the token
+bucket that spaces requests lives in a small state file guarded by an
+exclusive file lock, which every process on the host opens.
+
+Requests are queued rather than rejected: an interactive request takes the
+next token even when that leaves the bucket in debt, and sleeps until its
+slot comes up. Background requests, such as harvests, only take a token
+that is available now, so they wait until no interactive request is queued
+ahead of them, in any process.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import AsyncIterator, Callable, Iterator, List, Tuple
+
+from src.config import settings
+from src.metrics import SOURCE_QUEUE_SECONDS
+from src.models.paper import Paper
+from src.resilience import DeadlineExceeded, defer_deadline, remaining_budget
+from src.retrieval.base import PaperSource
+
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+_priority: ContextVar[Priority] = ContextVar("priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Let upstream requests made within the block yield to interactive ones."""
+    token = _priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+class FileTokenBucket:
+    """
+    Token bucket whose state is kept in a file, so that every process that
+    opens the same path draws from the same bucket.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+
+    def take(self, allow_debt: bool) -> Tuple[bool, float]:
+        """
+        Try to take a token. Returns whether it was taken and how many
+        seconds to wait: before using the token when it was taken, or before
+        trying again when it was not.
+
+        With allow_debt, the token is always taken, and the wait grows with
+        the number of requests already queued for a token.
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = self.clock()
+            tokens = self._refill(self._read(fd), now)
+            if tokens >= 1 or allow_debt:
+                tokens -= 1
+                taken = True
+            else:
+                taken = False
+            self._write(fd, tokens, now)
+        finally:
+            # Closing the descriptor releases the lock.
+            os.close(fd)
+        wait = max(0.0, -tokens / self.rate) if taken else (1 - tokens) / self.rate
+        return taken, wait
+
+    def refund(self) -> None:
+        """Return a token that was taken but not used."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = self.clock()
+            tokens = self._refill(self._read(fd), now)
+            self._write(fd, min(self.capacity, tokens + 1), now)
+        finally:
+            os.close(fd)
+
+    def _refill(self, state: dict, now: float) -> float:
+        if not state:
+            return self.capacity
+        elapsed = max(0.0, now - state["updated"])
+        return min(self.capacity, state["tokens"] + elapsed * self.rate)
+
+    @staticmethod
+    def _read(fd: int) -> dict:
+        os.lseek(fd, 0, os.SEEK_SET)
+        raw = os.read(fd, 4096)
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            # A torn or foreign file resets the bucket rather than wedging it.
+            return {}
+
+    @staticmethod
+    def _write(fd: int, tokens: float, now: float) -> None:
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, json.dumps({"tokens": tokens, "updated": now}).encode())
+
+
+class UpstreamGovernor:
+    def __init__(self, name: str, bucket: FileTokenBucket):
+        self.name = name
+        self.bucket = bucket
+
+    async def acquire(self) -> None:
+        """
+        Wait for this process's turn to send a request upstream.
+
+        The wait is left out of the deadline of the resilience policy attempt
+        it is made in, but not out of the request budget: a token that would
+        come after the budget runs out is given back, and so is the token of
+        a caller cancelled while waiting for its slot.
+        """
+        priority = current_priority()
+        start = time.perf_counter()
+        while True:
+            # The file lock may be held by another process; wait for it in
+            # a worker thread rather than on the event loop.
+            taken, wait = await asyncio.to_thread(
+                self.bucket.take, priority == Priority.INTERACTIVE
+            )
+            if wait > 0:
+                try:
+                    remaining = remaining_budget()
+                    if remaining is not None and wait > remaining:
+                        raise DeadlineExceeded(
+                            f"No budget left to wait for a '{self.name}' token"
+                        )
+                    defer_deadline(wait)
+                    await asyncio.sleep(wait)
+                except BaseException:
+                    if taken:
+                        await asyncio.shield(asyncio.to_thread(self.bucket.refund))
+                    raise
+            if taken:
+                break
+        SOURCE_QUEUE_SECONDS.labels(source=self.name, priority=priority.value).observe(
+            time.perf_counter() - start
+        )
+
+
+class GovernedSource(PaperSource):
+    """
+    Sends the requests of a source through a governor. Identical concurrent
+    searches share one request before they get here, in fetch_from_source.
+
+    When iterating page by page, every page waits for a token of its own.
+    Iteration stops once max_results papers have arrived, rather than
+    spending a token to learn that the source has no more.
+    """
+
+    def __init__(self, source: PaperSource, governor: UpstreamGovernor):
+        self.source = source
+        self.governor = governor
+
+    async def fetch_papers_async(self, topic: str, max_results: int = 5) -> List[Paper]:
+        await self.governor.acquire()
+        return await self.source.fetch_papers_async(topic, max_results)
+
+    async def iter_papers_async(
+        self, topic: str, max_results: int = 5
+    ) -> AsyncIterator[List[Paper]]:
+        pages = self.source.iter_papers_async(topic, max_results)
+        fetched = 0
+        try:
+            while fetched < max_results:
+                await self.governor.acquire()
+                page = await anext(pages, None)
+                if page is None:
+                    return
+                fetched += len(page)
+                yield page
+        finally:
+            await pages.aclose()
+
+
+def governed(name: str, source: PaperSource) -> PaperSource:
+    """Wrap a source in the shared governor, unless rate limiting is off."""
+    if not settings.SOURCE_RATE_LIMIT_ENABLED:
+        return source
+    bucket = FileTokenBucket(
+        os.path.join(
+            settings.SOURCE_RATE_STATE_DIR, f"arxiv-summarizer-{name}-rate.json"
+        ),
+        rate=settings.SOURCE_REQUESTS_PER_SECOND,
+        capacity=settings.SOURCE_RATE_BURST,
+    )
+    return GovernedSource(source, UpstreamGovernor(name, bucket))
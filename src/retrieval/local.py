@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+from typing import AsyncIterator, List, Optional
+
+from src.config import logger, settings
+from src.database.repositories import search_papers
+from src.metrics import HYBRID_SEARCHES
+from src.models.paper import Paper
+from src.retrieval.base import PaperSource
+
+
+class LocalSource(PaperSource):
+    """
+    Searches the papers already stored, through the full-text index over
+    their titles and abstracts.
+
+    Topics are read as web search queries ("quoted phrases", or, -excluded),
+    so arXiv field prefixes such as cat: match as plain words.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    async def fetch_papers_async(self, topic: str, max_results: int = 5) -> List[Paper]:
+        async with self.session_factory() as db:
+            db_papers = await search_papers(db, topic, max_results)
+        return [Paper.model_validate(db_paper) for db_paper in db_papers]
+
+
+class HybridSource(PaperSource):
+    """
+    Answers from stored papers when they are enough to fill the request and
+    the newest of them is at most max_age old, and from the remote source
+    otherwise.
+    """
+
+    def __init__(self, local: PaperSource, remote: PaperSource, max_age: timedelta):
+        self.local = local
+        self.remote = remote
+        self.max_age = max_age
+
+    async def fetch_papers_async(self, topic: str, max_results: int = 5) -> List[Paper]:
+        papers = await self._local_papers(topic, max_results)
+        if papers is not None:
+            return papers
+        return await self.remote.fetch_papers_async(topic, max_results)
+
+    async def iter_papers_async(
+        self, topic: str, max_results: int = 5
+    ) -> AsyncIterator[List[Paper]]:
+        papers = await self._local_papers(topic, max_results)
+        if papers is not None:
+            yield papers
+            return
+        pages = self.remote.iter_papers_async(topic, max_results)
+        try:
+            async for page in pages:
+                yield page
+        finally:
+            await pages.aclose()
+
+    async def _local_papers(
+        self, topic: str, max_results: int
+    ) -> Optional[List[Paper]]:
+        """The stored papers answering the search, or None to go remote."""
+        try:
+            papers = await self.local.fetch_papers_async(topic, max_results)
+        except Exception as e:
+            logger.warning(
+                f"Local search for '{topic}' failed, searching remotely: {e}"
+            )
+            HYBRID_SEARCHES.labels(outcome="local_error").inc()
+            return None
+
+        if len(papers) < max_results:
+            outcome = "too_few"
+        elif self._is_stale(papers):
+            outcome = "stale"
+        else:
+            HYBRID_SEARCHES.labels(outcome="local").inc()
+            return papers
+        HYBRID_SEARCHES.labels(outcome=outcome).inc()
+        return None
+
+    def _is_stale(self, papers: List[Paper]) -> bool:
+        newest = max(date.fromisoformat(paper.published_date) for paper in papers)
+        return date.today() - newest > self.max_age
+
+
+def hybrid(local: PaperSource, remote: PaperSource) -> HybridSource:
+    return HybridSource(local, remote, timedelta(days=settings.HYBRID_MAX_AGE_DAYS))
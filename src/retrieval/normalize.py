@@ -0,0 +1,58 @@
+"""
+Normalization of arXiv metadata, shared by the live source and the bulk
+snapshot ingestion so that both store papers in the same form.
+"""
+
+import re
+from datetime import date
+from email.utils import parsedate_to_datetime
+from typing import Iterable, List, Optional
+
+ARXIV_ABS_URL = "http://arxiv.org/abs/"
+# New style ids (2401.01234) and old style ids (hep-th/9901001), with an
+# optional version, in abstract or PDF URLs.
+ARXIV_URL_ID = re.compile(
+    r"arxiv\.org/(?:abs|pdf)/([a-z\-]+(?:\.[A-Z]{2})?/\d{7}|\d{4}\.\d{4,5})"
+    r"(?:v\d+)?(?:\.pdf)?$",
+    re.IGNORECASE,
+)
+
+
+def collapse_whitespace(text: str) -> str:
+    """Join the lines of a title or abstract and squeeze runs of spaces."""
+    return " ".join(text.split())
+
+
+def arxiv_url(arxiv_id: str, version: str = "") -> str:
+    """The abstract page URL, in the form the arXiv API uses as entry id."""
+    return f"{ARXIV_ABS_URL}{arxiv_id}{version}"
+
+
+def canonical_arxiv_id(url: str) -> Optional[str]:
+    """The arXiv id of a paper URL without its version, shared by all versions."""
+    match = ARXIV_URL_ID.search(url)
+    return match.group(1) if match else None
+
+
+def author_name(forenames: str, keyname: str, suffix: str = "") -> str:
+    """Full author name, as the arXiv API spells it, e.g. "C. Balázs Jr"."""
+    return collapse_whitespace(f"{forenames} {keyname} {suffix}")
+
+
+def split_authors(authors: str) -> List[str]:
+    """Split a free-text author list such as "A. One, B. Two and C. Three"."""
+    names: Iterable[str] = (
+        part
+        for chunk in collapse_whitespace(authors).split(",")
+        for part in chunk.split(" and ")
+    )
+    return [name.strip() for name in names if name.strip()]
+
+
+def parse_arxiv_date(value: str) -> date:
+    """Parse the ISO or RFC 2822 dates found in arXiv metadata."""
+    value = value.strip()
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return parsedate_to_datetime(value).date()
@@ -0,0 +1,129 @@
+import asyncio
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings, logger
+from src.database.repositories import (
+    create_summary_job,
+    get_paper_by_id,
+    get_summary,
+    get_summary_job,
+)
+from src.metrics import SUMMARY_CACHE_LOOKUPS
+from src.models.job import JobStatus, SummaryJob
+from src.models.knowledge_level import KnowledgeLevel
+from src.models.paper import PaperSummary
+from src.processing.summarizer import Summarizer
+from src.services.paper_service import PaperService
+
+
+class JobEvents:
+    """
+    In-process signals between request handlers and job workers. They only
+    shorten waits; workers and waiters in other processes fall back to
+    polling the database.
+    """
+
+    def __init__(self):
+        self._submitted = asyncio.Event()
+        self._finished: Dict[str, Set[asyncio.Event]] = {}
+
+    def job_submitted(self) -> None:
+        self._submitted.set()
+
+    async def wait_for_submission(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._submitted.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._submitted.clear()
+
+    def job_finished(self, job_id: str) -> None:
+        for event in self._finished.get(job_id, ()):
+            event.set()
+
+    async def wait_for_job(self, job_id: str, timeout: float) -> None:
+        event = asyncio.Event()
+        self._finished.setdefault(job_id, set()).add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._finished[job_id]
+            waiters.discard(event)
+            if not waiters:
+                del self._finished[job_id]
+
+
+job_events = JobEvents()
+
+TERMINAL_JOB_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class JobService:
+    @staticmethod
+    async def submit_summary_job(
+        db: AsyncSession,
+        db_paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+    ) -> Tuple[Optional[SummaryJob], Optional[PaperSummary]]:
+        """
+        Queue the generation of a summary. Returns the cached summary instead
+        when there is one, so no job is needed.
+        """
+        cached = await PaperService.cached_summary(
+            db, db_paper, knowledge_level, summarizer
+        )
+        if cached is not None:
+            SUMMARY_CACHE_LOOKUPS.labels(result="hit").inc()
+            logger.info("Returning cached summary instead of queueing a job.")
+            return None, PaperService.to_paper_summary(db_paper, cached)
+        SUMMARY_CACHE_LOOKUPS.labels(result="miss").inc()
+
+        db_job = await create_summary_job(
+            db,
+            {
+                "paper_id": db_paper.id,
+                "knowledge_level": knowledge_level.value,
+                "summarizer": summarizer.value,
+            },
+        )
+        job_events.job_submitted()
+        logger.info(f"Queued summary job {db_job.id} for paper_id={db_paper.id}")
+        return SummaryJob.model_validate(db_job), None
+
+    @staticmethod
+    async def get_job(
+        db: AsyncSession, job_id: str, wait: float = 0
+    ) -> Optional[SummaryJob]:
+        """
+        Return the job, waiting up to `wait` seconds for it to finish.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while True:
+            db_job = await get_summary_job(db, job_id)
+            if db_job is None:
+                return None
+            job = SummaryJob.model_validate(db_job)
+            remaining = deadline - loop.time()
+            if job.status in TERMINAL_JOB_STATUSES or remaining <= 0:
+                break
+            # End the read transaction so the connection is not held while
+            # waiting.
+            await db.rollback()
+            await job_events.wait_for_job(
+                job_id, min(remaining, settings.JOBS_POLL_SECONDS)
+            )
+
+        if job.status == JobStatus.SUCCEEDED:
+            db_paper = await get_paper_by_id(db, db_job.paper_id)
+            summary = await get_summary(
+                db, db_job.paper_id, db_job.knowledge_level, db_job.summarizer
+            )
+            if db_paper is not None and summary is not None:
+                job.result = PaperService.to_paper_summary(db_paper, summary.summary)
+        return job
@@ -1,54 +1,124 @@
-from src.database.connection import SessionLocal
+from src.database.connection import AsyncSessionLocal
 from src.database.repositories import (
-    get_paper_by_url,
-    create_paper,
+    get_paper_by_id,
+    get_papers_by_ids,
+    upsert_papers,
     get_summary,
+    get_summary_by_key,
+    get_summary_candidates,
+    get_summaries_by_keys,
+    get_summaries_for_papers,
     create_summary,
+    create_summaries,
+    create_summary_job,
+    get_summary_text,
+    get_summary_texts,
+    get_summary_texts_by_keys,
+    insert_summary,
+    insert_summaries,
+    summary_connection,
+    touch_summaries,
 )
-from src.models.paper import Paper, PaperSummary
+from src.metrics import SUMMARY_CACHE_LOOKUPS, UPSTREAM_RESILIENCE_EVENTS
+from src.models.paper import Paper, PaperSummary, RelatedPaper
 
 from src.models.knowledge_level import KnowledgeLevel
-from src.processing.summarizer import summarize_paper
-from typing import List
-from src.config import logger
+from src.processing.batcher import summary_batcher
+from src.processing.summarizer import (
+    Summarizer,
+    is_local,
+    is_upstream_failure,
+    summary_key,
+    summary_version,
+    summarize_paper,
+    summarize_papers,
+    summarize_paper_all_levels,
+    summarize_paper_stream,
+)
+from src.retrieval.normalize import canonical_arxiv_id
+from src.services.singleflight import SingleFlight
+from src.similarity.index import similarity_index
+from src.similarity.minhash import band_hashes, jaccard
+from src.tracing import traced
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+from src.config import settings, logger
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from sqlalchemy.orm import Session
+# Summary generations currently in flight in this process, keyed by the
+# content key of the summary.
+summary_flights = SingleFlight()
 
+# Stands in for the knowledge level in the keys of multi-level generations.
+ALL_LEVELS = "all"
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         logger.debug("Creating new database session.")
         yield db
-    finally:
         logger.debug("Closing database session.")
-        db.close()
 
 
 class PaperService:
     @staticmethod
-    def get_or_create_paper(db: Session, paper: Paper):
-        logger.info(f"Looking up paper in DB: {paper.title}")
-        db_paper = get_paper_by_url(db, paper.url)
-        if not db_paper:
-            logger.info(f"Paper not found, creating new entry: {paper.title}")
-            db_paper = create_paper(
-                db,
-                {
-                    "title": paper.title,
-                    "abstract": paper.abstract,
-                    "url": paper.url,
-                    "authors": ",".join(paper.authors),
-                    "published_date": paper.published_date,
-                },
+    async def get_paper(db: AsyncSession, paper_id: int):
+        return await get_paper_by_id(db, paper_id)
+
+    @staticmethod
+    @traced
+    async def get_related_papers(
+        db: AsyncSession, db_paper, k: int
+    ) -> List[RelatedPaper]:
+        """
+        The k stored papers most similar to the paper, most similar first.
+        Papers stored in the last SIMILARITY_REFRESH_SECONDS may not be
+        indexed yet.
+        """
+        ranked = await asyncio.to_thread(
+            similarity_index.related,
+            (db_paper.id, db_paper.title, db_paper.abstract),
+            k,
+        )
+        scores = dict(ranked)
+        related = await get_papers_by_ids(db, [paper_id for paper_id, _ in ranked])
+        return [
+            RelatedPaper(
+                **Paper.model_validate(paper).model_dump(),
+                id=paper.id,
+                score=scores[paper.id],
             )
+            for paper in related
+        ]
+
+    @staticmethod
+    @traced
+    async def get_or_create_paper(db: AsyncSession, paper: Paper):
+        """
+        Return the stored row of the paper, inserting it if missing. The
+        insert skips a row stored concurrently and reads it back instead, so
+        simultaneous first requests for a paper all get the same row.
+        """
+        logger.info(f"Looking up paper in DB: {paper.title}")
+        [db_paper] = await upsert_papers(db, [PaperService._to_paper_row(paper)])
         return db_paper
 
     @staticmethod
-    def get_papers_and_store(db: Session, papers: List[Paper]):
+    @traced
+    async def store_papers(db: AsyncSession, papers: List[Paper]):
+        """Return the DB rows for the papers, inserting the missing ones."""
+        return await upsert_papers(
+            db, [PaperService._to_paper_row(paper) for paper in papers]
+        )
+
+    @staticmethod
+    @traced
+    async def get_papers_and_store(db: AsyncSession, papers: List[Paper]):
+        db_papers = await PaperService.store_papers(db, papers)
         stored_papers = []
-        for paper in papers:
-            db_paper = PaperService.get_or_create_paper(db, paper)
+        for db_paper in db_papers:
             stored_paper = Paper.model_validate(db_paper)
             stored_paper.authors = db_paper.authors.split(",")
             stored_papers.append(stored_paper)
@@ -56,37 +126,720 @@ class PaperService:
         return stored_papers
 
     @staticmethod
-    def get_or_create_summary(
-        db: Session, db_paper, paper: Paper, knowledge_level: KnowledgeLevel
+    async def stream_and_store_papers(
+        pages: AsyncIterator[List[Paper]],
+    ) -> AsyncIterator[Paper]:
+        """
+        Store every page of papers as it arrives and yield the stored papers,
+        so only one page is held in memory at a time.
+
+        This runs after the request handler has returned, so every page is
+        stored with a session of its own.
+        """
+        async for page in pages:
+            async with AsyncSessionLocal() as db:
+                stored_papers = await PaperService.get_papers_and_store(db, page)
+            for stored_paper in stored_papers:
+                yield stored_paper
+
+    @staticmethod
+    @traced
+    async def get_or_create_summary(
+        db: AsyncSession,
+        db_paper,
+        paper: Paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
     ):
         logger.info(
-            f"Checking for cached summary for paper_id={db_paper.id}, level={knowledge_level.value}"
+            f"Checking for cached summary for paper_id={db_paper.id}, level={knowledge_level.value}, "
+            f"summarizer={summarizer.value}"
         )
 
-        cached = get_summary(
-            db, db_paper.id, knowledge_level.value, "gemini_summarizer"
+        stored, degraded = await PaperService.lookup_summary(
+            db, db_paper, knowledge_level, summarizer
         )
-        if cached:
+        if stored is not None:
+            return PaperService.to_paper_summary(db_paper, stored, degraded=degraded)
+
+        logger.info("No cached summary found, generating new summary.")
+        try:
+            summary = await PaperService.generate_summary_once(
+                db, db_paper, paper, knowledge_level, summarizer
+            )
+        except Exception as e:
+            if not is_upstream_failure(summarizer, e):
+                raise
+            fallback = await PaperService.degraded_summary(
+                db, db_paper, paper, knowledge_level, summarizer, e
+            )
+            if fallback is None:
+                raise
+            return fallback
+        return PaperService.to_paper_summary(db_paper, summary)
+
+    @staticmethod
+    @traced
+    async def get_or_create_summaries(
+        db: AsyncSession,
+        papers: List[Paper],
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+    ) -> List[PaperSummary]:
+        """
+        Summarize a batch of papers, serving cached summaries from a single
+        lookup and generating the missing ones concurrently. Local
+        summarizers generate all of them in one pass.
+
+        Results are returned in the same order as the input papers.
+        """
+        # Duplicate URLs collapse to one row, so map rows back per input paper.
+        db_papers_by_url = {
+            db_paper.url: db_paper
+            for db_paper in await PaperService.store_papers(db, papers)
+        }
+        db_papers = [db_papers_by_url[paper.url] for paper in papers]
+
+        keys = {
+            db_paper.id: summary_key(
+                db_paper.abstract, knowledge_level.value, summarizer
+            )
+            for db_paper in db_papers
+        }
+        stored = await get_summaries_by_keys(db, list(set(keys.values())))
+        by_key = {summary.content_key: summary for summary in stored}
+        # Prefer each paper's own summary over an identical one of another.
+        by_key.update(
+            (summary.content_key, summary)
+            for summary in stored
+            if keys.get(summary.paper_id) == summary.content_key
+        )
+
+        cached: Dict[int, str] = {}
+        served = []
+        copies = []
+        for db_paper in db_papers:
+            summary = by_key.get(keys[db_paper.id])
+            if summary is None or db_paper.id in cached:
+                continue
+            cached[db_paper.id] = summary.summary
+            if summary.paper_id == db_paper.id:
+                served.append(summary)
+            else:
+                copies.append(
+                    PaperService.summary_row(
+                        db_paper, knowledge_level.value, summarizer, summary.summary
+                    )
+                )
+        await create_summaries(db, copies)
+        await PaperService.touch(db, served)
+
+        hits = len(cached)
+        reused = 0
+        misses = {}
+        degraded: Dict[int, PaperSummary] = {}
+        for paper, db_paper in zip(papers, db_papers):
+            if db_paper.id in cached or db_paper.id in misses:
+                continue
+            summary = await PaperService.reuse_summary(
+                db, db_paper, knowledge_level, summarizer
+            )
+            if summary is not None:
+                cached[db_paper.id] = summary
+                reused += 1
+            else:
+                misses[db_paper.id] = (db_paper, paper)
+
+        if misses and settings.SUMMARY_SERVE_STALE and not is_local(summarizer):
+            for summary in await get_summaries_for_papers(
+                db, list(misses), knowledge_level.value, summarizer.value
+            ):
+                db_paper, _ = misses.pop(summary.paper_id)
+                await PaperService.queue_resummary(db, summary)
+                degraded[db_paper.id] = PaperService.to_paper_summary(
+                    db_paper, summary.summary, degraded="stale"
+                )
+        SUMMARY_CACHE_LOOKUPS.labels(result="hit").inc(hits)
+        SUMMARY_CACHE_LOOKUPS.labels(result="reused").inc(reused)
+        SUMMARY_CACHE_LOOKUPS.labels(result="stale").inc(len(degraded))
+        SUMMARY_CACHE_LOOKUPS.labels(result="miss").inc(len(misses))
+        logger.info(
+            f"Batch summary lookup: {hits} cached, {reused} reused, "
+            f"{len(degraded)} stale, {len(misses)} to generate."
+        )
+
+        if misses and is_local(summarizer):
+            summaries = await summarize_papers(
+                [paper for _, paper in misses.values()], knowledge_level, summarizer
+            )
+            await create_summaries(
+                db,
+                [
+                    PaperService.summary_row(
+                        db_paper, knowledge_level.value, summarizer, summary
+                    )
+                    for (db_paper, _), summary in zip(misses.values(), summaries)
+                ],
+            )
+            cached.update(zip(misses, summaries))
+        elif misses:
+            # The generations share the session, so end its transaction once
+            # for all of them.
+            await db.commit()
+            semaphore = asyncio.Semaphore(settings.SUMMARIZE_BATCH_MAX_CONCURRENCY)
+
+            async def generate(db_paper, paper: Paper) -> str:
+                async with semaphore:
+                    return await PaperService.generate_summary_once(
+                        db, db_paper, paper, knowledge_level, summarizer
+                    )
+
+            results = await asyncio.gather(
+                *(generate(db_paper, paper) for db_paper, paper in misses.values()),
+                return_exceptions=True,
+            )
+
+            # Each generated summary is stored as soon as it is ready, so a
+            # retry of a partially failed batch only pays for the failures.
+            for (paper_id, (db_paper, paper)), result in zip(misses.items(), results):
+                if not isinstance(result, BaseException):
+                    cached[paper_id] = result
+                    continue
+                fallback = None
+                if is_upstream_failure(summarizer, result):
+                    fallback = await PaperService.degraded_summary(
+                        db, db_paper, paper, knowledge_level, summarizer, result
+                    )
+                if fallback is None:
+                    raise result
+                degraded[paper_id] = fallback
+
+        return [
+            degraded.get(db_paper.id)
+            or PaperService.to_paper_summary(db_paper, cached[db_paper.id])
+            for db_paper in db_papers
+        ]
+
+    @staticmethod
+    async def lookup_summary(
+        db: AsyncSession,
+        db_paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Find a summary that spares a generation: the cached one, a reused
+        near-identical paper's, or a stale one while a job replaces it.
+
+        Returns the summary and what it is degraded to ("stale"), or
+        (None, None) when the summary has to be generated.
+        """
+        cached = await PaperService.cached_summary(
+            db, db_paper, knowledge_level, summarizer
+        )
+        if cached is not None:
+            SUMMARY_CACHE_LOOKUPS.labels(result="hit").inc()
             logger.info("Returning cached summary.")
-            summary = PaperSummary(
-                title=db_paper.title,
-                authors=db_paper.authors.split(","),
-                published_date=db_paper.published_date,
-                url=db_paper.url,
-                summary=cached.summary,
+            return cached, None
+
+        reused = await PaperService.reuse_summary(
+            db, db_paper, knowledge_level, summarizer
+        )
+        if reused is not None:
+            SUMMARY_CACHE_LOOKUPS.labels(result="reused").inc()
+            return reused, None
+
+        stale = await PaperService.stale_summary(
+            db, db_paper, knowledge_level, summarizer
+        )
+        if stale is not None:
+            SUMMARY_CACHE_LOOKUPS.labels(result="stale").inc()
+            logger.info("Returning stale summary while a job replaces it.")
+            return stale, "stale"
+
+        SUMMARY_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None, None
+
+    @staticmethod
+    @traced
+    async def cached_summary(
+        db: AsyncSession,
+        db_paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer,
+    ) -> Optional[str]:
+        """
+        The stored summary with the paper's content key for the current
+        prompts and model, or None. A summary of another paper with the same
+        abstract is stored for this paper too.
+        """
+        summary = await get_summary_by_key(
+            db,
+            summary_key(db_paper.abstract, knowledge_level.value, summarizer),
+            db_paper.id,
+        )
+        if summary is None:
+            return None
+        if summary.paper_id != db_paper.id:
+            await create_summary(
+                db,
+                PaperService.summary_row(
+                    db_paper, knowledge_level.value, summarizer, summary.summary
+                ),
             )
-            return summary
+        else:
+            await PaperService.touch(db, [summary])
+        return summary.summary
 
-        logger.info("No cached summary found, generating new summary.")
-        summary_obj = summarize_paper(paper, knowledge_level)
-        create_summary(
+    @staticmethod
+    async def stale_summary(
+        db: AsyncSession,
+        db_paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer,
+    ) -> Optional[str]:
+        """
+        The paper's stored summary of older prompts or another model, with a
+        job queued to replace it, or None.
+
+        Serving it spares the request a generation, and all the requests for
+        the paper during a prompt or model change share the one job instead
+        of all generating the new summary. Local summarizers regenerate
+        directly.
+        """
+        if not settings.SUMMARY_SERVE_STALE or is_local(summarizer):
+            return None
+        summary = await get_summary(
+            db, db_paper.id, knowledge_level.value, summarizer.value
+        )
+        if summary is None:
+            return None
+        await PaperService.queue_resummary(db, summary)
+        return summary.summary
+
+    @staticmethod
+    async def queue_resummary(db: AsyncSession, summary) -> None:
+        """Queue a job to regenerate a stored summary, unless one is queued."""
+        await PaperService.touch(db, [summary])
+        db_job = await create_summary_job(
             db,
             {
-                "paper_id": db_paper.id,
-                "knowledge_level": knowledge_level.value,
-                "summarizer": "gemini_summarizer",
-                "summary": summary_obj.summary,
+                "paper_id": summary.paper_id,
+                "knowledge_level": summary.knowledge_level,
+                "summarizer": summary.summarizer,
             },
         )
-        logger.info("Summary stored in DB.")
-        return summary_obj
+        logger.info(
+            f"Summary job {db_job.id} replaces the stale summary of "
+            f"paper_id={summary.paper_id}"
+        )
+
+    @staticmethod
+    async def touch(db: AsyncSession, summaries) -> None:
+        """
+        Record that the summaries were served, at most every
+        SUMMARY_TOUCH_SECONDS so that hits rarely write.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.SUMMARY_TOUCH_SECONDS
+        )
+        await touch_summaries(
+            db,
+            [
+                summary.id
+                for summary in summaries
+                if summary.last_served_at is None or summary.last_served_at < cutoff
+            ],
+        )
+
+    @staticmethod
+    @traced
+    async def reuse_summary(
+        db: AsyncSession,
+        db_paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer,
+    ) -> Optional[str]:
+        """
+        Store and return the summary of another version of the paper, or of
+        a near-duplicate paper, whose abstract is effectively the same.
+
+        Candidates are the other versions of the arXiv paper and the papers
+        sharing an LSH band with the abstract; only those whose abstract
+        shingles overlap by SUMMARY_REUSE_MIN_SIMILARITY are reused, so a
+        version with a changed abstract is summarized again.
+        """
+        if not settings.SUMMARY_REUSE_ENABLED:
+            return None
+        candidates = await get_summary_candidates(
+            db,
+            db_paper.id,
+            db_paper.arxiv_id,
+            band_hashes(db_paper.abstract),
+            knowledge_level.value,
+            summarizer.value,
+            *summary_version(summarizer),
+            settings.SUMMARY_REUSE_MAX_CANDIDATES,
+        )
+        for abstract, summary in candidates:
+            if jaccard(db_paper.abstract, abstract) < (
+                settings.SUMMARY_REUSE_MIN_SIMILARITY
+            ):
+                continue
+            logger.info(f"Reusing a near-identical paper's summary for {db_paper.url}")
+            stored = await create_summary(
+                db,
+                PaperService.summary_row(
+                    db_paper, knowledge_level.value, summarizer, summary
+                ),
+            )
+            return stored.summary
+        return None
+
+    @staticmethod
+    @traced
+    async def generate_summary_once(
+        db: AsyncSession,
+        db_paper,
+        paper: Paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+    ) -> str:
+        """
+        Generate and store a summary, making sure concurrent requests for the
+        same summary trigger a single generation.
+
+        Callers in this process share one in-flight generation. The stored
+        summaries are checked before the model is called, and no database
+        connection is held during the call. Identical generations racing in
+        other processes are settled when storing: the summary stored first
+        is kept and returned by all of them.
+
+        With SUMMARY_MULTI_LEVEL_ENABLED, every knowledge level is generated
+        together and the requested one is returned. With
+        SUMMARY_MICRO_BATCH_ENABLED, generations running at the same time
+        share model calls through the summary batcher.
+
+        Local summarizers are cheap enough to skip all of this.
+        """
+        if is_local(summarizer):
+            summary_obj = await summarize_paper(paper, knowledge_level, summarizer)
+            stored = await create_summary(
+                db,
+                PaperService.summary_row(
+                    db_paper, knowledge_level.value, summarizer, summary_obj.summary
+                ),
+            )
+            return stored.summary
+
+        # Generations read and store on connections of their own; return the
+        # session's one to the pool rather than leave it idle in transaction
+        # through the model call. Callers generating concurrently with one
+        # session end it beforehand.
+        if db.in_transaction():
+            await db.commit()
+
+        if settings.SUMMARY_MULTI_LEVEL_ENABLED:
+            summaries = await PaperService.generate_all_levels_once(
+                db, db_paper, paper, summarizer
+            )
+            return summaries[knowledge_level.value]
+
+        key = summary_key(db_paper.abstract, knowledge_level.value, summarizer)
+
+        async def generate() -> str:
+            async with summary_connection(db) as conn:
+                existing = await get_summary_text(conn, key)
+                if existing is not None:
+                    logger.info("Summary was generated by another worker.")
+                    # It may be another paper's with the same abstract.
+                    return await insert_summary(
+                        conn,
+                        PaperService.summary_row(
+                            db_paper, knowledge_level.value, summarizer, existing
+                        ),
+                    )
+
+            if (
+                settings.SUMMARY_MICRO_BATCH_ENABLED
+                and summarizer == summary_batcher.summarizer
+            ):
+                summary_obj = await summary_batcher.summarize(paper, knowledge_level)
+            else:
+                summary_obj = await summarize_paper(paper, knowledge_level, summarizer)
+            async with summary_connection(db) as conn:
+                summary = await insert_summary(
+                    conn,
+                    PaperService.summary_row(
+                        db_paper, knowledge_level.value, summarizer, summary_obj.summary
+                    ),
+                )
+            logger.info("Summary stored in DB.")
+            return summary
+
+        return await summary_flights.do(key, generate)
+
+    @staticmethod
+    @traced
+    async def generate_all_levels_once(
+        db: AsyncSession,
+        db_paper,
+        paper: Paper,
+        summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+    ) -> Dict[str, str]:
+        """
+        Generate the summaries of a paper for every knowledge level in one
+        model call and store them in one transaction.
+
+        Levels whose current summary is already stored are kept as they
+        are, and the returned summaries, keyed by knowledge level, reflect
+        what is stored. Concurrent requests for any level share one
+        generation.
+        """
+        keys = {
+            level.value: summary_key(db_paper.abstract, level.value, summarizer)
+            for level in KnowledgeLevel
+        }
+        flight_key = summary_key(db_paper.abstract, ALL_LEVELS, summarizer)
+
+        async def generate() -> Dict[str, str]:
+            async with summary_connection(db) as conn:
+                existing = await get_summary_texts_by_keys(conn, list(keys.values()))
+            if all(key in existing for key in keys.values()):
+                logger.info("Summaries were generated by another worker.")
+                generated = {}
+            else:
+                generated = {
+                    level.value: summary
+                    for level, summary in (
+                        await summarize_paper_all_levels(paper, summarizer)
+                    ).items()
+                }
+            async with summary_connection(db) as conn:
+                # Summaries found stored may be another paper's with the same
+                # abstract, so they are stored for this paper too.
+                await insert_summaries(
+                    conn,
+                    [
+                        PaperService.summary_row(
+                            db_paper,
+                            level,
+                            summarizer,
+                            existing[key] if key in existing else generated[level],
+                        )
+                        for level, key in keys.items()
+                    ],
+                )
+                logger.info("Summaries for all levels stored in DB.")
+                # Re-read so rows inserted concurrently take precedence.
+                stored = await get_summary_texts_by_keys(conn, list(keys.values()))
+                return {
+                    level: stored[key] for level, key in keys.items() if key in stored
+                }
+
+        return await summary_flights.do(flight_key, generate)
+
+    @staticmethod
+    async def degraded_summary(
+        db: AsyncSession,
+        db_paper,
+        paper: Paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer,
+        error: Exception,
+    ) -> Optional[PaperSummary]:
+        """
+        Return a stand-in for a summary that the model failed to generate,
+        from the first of SUMMARY_FALLBACKS that is available, or None when
+        none is.
+
+        Stand-ins are marked with the fallback they came from and are never
+        stored, so the next request tries to generate the summary again.
+        """
+        for fallback in settings.SUMMARY_FALLBACKS:
+            try:
+                summary = await PaperService._fallback_summary(
+                    fallback, db, db_paper, paper, knowledge_level, summarizer
+                )
+            except Exception as e:
+                logger.error(f"Summary fallback '{fallback}' failed: {e}")
+                continue
+            if summary is not None:
+                logger.error(
+                    f"Could not generate summary for paper_id={db_paper.id}, "
+                    f"returning '{fallback}' fallback: {error}"
+                )
+                UPSTREAM_RESILIENCE_EVENTS.labels(
+                    upstream=summarizer.value, event=f"fallback_{fallback}"
+                ).inc()
+                return PaperService.to_paper_summary(
+                    db_paper, summary, degraded=fallback
+                )
+        return None
+
+    @staticmethod
+    async def _fallback_summary(
+        fallback: str,
+        db: AsyncSession,
+        db_paper,
+        paper: Paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer,
+    ) -> Optional[str]:
+        if fallback == "other_level":
+            stored = await get_summary_texts(db, db_paper.id, summarizer.value)
+            # Prefer the closest level to the one requested.
+            levels = list(KnowledgeLevel)
+            requested = levels.index(knowledge_level)
+            for level in sorted(
+                levels, key=lambda other: abs(levels.index(other) - requested)
+            ):
+                if level != knowledge_level and level.value in stored:
+                    return stored[level.value]
+            return None
+        if fallback == "extractive":
+            summary_obj = await summarize_paper(
+                paper, knowledge_level, Summarizer.EXTRACTIVE_SUMMARIZER
+            )
+            return summary_obj.summary
+        if fallback == "abstract":
+            return paper.abstract
+        raise ValueError(f"Unknown summary fallback '{fallback}'")
+
+    @staticmethod
+    async def stream_summary(
+        db_paper,
+        knowledge_level: KnowledgeLevel,
+        summarizer: Summarizer = Summarizer.GEMINI_SUMMARIZER,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield ("token", {"text": ...}) events while a summary is generated,
+        followed by one ("summary", {"summary": ..., "cached": ...}) event.
+        A stored summary, found as get_or_create_summary would find it, is
+        yielded as that single event, marked "degraded" when it is stale.
+
+        Streams of the same summary share one generation like the other
+        requests do: only the stream that starts it yields tokens, and the
+        streams that join it in this process only get the final event.
+
+        This runs after the request handler has returned, so it uses its own
+        sessions.
+        """
+        async with AsyncSessionLocal() as db:
+            stored, degraded = await PaperService.lookup_summary(
+                db, db_paper, knowledge_level, summarizer
+            )
+        if stored is not None:
+            logger.info("Streaming stored summary.")
+            event = {"summary": stored, "cached": True}
+            if degraded is not None:
+                event["degraded"] = degraded
+            yield "summary", event
+            return
+
+        logger.info("No cached summary found, streaming new summary.")
+        paper = Paper.model_validate(db_paper)
+        if is_local(summarizer):
+            chunks = []
+            async for chunk in summarize_paper_stream(
+                paper, knowledge_level, summarizer
+            ):
+                chunks.append(chunk)
+                yield "token", {"text": chunk}
+            summary = "".join(chunks)
+            async with AsyncSessionLocal() as db:
+                await create_summary(
+                    db,
+                    PaperService.summary_row(
+                        db_paper, knowledge_level.value, summarizer, summary
+                    ),
+                )
+            yield "summary", {"summary": summary, "cached": False}
+            return
+
+        key = summary_key(db_paper.abstract, knowledge_level.value, summarizer)
+        # Tokens of the generation, if this stream is the one that starts it,
+        # then None once the flight has finished.
+        tokens: asyncio.Queue = asyncio.Queue()
+
+        async with AsyncSessionLocal() as db:
+
+            async def generate() -> str:
+                async with summary_connection(db) as conn:
+                    existing = await get_summary_text(conn, key)
+                    if existing is not None:
+                        logger.info("Summary was generated by another worker.")
+                        return await insert_summary(
+                            conn,
+                            PaperService.summary_row(
+                                db_paper, knowledge_level.value, summarizer, existing
+                            ),
+                        )
+
+                chunks = []
+                async for chunk in summarize_paper_stream(
+                    paper, knowledge_level, summarizer
+                ):
+                    chunks.append(chunk)
+                    tokens.put_nowait(chunk)
+                async with summary_connection(db) as conn:
+                    summary = await insert_summary(
+                        conn,
+                        PaperService.summary_row(
+                            db_paper, knowledge_level.value, summarizer, "".join(chunks)
+                        ),
+                    )
+                logger.info("Streamed summary stored in DB.")
+                return summary
+
+            flight = asyncio.ensure_future(summary_flights.do(key, generate))
+            flight.add_done_callback(lambda _: tokens.put_nowait(None))
+            try:
+                while (chunk := await tokens.get()) is not None:
+                    yield "token", {"text": chunk}
+                summary = await flight
+            finally:
+                # A stream closed early gives up its generation, which a
+                # joined stream then starts again.
+                flight.cancel()
+        yield "summary", {"summary": summary, "cached": False}
+
+    @staticmethod
+    def _to_paper_row(paper: Paper) -> dict:
+        return {
+            "title": paper.title,
+            "abstract": paper.abstract,
+            "url": paper.url,
+            "authors": ",".join(paper.authors),
+            "published_date": date.fromisoformat(paper.published_date),
+            "arxiv_id": canonical_arxiv_id(paper.url),
+            "abstract_bands": band_hashes(paper.abstract),
+        }
+
+    @staticmethod
+    def summary_row(
+        db_paper, knowledge_level: str, summarizer: Summarizer, summary: str
+    ) -> dict:
+        prompt_version, model = summary_version(summarizer)
+        return {
+            "paper_id": db_paper.id,
+            "knowledge_level": knowledge_level,
+            "summarizer": summarizer.value,
+            "summary": summary,
+            "content_key": summary_key(db_paper.abstract, knowledge_level, summarizer),
+            "prompt_version": prompt_version,
+            "model": model,
+        }
+
+    @staticmethod
+    def to_paper_summary(
+        db_paper, summary: str, degraded: Optional[str] = None
+    ) -> PaperSummary:
+        return PaperSummary(
+            title=db_paper.title,
+            authors=db_paper.authors.split(","),
+            published_date=db_paper.published_date,
+            url=db_paper.url,
+            summary=summary,
+            degraded=degraded,
+        )
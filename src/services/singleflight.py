@@ -0,0 +1,38 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key so that only one of them
+    runs and the others await its result.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._inflight[key] = task
+                task.add_done_callback(lambda t: self._forget(key, t))
+                return await task
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # The caller that started the work went away; take over
+                # unless it is this caller that is being cancelled.
+                if task.cancelled():
+                    continue
+                raise
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
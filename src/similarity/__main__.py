@@ -0,0 +1,43 @@
+"""
+Build the related papers index from every stored paper.
+
+    python -m src.similarity
+
+Running workers switch to the new index on their next related papers
+request. Rebuild from time to time so that the papers stored since the last
+build, which every worker indexes in memory, stay few.
+"""
+
+import argparse
+import asyncio
+
+from src.config import settings
+from src.database.connection import AsyncSessionLocal, engine
+from src.similarity.index import build_index
+
+
+async def run(args: argparse.Namespace) -> None:
+    try:
+        await build_index(AsyncSessionLocal, args.directory, args.buckets)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the related papers index.")
+    parser.add_argument(
+        "--directory",
+        default=settings.SIMILARITY_INDEX_DIR,
+        help="Index directory shared with the API workers.",
+    )
+    parser.add_argument(
+        "--buckets",
+        type=int,
+        default=settings.SIMILARITY_HASH_BUCKETS,
+        help="Term hash buckets; must match SIMILARITY_HASH_BUCKETS of the workers.",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+"""
+BM25 similarity index over the titles and abstracts of stored papers.
+
+Terms are hashed into a fixed number of buckets, so the index needs no
+vocabulary and new papers can be added without re-numbering terms. Each
+segment of the index is an inverted index in compressed sparse column form:
+for every term bucket, the rows of the papers containing it and their BM25
+term weights. Scoring a query is the product of that sparse matrix with the
+sparse query vector, computed in one pass over the query terms' postings.
+
+The index built by `python -m src.similarity` is saved as .npy files and
+memory-mapped, so every worker shares one copy through the page cache and
+loading it is instant. Papers stored after the build go into a small
+in-memory segment that each worker catches up from the database in the
+background, every SIMILARITY_REFRESH_SECONDS, up to SIMILARITY_MAX_CATCH_UP
+papers; beyond that the index must be rebuilt. Requests only read the
+index, so they never wait for the database on its behalf.
+
+Ids are assigned before commit, so a paper can become visible after papers
+with higher ids were indexed. Each catch-up therefore also looks at the
+papers created within SIMILARITY_CATCH_UP_OVERLAP_SECONDS before the
+previous one and indexes those still missing.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.config import logger, settings
+from src.database.repositories import (
+    count_papers_after,
+    get_paper_ids_created_since,
+    get_paper_texts_after,
+    get_papers_by_ids,
+)
+from src.processing.extractive_summarizer import STOP_WORDS, TOKEN
+
+K1 = 1.2
+B = 0.75
+CURRENT = "CURRENT"
+ARRAYS = ("term_indptr", "term_docs", "term_weights", "paper_ids")
+# Papers read from the database per query while building or catching up.
+READ_BATCH_SIZE = 5000
+
+# (paper id, title, abstract)
+PaperText = Tuple[int, str, str]
+
+
+def term_counts(text: str, buckets: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Distinct term buckets of the text, their counts, and the term total."""
+    words = [w for w in TOKEN.findall(text.lower()) if w not in STOP_WORDS]
+    hashed = np.fromiter(
+        (zlib.crc32(word.encode()) for word in words), dtype=np.int64, count=len(words)
+    )
+    terms, counts = np.unique(hashed % buckets, return_counts=True)
+    return terms, counts, len(words)
+
+
+@dataclass
+class Segment:
+    term_indptr: np.ndarray
+    term_docs: np.ndarray
+    term_weights: np.ndarray
+    # One per row; ascending in built indexes.
+    paper_ids: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        paper_ids: Sequence[int],
+        terms: Sequence[np.ndarray],
+        counts: Sequence[np.ndarray],
+        lengths: np.ndarray,
+        avgdl: float,
+        buckets: int,
+    ) -> "Segment":
+        sizes = np.array([len(t) for t in terms], dtype=np.int64)
+        rows = np.repeat(np.arange(len(terms), dtype=np.int32), sizes)
+        all_terms = np.concatenate(terms) if len(terms) else np.array([], np.int64)
+        tf = np.concatenate(counts) if len(counts) else np.array([], np.int64)
+        norm = K1 * (1 - B + B * lengths[rows] / avgdl)
+        weights = tf * (K1 + 1) / (tf + norm)
+
+        # Stable, so the rows of every term stay in ascending order.
+        order = np.argsort(all_terms, kind="stable")
+        term_indptr = np.zeros(buckets + 1, dtype=np.int64)
+        np.cumsum(np.bincount(all_terms, minlength=buckets), out=term_indptr[1:])
+        return cls(
+            term_indptr=term_indptr,
+            term_docs=rows[order],
+            term_weights=weights[order].astype(np.float32),
+            paper_ids=np.asarray(paper_ids, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.paper_ids)
+
+    def df(self, terms: np.ndarray) -> np.ndarray:
+        return self.term_indptr[terms + 1] - self.term_indptr[terms]
+
+    def scores(self, terms: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Score every row against the query terms with the given weights."""
+        starts = self.term_indptr[terms]
+        sizes = self.term_indptr[terms + 1] - starts
+        # Positions of all the postings of the query terms, range after range.
+        offsets = np.repeat(starts - np.cumsum(sizes) + sizes, sizes)
+        positions = offsets + np.arange(sizes.sum())
+        return np.bincount(
+            self.term_docs[positions],
+            weights=self.term_weights[positions] * np.repeat(weights, sizes),
+            minlength=len(self),
+        )
+
+    def save(self, directory: str) -> None:
+        for name in ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: str) -> "Segment":
+        return cls(
+            **{
+                name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                for name in ARRAYS
+            }
+        )
+
+
+class SimilarityIndex:
+    def __init__(
+        self,
+        directory: str,
+        buckets: int,
+        query_terms: int,
+        max_catch_up: int = settings.SIMILARITY_MAX_CATCH_UP,
+        overlap_seconds: float = settings.SIMILARITY_CATCH_UP_OVERLAP_SECONDS,
+        refresh_seconds: float = settings.SIMILARITY_REFRESH_SECONDS,
+    ):
+        self.directory = directory
+        self.buckets = buckets
+        self.query_terms = query_terms
+        self.max_catch_up = max_catch_up
+        self.overlap_seconds = overlap_seconds
+        self.refresh_seconds = refresh_seconds
+        self.base: Optional[Segment] = None
+        self.base_version: Optional[str] = None
+        self.base_length = 0
+        self.delta: Optional[Segment] = None
+        self._delta_ids: List[int] = []
+        self._delta_id_set: Set[int] = set()
+        self._delta_terms: List[np.ndarray] = []
+        self._delta_counts: List[np.ndarray] = []
+        self._delta_lengths: List[int] = []
+        # Papers created since this time are checked for gaps on refresh.
+        self._recheck_since: Optional[float] = None
+        self._catch_up_refused = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def last_paper_id(self) -> int:
+        last = max(self._delta_ids, default=0)
+        if self.base is not None and len(self.base):
+            last = max(last, int(self.base.paper_ids[-1]))
+        return last
+
+    def is_indexed(self, paper_id: int) -> bool:
+        return paper_id in self._delta_id_set or self.is_indexed_in_base(paper_id)
+
+    @property
+    def avgdl(self) -> float:
+        count = len(self.base or ()) + len(self._delta_ids)
+        total = self.base_length + sum(self._delta_lengths)
+        return total / count if total else 1.0
+
+    def load(self) -> None:
+        """Map the latest built index, if it changed since the last load."""
+        try:
+            with open(os.path.join(self.directory, CURRENT)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return
+        if version == self.base_version:
+            return
+        path = os.path.join(self.directory, version)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["buckets"] != self.buckets:
+            logger.warning(
+                f"Ignoring similarity index {version}: built with {meta['buckets']} "
+                f"hash buckets, {self.buckets} configured"
+            )
+            self.base_version = version
+            return
+
+        self.base = Segment.load(path)
+        self.base_version = version
+        self.base_length = meta["total_length"]
+        # Keep only the papers the build missed.
+        keep = [
+            i
+            for i, paper_id in enumerate(self._delta_ids)
+            if not self.is_indexed_in_base(paper_id)
+        ]
+        self._delta_ids = [self._delta_ids[i] for i in keep]
+        self._delta_id_set = set(self._delta_ids)
+        self._delta_terms = [self._delta_terms[i] for i in keep]
+        self._delta_counts = [self._delta_counts[i] for i in keep]
+        self._delta_lengths = [self._delta_lengths[i] for i in keep]
+        self._rebuild_delta()
+        # Papers committed late during the build are looked for next refresh.
+        if "started_at" in meta:
+            self._recheck_since = meta["started_at"] - self.overlap_seconds
+        logger.info(f"Loaded similarity index {version} of {len(self.base)} papers")
+
+    def is_indexed_in_base(self, paper_id: int) -> bool:
+        # Built segments list their papers in ascending id order.
+        if self.base is None or not len(self.base):
+            return False
+        position = int(np.searchsorted(self.base.paper_ids, paper_id))
+        return position < len(self.base) and self.base.paper_ids[position] == paper_id
+
+    def add(self, papers: Sequence[PaperText]) -> None:
+        """Index papers that are not indexed yet, in one rebuild of the delta."""
+        for paper_id, title, abstract in papers:
+            if self.is_indexed(paper_id):
+                continue
+            terms, counts, length = term_counts(f"{title} {abstract}", self.buckets)
+            self._delta_ids.append(paper_id)
+            self._delta_id_set.add(paper_id)
+            self._delta_terms.append(terms)
+            self._delta_counts.append(counts)
+            self._delta_lengths.append(length)
+        if papers:
+            self._rebuild_delta()
+
+    def _rebuild_delta(self) -> None:
+        self.delta = (
+            Segment.build(
+                self._delta_ids,
+                self._delta_terms,
+                self._delta_counts,
+                np.array(self._delta_lengths, dtype=np.float64),
+                self.avgdl,
+                self.buckets,
+            )
+            if self._delta_ids
+            else None
+        )
+
+    async def refresh(self, session_factory) -> None:
+        """
+        Pick up a newer build and index the papers stored since, unless
+        there are more than max_catch_up of them.
+
+        The papers are read without holding the lock, which only guards
+        updates of the index; papers indexed meanwhile are skipped by add.
+        """
+        async with self._lock:
+            self.load()
+            last_id = self.last_paper_id
+            recheck_since = self._recheck_since
+        started = time.time()
+
+        rows: List[PaperText] = []
+        async with session_factory() as db:
+            pending = await count_papers_after(db, last_id)
+            if pending > self.max_catch_up:
+                if not self._catch_up_refused:
+                    logger.warning(
+                        f"{pending} papers are missing from the similarity "
+                        "index, too many to catch up; rebuild it with "
+                        "`python -m src.similarity`"
+                    )
+                    self._catch_up_refused = True
+                return
+            self._catch_up_refused = False
+
+            after_id = last_id
+            while True:
+                batch = await get_paper_texts_after(db, after_id, READ_BATCH_SIZE)
+                if not batch:
+                    break
+                rows.extend(batch)
+                after_id = batch[-1][0]
+
+            if recheck_since is not None:
+                created_since = datetime.fromtimestamp(recheck_since, timezone.utc)
+                missed = [
+                    paper_id
+                    for paper_id in await get_paper_ids_created_since(
+                        db, created_since, last_id
+                    )
+                    if not self.is_indexed(paper_id)
+                ]
+                if missed:
+                    logger.info(f"Indexing {len(missed)} late-committed papers")
+                    rows.extend(
+                        (paper.id, paper.title, paper.abstract)
+                        for paper in await get_papers_by_ids(db, missed)
+                    )
+
+        async with self._lock:
+            if rows:
+                await asyncio.to_thread(self.add, rows)
+            self._recheck_since = started - self.overlap_seconds
+
+    async def run_forever(self, session_factory) -> None:
+        while True:
+            try:
+                await self.refresh(session_factory)
+            except Exception as e:
+                logger.exception(f"Similarity index refresh failed: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def related(self, paper: PaperText, k: int) -> List[Tuple[int, float]]:
+        """Ids and scores of the k indexed papers most similar to the paper."""
+        paper_id, title, abstract = paper
+        segments = [s for s in (self.base, self.delta) if s is not None and len(s)]
+        terms, _, _ = term_counts(f"{title} {abstract}", self.buckets)
+        if not segments or not len(terms):
+            return []
+
+        count = sum(len(s) for s in segments)
+        df = sum(s.df(terms) for s in segments)
+        idf = np.log(1 + (count - df + 0.5) / (df + 0.5))
+        # The rarest terms carry nearly all the score; common ones would
+        # only add long postings to scan.
+        top = np.argsort(-idf)[: self.query_terms]
+        terms, idf = terms[top], idf[top]
+
+        scores = np.concatenate([s.scores(terms, idf) for s in segments])
+        paper_ids = np.concatenate([s.paper_ids for s in segments])
+        scores[paper_ids == paper_id] = 0
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(paper_ids[i]), float(scores[i])) for i in ranked if scores[i] > 0]
+
+
+async def build_index(session_factory, directory: str, buckets: int) -> str:
+    """Index every stored paper into a new version of the index directory."""
+    start = time.perf_counter()
+    started_at = time.time()
+    paper_ids: List[int] = []
+    terms: List[np.ndarray] = []
+    counts: List[np.ndarray] = []
+    lengths: List[int] = []
+    while True:
+        async with session_factory() as db:
+            rows = await get_paper_texts_after(
+                db, paper_ids[-1] if paper_ids else 0, READ_BATCH_SIZE
+            )
+        if not rows:
+            break
+        for paper_id, title, abstract in rows:
+            paper_terms, paper_counts, length = term_counts(
+                f"{title} {abstract}", buckets
+            )
+            paper_ids.append(paper_id)
+            terms.append(paper_terms)
+            counts.append(paper_counts)
+            lengths.append(length)
+        logger.info(f"Read {len(paper_ids)} papers")
+
+    total_length = sum(lengths)
+    avgdl = total_length / len(lengths) if total_length else 1.0
+    segment = Segment.build(
+        paper_ids,
+        terms,
+        counts,
+        np.array(lengths, dtype=np.float64),
+        avgdl,
+        buckets,
+    )
+
+    # A new directory every build: files mapped by workers are never rewritten.
+    version = str(time.time_ns())
+    path = os.path.join(directory, version)
+    os.makedirs(path)
+    segment.save(path)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "buckets": buckets,
+                "total_length": total_length,
+                "last_id": paper_ids[-1] if paper_ids else 0,
+                # Workers look again at the papers created around the build,
+                # for those committed after it read past their ids.
+                "started_at": started_at,
+            },
+            f,
+        )
+    # Workers switch to the new version once CURRENT names it.
+    tmp_path = os.path.join(directory, f"{CURRENT}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(directory, CURRENT))
+
+    # Workers still mapping an older version keep their open files.
+    for name in os.listdir(directory):
+        if name not in (version, CURRENT) and os.path.isdir(
+            os.path.join(directory, name)
+        ):
+            shutil.rmtree(os.path.join(directory, name))
+
+    logger.info(
+        f"Built similarity index {version} of {len(paper_ids)} papers "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return version
+
+
+similarity_index = SimilarityIndex(
+    settings.SIMILARITY_INDEX_DIR,
+    settings.SIMILARITY_HASH_BUCKETS,
+    settings.SIMILARITY_QUERY_TERMS,
+)
@@ -0,0 +1,68 @@
+"""
+MinHash signatures and LSH bands of abstracts, for finding near-duplicates.
+
+Abstracts are compared as sets of three-word shingles. Their MinHash
+signatures are split into bands; two abstracts whose signatures agree on a
+whole band become candidates, which happens with high probability above a
+Jaccard similarity of about (1 / BANDS) ** (1 / ROWS), 0.5 here. Candidates
+are then compared exactly.
+
+The hash functions come from a fixed seed: stored bands must stay
+comparable across processes and releases.
+"""
+
+import zlib
+from typing import List
+
+import numpy as np
+
+from src.processing.extractive_summarizer import TOKEN
+
+SHINGLE_SIZE = 3
+BANDS = 16
+ROWS = 4
+PRIME = (1 << 31) - 1
+
+_rng = np.random.default_rng(0x6D696E68617368)
+_A = _rng.integers(1, PRIME, BANDS * ROWS, dtype=np.uint64)
+_B = _rng.integers(0, PRIME, BANDS * ROWS, dtype=np.uint64)
+
+
+def shingles(text: str) -> np.ndarray:
+    """Distinct hashed shingles of the text."""
+    words = TOKEN.findall(text.lower())
+    # Texts shorter than a shingle are one shingle of all their words.
+    grams = [" ".join(gram) for gram in zip(*(words[i:] for i in range(SHINGLE_SIZE)))]
+    if not grams and words:
+        grams = [" ".join(words)]
+    return np.unique(
+        np.fromiter(
+            (zlib.crc32(gram.encode()) % PRIME for gram in grams), dtype=np.uint64
+        )
+    )
+
+
+def signature(hashed: np.ndarray) -> np.ndarray:
+    """MinHash signature of a non-empty set of hashed shingles."""
+    return ((_A[:, None] * hashed[None, :] + _B[:, None]) % PRIME).min(axis=1)
+
+
+def band_hashes(text: str) -> List[int]:
+    """
+    One int64 per band, the band number in the high bits. Texts without a
+    single word have no bands, rather than all sharing the same ones.
+    """
+    hashed = shingles(text)
+    if not len(hashed):
+        return []
+    bands = signature(hashed).astype(np.uint32).reshape(BANDS, ROWS)
+    return [
+        (band << 32) | zlib.crc32(rows.tobytes()) for band, rows in enumerate(bands)
+    ]
+
+
+def jaccard(first: str, second: str) -> float:
+    """Exact Jaccard similarity of the shingle sets of two texts."""
+    a, b = shingles(first), shingles(second)
+    union = len(np.union1d(a, b))
+    return len(np.intersect1d(a, b, assume_unique=True)) / union if union else 1.0
@@ -0,0 +1,197 @@
+"""
+Lightweight request tracing.
+
+A trace is started per request with the request id as its trace id, and
+every layer records a span for its work: routes, services, repositories,
+paper sources and summarizers. Finished spans go to the configured exporter.
+
+Whether a trace is recorded is decided once, when it starts, from
+TRACING_SAMPLE_RATE. Spans of traces that are not sampled cost a context
+variable lookup.
+"""
+
+import functools
+import inspect
+import json
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.config import settings, logger
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_time: float
+    duration_ms: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in a list, for tests."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def names(self) -> List[str]:
+        return [span.name for span in self.spans]
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+# Marks the context of a trace that was not sampled, so its spans are skipped.
+_NOT_SAMPLED = object()
+_current_span: ContextVar[Any] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, exporter: Optional[SpanExporter], sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @contextmanager
+    def span(
+        self, name: str, trace_id: Optional[str] = None, **attributes: Any
+    ) -> Iterator[Optional[Span]]:
+        """
+        Record a span around the block and yield it, or None when the trace
+        is not sampled.
+
+        Outside of a trace, a new trace is started, with trace_id as its id
+        when given.
+        """
+        parent = _current_span.get()
+        if parent is _NOT_SAMPLED:
+            yield None
+            return
+        if parent is None and not self._sample():
+            token = _current_span.set(_NOT_SAMPLED)
+            try:
+                yield None
+            finally:
+                _current_span.reset(token)
+            return
+
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else (trace_id or uuid.uuid4().hex),
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            _current_span.reset(token)
+            self._export(span)
+
+    def _sample(self) -> bool:
+        return self.exporter is not None and random.random() < self.sample_rate
+
+    def _export(self, span: Span) -> None:
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            logger.error(f"Could not export span '{span.name}': {e}")
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return None if span is None or span is _NOT_SAMPLED else span.trace_id
+
+
+def span_name(fn: Callable) -> str:
+    """Name functions by class, or by module for module-level functions."""
+    if "." in fn.__qualname__:
+        return fn.__qualname__
+    return f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+
+def traced(fn: Callable) -> Callable:
+    """Record a span named after the function around each call."""
+    name = span_name(fn)
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return await fn(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with tracer.span(name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def build_exporter() -> Optional[SpanExporter]:
+    if settings.TRACING_EXPORTER == "none":
+        return None
+    if settings.TRACING_EXPORTER == "memory":
+        return InMemorySpanExporter()
+    if settings.TRACING_EXPORTER == "jsonl":
+        return JsonLinesSpanExporter(settings.TRACING_FILE)
+    raise ValueError(f"Unknown tracing exporter '{settings.TRACING_EXPORTER}'")
+
+
+tracer = Tracer(build_exporter(), settings.TRACING_SAMPLE_RATE)
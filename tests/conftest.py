@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_resilience_policies():
+    # Circuit breakers and latency windows are shared per upstream, so start
+    # every test with fresh ones.
+    from src.resilience import _policies
+
+    _policies.clear()
+    yield
+    _policies.clear()
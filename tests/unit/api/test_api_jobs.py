@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+from src.main import app  # noqa: E402
+from src.models.job import JobStatus, SummaryJob  # noqa: E402
+from src.models.paper import Paper, PaperSummary  # noqa: E402
+
+client = TestClient(app)
+
+paper_data = {
+    "title": "Test Paper",
+    "abstract": "Test abstract",
+    "url": "http://arxiv.org/abs/1234.5678",
+    "authors": ["Alice", "Bob"],
+    "published_date": "2023-01-01",
+}
+
+pending_job = SummaryJob(
+    id="job-1",
+    status=JobStatus.PENDING,
+    knowledge_level="general",
+    attempts=0,
+    created_at=datetime(2023, 1, 1, tzinfo=timezone.utc),
+)
+
+
+@patch("src.api.routes.PaperService.get_or_create_paper")
+@patch("src.api.routes.JobService.submit_summary_job", return_value=(pending_job, None))
+def test_summarize_async_queues_job(mock_submit, mock_get_paper):
+    mock_get_paper.return_value = Paper(**paper_data)
+    response = client.post("/api/summarize", params={"mode": "async"}, json=paper_data)
+    assert response.status_code == 202
+    assert response.json()["id"] == "job-1"
+    assert response.json()["status"] == "pending"
+    assert response.headers["Location"].endswith("/api/jobs/job-1")
+
+
+@patch("src.api.routes.PaperService.get_or_create_paper")
+@patch("src.api.routes.JobService.submit_summary_job")
+def test_summarize_async_returns_cached_summary(mock_submit, mock_get_paper):
+    mock_get_paper.return_value = Paper(**paper_data)
+    mock_submit.return_value = (None, PaperSummary(**paper_data, summary="Cached"))
+    response = client.post("/api/summarize", params={"mode": "async"}, json=paper_data)
+    assert response.status_code == 200
+    assert response.json()["summary"] == "Cached"
+
+
+def test_summarize_invalid_mode():
+    response = client.post("/api/summarize", params={"mode": "later"}, json=paper_data)
+    assert response.status_code == 422
+
+
+@patch("src.api.jobs.JobService.get_job")
+def test_get_job_succeeded(mock_get_job):
+    mock_get_job.return_value = pending_job.model_copy(
+        update={
+            "status": JobStatus.SUCCEEDED,
+            "result": PaperSummary(**paper_data, summary="Done"),
+        }
+    )
+    response = client.get("/api/jobs/job-1", params={"wait": 5})
+    assert response.status_code == 200
+    assert response.json()["result"]["summary"] == "Done"
+    assert mock_get_job.call_args.kwargs["wait"] == 5
+
+
+@patch("src.api.jobs.JobService.get_job", return_value=None)
+def test_get_job_not_found(mock_get_job):
+    response = client.get("/api/jobs/missing")
+    assert response.status_code == 404
+
+
+def test_get_job_wait_too_long():
+    response = client.get("/api/jobs/job-1", params={"wait": 3600})
+    assert response.status_code == 422
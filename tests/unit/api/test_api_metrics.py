@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+from src.main import app  # noqa: E402
+
+
+client = TestClient(app)
+
+
+@patch("src.api.routes.fetch_papers", return_value=[])
+@patch("src.api.routes.PaperService.get_papers_and_store", return_value=[])
+def test_metrics_records_route_latency(mock_get_papers_and_store, mock_fetch_papers):
+    client.get("/api/papers", params={"topic": "AI"})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/api/papers",status="200"}'
+        in response.text
+    )
+
+
+def test_metrics_uses_route_template():
+    client.get("/api/jobs/does-not-matter", params={"wait": -1})
+    response = client.get("/metrics")
+    assert 'route="/api/jobs/{job_id}"' in response.text
+    assert "does-not-matter" not in response.text
@@ -1,10 +1,12 @@
 from fastapi.testclient import TestClient
+import json
 from unittest.mock import patch
 import sys
 import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 from src.main import app  # noqa: E402
+from src.models.paper import Paper  # noqa: E402
 
 
 client = TestClient(app)
@@ -163,3 +165,95 @@ def test_get_papers_default_source(mock_get_papers_and_store, mock_fetch_papers)
     data = response.json()
     assert isinstance(data, list)
     assert data[0]["title"] == "Test Paper"
+
+
+def make_paper(index):
+    return Paper(
+        title=f"Test Paper {index}",
+        abstract="Test abstract",
+        url=f"http://arxiv.org/abs/1234.{index:04d}",
+        authors=["Alice", "Bob"],
+        published_date="2023-01-01",
+    )
+
+
+@patch("src.api.routes.fetch_paper_pages")
+@patch("src.api.routes.PaperService.stream_and_store_papers")
+def test_stream_papers_sends_one_line_per_paper(mock_store, mock_fetch_pages):
+    async def fake_stored(pages):
+        for index in range(3):
+            yield make_paper(index)
+
+    mock_store.side_effect = fake_stored
+    response = client.get(
+        "/api/papers/stream", params={"topic": "AI", "max_results": 300}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["title"] for line in lines] == [
+        "Test Paper 0",
+        "Test Paper 1",
+        "Test Paper 2",
+    ]
+    mock_fetch_pages.assert_called_once_with("AI", max_results=300, source="arxiv")
+
+
+@patch("src.api.routes.fetch_paper_pages")
+@patch("src.api.routes.PaperService.stream_and_store_papers")
+def test_stream_papers_reports_errors_as_last_line(mock_store, mock_fetch_pages):
+    async def failing_stored(pages):
+        yield make_paper(0)
+        raise RuntimeError("arXiv unavailable")
+
+    mock_store.side_effect = failing_stored
+    response = client.get("/api/papers/stream", params={"topic": "AI"})
+    assert response.status_code == 200
+    assert response.text.splitlines()[-1] == '{"error": "arXiv unavailable"}'
+
+
+def test_stream_papers_unknown_source():
+    response = client.get(
+        "/api/papers/stream", params={"topic": "AI", "source": "notarxiv"}
+    )
+    assert response.status_code == 400
+
+
+def test_stream_papers_max_results_limit():
+    response = client.get(
+        "/api/papers/stream", params={"topic": "AI", "max_results": 100000}
+    )
+    assert response.status_code == 422
+
+
+@patch("src.api.routes.PaperService.get_paper")
+@patch("src.api.routes.PaperService.get_related_papers")
+def test_get_related_papers(mock_get_related, mock_get_paper):
+    mock_get_paper.return_value = object()
+    mock_get_related.return_value = [
+        {
+            "id": 2,
+            "title": "Related Paper",
+            "abstract": "Related abstract",
+            "url": "http://arxiv.org/abs/2345.6789",
+            "authors": ["Carol"],
+            "published_date": "2023-02-01",
+            "score": 4.2,
+        }
+    ]
+    response = client.get("/api/papers/1/related", params={"k": 3})
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == 2
+    assert response.json()[0]["score"] == 4.2
+    assert mock_get_related.call_args.args[2] == 3
+
+
+@patch("src.api.routes.PaperService.get_paper", return_value=None)
+def test_get_related_papers_not_found(mock_get_paper):
+    response = client.get("/api/papers/999/related")
+    assert response.status_code == 404
+
+
+def test_get_related_papers_k_too_large():
+    response = client.get("/api/papers/1/related", params={"k": 1000})
+    assert response.status_code == 422
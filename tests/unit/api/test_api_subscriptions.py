@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from unittest.mock import patch
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+from src.main import app  # noqa: E402
+
+client = TestClient(app, headers={"X-Admin-Token": "operator-token"})
+
+fake_subscription = SimpleNamespace(
+    id=1,
+    topic="large language models",
+    source="arxiv",
+    max_results=10,
+    enabled=True,
+    last_harvested_at=None,
+)
+
+
+@pytest.fixture(autouse=True)
+def admin_token():
+    with patch("src.api.subscriptions.settings.ADMIN_TOKEN", "operator-token"):
+        yield
+
+
+@patch("src.api.subscriptions.create_subscription", return_value=fake_subscription)
+def test_subscribe_topic(mock_create):
+    response = client.post(
+        "/api/subscriptions", json={"topic": "  large language models "}
+    )
+    assert response.status_code == 201
+    assert response.json()["topic"] == "large language models"
+    assert mock_create.call_args.args[1]["topic"] == "large language models"
+
+
+def test_subscribe_topic_invalid_chars():
+    response = client.post("/api/subscriptions", json={"topic": "AI!@#"})
+    assert response.status_code == 400
+    assert "Topic contains invalid characters" in response.text
+
+
+def test_subscribe_topic_unknown_source():
+    response = client.post(
+        "/api/subscriptions", json={"topic": "AI", "source": "notarxiv"}
+    )
+    assert response.status_code == 400
+    assert "Unknown source" in response.text
+
+
+@patch(
+    "src.api.subscriptions.create_subscription",
+    side_effect=IntegrityError("INSERT", {}, Exception("duplicate")),
+)
+def test_subscribe_topic_duplicate(mock_create):
+    response = client.post("/api/subscriptions", json={"topic": "AI"})
+    assert response.status_code == 409
+
+
+@patch("src.api.subscriptions.get_subscriptions", return_value=[fake_subscription])
+def test_list_subscriptions(mock_get_subscriptions):
+    response = client.get("/api/subscriptions")
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == 1
+
+
+@patch("src.api.subscriptions.delete_subscription", return_value=False)
+def test_unsubscribe_missing_topic(mock_delete):
+    response = client.delete("/api/subscriptions/42")
+    assert response.status_code == 404
+
+
+@patch("src.api.subscriptions.create_subscription")
+def test_subscribe_topic_requires_admin_token(mock_create):
+    response = client.post(
+        "/api/subscriptions",
+        json={"topic": "AI"},
+        headers={"X-Admin-Token": "wrong-token"},
+    )
+    assert response.status_code == 401
+    mock_create.assert_not_called()
+
+
+@patch("src.api.subscriptions.delete_subscription")
+def test_unsubscribe_disabled_without_admin_token(mock_delete):
+    with patch("src.api.subscriptions.settings.ADMIN_TOKEN", None):
+        response = client.delete("/api/subscriptions/1")
+    assert response.status_code == 403
+    mock_delete.assert_not_called()
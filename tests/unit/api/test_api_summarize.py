@@ -1,5 +1,7 @@
 from src.models.paper import Paper, PaperSummary
 from src.models.knowledge_level import KnowledgeLevel
+from src.processing.summarizer import Summarizer
+from src.resilience import Overloaded
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 import sys
@@ -98,3 +100,156 @@ def test_summarize_generic_exception(mock_get_summary, mock_get_paper):
     response = client.post("/api/summarize", json=paper_data)
     assert response.status_code == 500
     assert "unexpected error" in response.text
+
+
+@patch("src.api.routes.PaperService.get_or_create_paper")
+@patch(
+    "src.api.routes.PaperService.get_or_create_summary",
+    side_effect=Overloaded("'gemini_summarizer' is at its concurrency limit", 10),
+)
+def test_summarize_overloaded_returns_503(mock_get_summary, mock_get_paper):
+    paper_data = {
+        "title": "Test Paper",
+        "abstract": "Test abstract",
+        "url": "http://arxiv.org/abs/1234.5678",
+        "authors": ["Alice", "Bob"],
+        "published_date": "2023-01-01",
+    }
+    mock_get_paper.return_value = Paper(**paper_data)
+    response = client.post("/api/summarize", json=paper_data)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "10"
+
+
+@patch("src.api.routes.PaperService.get_or_create_summaries")
+def test_summarize_batch_success(mock_get_summaries):
+    paper_data = {
+        "title": "Test Paper",
+        "abstract": "Test abstract",
+        "url": "http://arxiv.org/abs/1234.5678",
+        "authors": ["Alice", "Bob"],
+        "published_date": "2023-01-01",
+    }
+    summary_data = paper_data.copy()
+    summary_data["summary"] = "Short summary."
+    mock_get_summaries.return_value = [PaperSummary(**summary_data)]
+    response = client.post(
+        "/api/summarize/batch",
+        params={"knowledge_level": KnowledgeLevel.GENERAL.value},
+        json=[paper_data],
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data, list)
+    assert data[0]["summary"] == "Short summary."
+
+
+def test_summarize_batch_empty():
+    response = client.post("/api/summarize/batch", json=[])
+    assert response.status_code == 400
+    assert "Batch cannot be empty" in response.text
+
+
+def test_summarize_batch_too_large():
+    paper_data = {
+        "title": "Test Paper",
+        "abstract": "Test abstract",
+        "url": "http://arxiv.org/abs/1234.5678",
+        "authors": ["Alice", "Bob"],
+        "published_date": "2023-01-01",
+    }
+    response = client.post("/api/summarize/batch", json=[paper_data] * 21)
+    assert response.status_code == 400
+    assert "Batch must contain" in response.text
+
+
+@patch(
+    "src.api.routes.PaperService.get_or_create_summaries",
+    side_effect=Exception("unexpected error"),
+)
+def test_summarize_batch_generic_exception(mock_get_summaries):
+    paper_data = {
+        "title": "Test Paper",
+        "abstract": "Test abstract",
+        "url": "http://arxiv.org/abs/1234.5678",
+        "authors": ["Alice", "Bob"],
+        "published_date": "2023-01-01",
+    }
+    response = client.post("/api/summarize/batch", json=[paper_data])
+    assert response.status_code == 500
+    assert "unexpected error" in response.text
+
+
+@patch("src.api.routes.PaperService.get_paper")
+@patch("src.api.routes.PaperService.stream_summary")
+def test_stream_summary_sends_events(mock_stream, mock_get_paper):
+    async def fake_events(db_paper, knowledge_level, summarizer):
+        yield "token", {"text": "Short "}
+        yield "summary", {"summary": "Short summary.", "cached": False}
+
+    mock_get_paper.return_value = object()
+    mock_stream.side_effect = fake_events
+    response = client.get("/api/papers/1/summary/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        'event: token\ndata: {"text": "Short "}\n\n'
+        'event: summary\ndata: {"summary": "Short summary.", "cached": false}\n\n'
+    )
+
+
+@patch("src.api.routes.PaperService.get_paper")
+@patch("src.api.routes.PaperService.stream_summary")
+def test_stream_summary_reports_errors_as_event(mock_stream, mock_get_paper):
+    async def failing_events(db_paper, knowledge_level, summarizer):
+        yield "token", {"text": "Short "}
+        raise RuntimeError("model unavailable")
+
+    mock_get_paper.return_value = object()
+    mock_stream.side_effect = failing_events
+    response = client.get("/api/papers/1/summary/stream")
+    assert response.status_code == 200
+    assert response.text.endswith(
+        'event: error\ndata: {"detail": "model unavailable"}\n\n'
+    )
+
+
+@patch("src.api.routes.PaperService.get_paper", return_value=None)
+def test_stream_summary_paper_not_found(mock_get_paper):
+    response = client.get("/api/papers/999/summary/stream")
+    assert response.status_code == 404
+
+
+@patch("src.api.routes.PaperService.get_or_create_paper")
+@patch("src.api.routes.PaperService.get_or_create_summary")
+def test_summarize_with_extractive_summarizer(mock_get_summary, mock_get_paper):
+    paper_data = {
+        "title": "Test Paper",
+        "abstract": "Test abstract",
+        "url": "http://arxiv.org/abs/1234.5678",
+        "authors": ["Alice", "Bob"],
+        "published_date": "2023-01-01",
+    }
+    mock_get_summary.return_value = PaperSummary(**paper_data, summary="Extract.")
+    response = client.post(
+        "/api/summarize",
+        params={"summarizer": "extractive_summarizer"},
+        json=paper_data,
+    )
+    assert response.status_code == 200
+    assert mock_get_summary.call_args.args[4] == Summarizer.EXTRACTIVE_SUMMARIZER
+
+
+def test_summarize_unknown_summarizer():
+    response = client.post(
+        "/api/summarize",
+        params={"summarizer": "missing"},
+        json={
+            "title": "Test Paper",
+            "abstract": "Test abstract",
+            "url": "http://arxiv.org/abs/1234.5678",
+            "authors": ["Alice"],
+            "published_date": "2023-01-01",
+        },
+    )
+    assert response.status_code == 422
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+from src.main import app  # noqa: E402
+from src.services.paper_service import get_db  # noqa: E402
+from src.tracing import InMemorySpanExporter, tracer  # noqa: E402
+
+
+client = TestClient(app)
+
+stored_row = SimpleNamespace(
+    id=1,
+    title="Test Paper",
+    abstract="Test abstract",
+    url="http://arxiv.org/abs/1234.5678",
+    authors="Alice,Bob",
+    published_date="2023-01-01",
+    paper_id=1,
+    summary="Cached summary",
+    last_served_at=datetime.now(timezone.utc),
+)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    return exporter
+
+
+@pytest.fixture
+def fake_db():
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = stored_row
+    result.scalars.return_value.all.return_value = [stored_row]
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    async def override():
+        yield db
+
+    app.dependency_overrides[get_db] = override
+    yield db
+    app.dependency_overrides.pop(get_db)
+
+
+def test_summarize_request_is_traced_through_layers(exporter, fake_db):
+    response = client.post(
+        "/api/summarize",
+        headers={"X-Request-ID": "req-42"},
+        json={
+            "title": "Test Paper",
+            "abstract": "Test abstract",
+            "url": "http://arxiv.org/abs/1234.5678",
+            "authors": ["Alice", "Bob"],
+            "published_date": "2023-01-01",
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-42"
+
+    spans = {span.name: span for span in exporter.spans}
+    route = spans["routes.summarize_paper"]
+    assert route.attributes["status"] == 200
+    assert {span.trace_id for span in exporter.spans} == {"req-42"}
+    assert spans["PaperService.get_or_create_summary"].parent_id == route.span_id
+    assert (
+        spans["PaperService.cached_summary"].parent_id
+        == spans["PaperService.get_or_create_summary"].span_id
+    )
+    assert (
+        spans["repositories.get_summary_by_key"].parent_id
+        == spans["PaperService.cached_summary"].span_id
+    )
+    assert "repositories.upsert_papers" in spans
+
+
+def test_request_id_is_generated_when_missing(exporter):
+    response = client.get("/metrics")
+    assert len(response.headers["X-Request-ID"]) == 32
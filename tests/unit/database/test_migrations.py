@@ -0,0 +1,31 @@
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from src.database.connection import ALEMBIC_CONFIG
+from src.database.models import Paper, Summary
+
+
+def get_script_directory():
+    return ScriptDirectory.from_config(Config(ALEMBIC_CONFIG))
+
+
+def test_migrations_have_single_head():
+    assert len(get_script_directory().get_heads()) == 1
+
+
+def test_migrations_form_linear_history():
+    revisions = list(get_script_directory().walk_revisions())
+    assert revisions[-1].down_revision is None
+    for revision in revisions:
+        assert not revision.is_merge_point
+
+
+def test_models_declare_migrated_indexes():
+    summary_indexes = {index.name for index in Summary.__table__.indexes}
+    paper_indexes = {index.name for index in Paper.__table__.indexes}
+    assert "ux_summaries_paper_level_summarizer" in summary_indexes
+    assert "ix_papers_created_at" in paper_indexes
+    assert "ix_papers_search_vector" in paper_indexes
+    assert "ix_papers_arxiv_id" in paper_indexes
+    assert "ix_papers_abstract_bands" in paper_indexes
+    assert "ix_summaries_content_key" in summary_indexes
+    assert "ix_summaries_last_served_at" in summary_indexes
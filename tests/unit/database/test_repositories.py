@@ -1,12 +1,26 @@
+from datetime import datetime, timezone
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.dialects import postgresql
 from src.database.repositories import (
     get_paper_by_url,
-    create_paper,
+    get_papers_by_ids,
+    upsert_papers,
+    copy_papers,
+    search_papers,
     get_summary,
+    get_summary_candidates,
+    get_summaries_by_keys,
+    get_summaries_for_papers,
+    get_summaries_to_refresh,
     create_summary,
+    insert_summary,
+    insert_summaries,
+    touch_summaries,
 )
 
+pytestmark = pytest.mark.anyio
+
 
 class FakePaper:
     def __init__(self, **kwargs):
@@ -18,71 +32,353 @@ class FakeSummary:
         self.__dict__.update(kwargs)
 
 
-@pytest.fixture
-def fake_db():
+def make_db(first=None, all_rows=None):
     db = MagicMock()
-    db.query().filter().first.return_value = None
+    result = MagicMock()
+    result.scalars().first.return_value = first
+    result.scalars().all.return_value = all_rows or []
+    db.execute = AsyncMock(return_value=result)
+    db.commit = AsyncMock()
+    db.refresh = AsyncMock()
     return db
 
 
-def test_get_paper_by_url_found():
-    db = MagicMock()
+async def test_get_paper_by_url_found():
     fake_paper = FakePaper(url="http://arxiv.org/abs/1234.5678")
-    db.query().filter().first.return_value = fake_paper
-    result = get_paper_by_url(db, "http://arxiv.org/abs/1234.5678")
+    db = make_db(first=fake_paper)
+    result = await get_paper_by_url(db, "http://arxiv.org/abs/1234.5678")
     assert result == fake_paper
 
 
-def test_get_paper_by_url_not_found():
-    db = MagicMock()
-    db.query().filter().first.return_value = None
-    result = get_paper_by_url(db, "notfound")
+async def test_get_paper_by_url_not_found():
+    db = make_db(first=None)
+    result = await get_paper_by_url(db, "notfound")
     assert result is None
 
 
-def test_create_paper():
-    db = MagicMock()
-    paper_data = {
+async def test_get_papers_by_ids_keeps_the_order_of_the_ids():
+    db = make_db(all_rows=[FakePaper(id=1), FakePaper(id=3)])
+    result = await get_papers_by_ids(db, [3, 2, 1])
+    assert [paper.id for paper in result] == [3, 1]
+
+
+def scalars_result(rows):
+    result = MagicMock()
+    result.scalars().all.return_value = rows
+    return result
+
+
+def paper_row(url):
+    return {
         "title": "Test",
         "abstract": "A",
-        "url": "u",
+        "url": url,
         "authors": "A,B",
         "published_date": "2023",
     }
-    db.add.return_value = None
-    db.commit.return_value = None
-    db.refresh.return_value = None
-    create_paper(db, paper_data)
-    db.add.assert_called()
-    db.commit.assert_called()
 
 
-def test_get_summary_found():
-    db = MagicMock()
+async def test_upsert_papers_all_existing():
+    existing = [FakePaper(url="u2"), FakePaper(url="u1")]
+    db = make_db()
+    db.execute = AsyncMock(return_value=scalars_result(existing))
+    result = await upsert_papers(db, [paper_row("u1"), paper_row("u2")])
+    assert [p.url for p in result] == ["u1", "u2"]
+    db.execute.assert_awaited_once()
+    db.commit.assert_not_awaited()
+
+
+async def test_upsert_papers_inserts_missing_once():
+    db = make_db()
+    db.execute = AsyncMock(
+        side_effect=[
+            scalars_result([FakePaper(url="u1")]),
+            scalars_result([FakePaper(url="u2"), FakePaper(url="u3")]),
+        ]
+    )
+    result = await upsert_papers(
+        db, [paper_row("u1"), paper_row("u2"), paper_row("u3"), paper_row("u2")]
+    )
+    assert [p.url for p in result] == ["u1", "u2", "u3"]
+    insert_statement = db.execute.call_args_list[1].args[0]
+    compiled = insert_statement.compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT (url) DO NOTHING" in str(compiled)
+    assert len(compiled.params) == 10
+    db.commit.assert_awaited_once()
+
+
+async def test_upsert_papers_rereads_rows_inserted_concurrently():
+    db = make_db()
+    db.execute = AsyncMock(
+        side_effect=[
+            scalars_result([]),
+            scalars_result([FakePaper(url="u1")]),
+            scalars_result([FakePaper(url="u2")]),
+        ]
+    )
+    result = await upsert_papers(db, [paper_row("u1"), paper_row("u2")])
+    assert [p.url for p in result] == ["u1", "u2"]
+    assert db.execute.await_count == 3
+    db.commit.assert_awaited_once()
+
+
+async def test_upsert_papers_serves_versionless_url_with_newest_version():
+    versions = [
+        FakePaper(id=1, url="http://arxiv.org/abs/2401.00001v1", arxiv_id="2401.00001"),
+        FakePaper(id=2, url="http://arxiv.org/abs/2401.00001v2", arxiv_id="2401.00001"),
+    ]
+    db = make_db()
+    db.execute = AsyncMock(return_value=scalars_result(versions))
+    result = await upsert_papers(db, [paper_row("http://arxiv.org/abs/2401.00001")])
+    assert [p.id for p in result] == [2]
+    compiled = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "papers.arxiv_id IN" in compiled
+    db.commit.assert_not_awaited()
+
+
+async def test_upsert_papers_version_takes_over_versionless_row():
+    url = "http://arxiv.org/abs/2401.00001v2"
+    placeholder = FakePaper(
+        id=1, url="http://arxiv.org/abs/2401.00001", arxiv_id="2401.00001"
+    )
+    claimed = MagicMock()
+    claimed.scalars().first.return_value = FakePaper(
+        id=1, url=url, arxiv_id="2401.00001"
+    )
+    db = make_db()
+    db.execute = AsyncMock(side_effect=[scalars_result([placeholder]), claimed])
+    result = await upsert_papers(db, [paper_row(url)])
+    assert [(p.id, p.url) for p in result] == [(1, url)]
+    update_statement = db.execute.call_args_list[1].args[0]
+    compiled = str(update_statement.compile(dialect=postgresql.dialect()))
+    assert compiled.startswith("UPDATE papers SET url=")
+    db.commit.assert_awaited_once()
+
+
+async def test_upsert_papers_empty():
+    db = make_db()
+    assert await upsert_papers(db, []) == []
+    db.execute.assert_not_called()
+
+
+async def test_copy_papers_merges_the_staging_table():
+    conn = MagicMock()
+    merged = MagicMock()
+    merged.scalar_one.return_value = 1
+    conn.execute = AsyncMock(side_effect=[MagicMock(), merged])
+    raw = MagicMock()
+    raw.driver_connection.copy_records_to_table = AsyncMock()
+    conn.get_raw_connection = AsyncMock(return_value=raw)
+    rows = [
+        ("t", "a", "u1", "Alice", None, "1", [1]),
+        ("t", "a", "u2", "Bob", None, "2", [2]),
+    ]
+
+    assert await copy_papers(conn, rows) == 1
+
+    raw.driver_connection.copy_records_to_table.assert_awaited_once_with(
+        "papers_staging",
+        records=rows,
+        columns=(
+            "title",
+            "abstract",
+            "url",
+            "authors",
+            "published_date",
+            "arxiv_id",
+            "abstract_bands",
+        ),
+    )
+    merge = str(conn.execute.call_args_list[1].args[0])
+    assert "ON CONFLICT (url) DO NOTHING" in merge
+    assert "staged.url <> :abs_url || staged.arxiv_id" in merge
+    assert conn.execute.call_args_list[1].args[1] == {
+        "abs_url": "http://arxiv.org/abs/"
+    }
+
+
+async def test_search_papers_ranks_matches_then_recency():
+    papers = [FakePaper(url="u1"), FakePaper(url="u2")]
+    db = make_db(all_rows=papers)
+    assert await search_papers(db, "llm agents", 5) == papers
+    compiled = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "papers.search_vector @@ websearch_to_tsquery" in compiled
+    assert "ts_rank_cd(papers.search_vector" in compiled
+    assert "papers.published_date DESC" in compiled
+
+
+async def test_get_summary_found():
     fake_summary = FakeSummary(summary="s")
-    db.query().filter().first.return_value = fake_summary
-    result = get_summary(db, 1, "general", "gemini_summarizer")
+    db = make_db(first=fake_summary)
+    result = await get_summary(db, 1, "general", "gemini_summarizer")
     assert result == fake_summary
 
 
-def test_get_summary_not_found():
-    db = MagicMock()
-    db.query().filter().first.return_value = None
-    result = get_summary(db, 1, "general", "gemini_summarizer")
+async def test_get_summary_not_found():
+    db = make_db(first=None)
+    result = await get_summary(db, 1, "general", "gemini_summarizer")
     assert result is None
 
 
-def test_create_summary():
-    db = MagicMock()
+async def test_create_summary():
+    stored = FakeSummary(summary="s")
+    db = make_db(first=stored)
+    summary_data = {
+        "paper_id": 1,
+        "knowledge_level": "general",
+        "summarizer": "gemini_summarizer",
+        "summary": "s",
+    }
+    result = await create_summary(db, summary_data)
+    assert result == stored
+    db.execute.assert_awaited_once()
+    db.commit.assert_awaited()
+
+
+async def test_create_summary_conflict_returns_existing():
+    existing = FakeSummary(summary="existing")
+    db = make_db(first=None)
+    summary_data = {
+        "paper_id": 1,
+        "knowledge_level": "general",
+        "summarizer": "gemini_summarizer",
+        "summary": "s",
+    }
+    with patch(
+        "src.database.repositories.get_summary", return_value=existing
+    ) as mock_get_summary:
+        result = await create_summary(db, summary_data)
+    assert result == existing
+    mock_get_summary.assert_awaited_once_with(db, 1, "general", "gemini_summarizer")
+
+
+async def test_get_summaries_for_papers_empty_ids():
+    db = make_db()
+    assert await get_summaries_for_papers(db, [], "general", "gemini_summarizer") == []
+    db.execute.assert_not_called()
+
+
+async def test_insert_summary_replaces_only_summaries_of_other_keys():
+    conn = make_db()
     summary_data = {
         "paper_id": 1,
         "knowledge_level": "general",
         "summarizer": "gemini_summarizer",
         "summary": "s",
+        "content_key": "key",
+        "prompt_version": "v1",
+        "model": "gemini-2.5-flash",
     }
-    db.add.return_value = None
-    db.commit.return_value = None
-    db.refresh.return_value = None
-    create_summary(db, summary_data)
-    db.add.assert_called()
-    db.commit.assert_called()
+    conn.execute.return_value.scalar.return_value = "s"
+    assert await insert_summary(conn, summary_data) == "s"
+    statement = conn.execute.call_args.args[0]
+    compiled = str(statement.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (paper_id, knowledge_level, summarizer) DO UPDATE" in compiled
+    assert "summaries.content_key IS DISTINCT FROM excluded.content_key" in compiled
+    assert "RETURNING summaries.summary" in compiled
+
+
+async def test_insert_summary_returns_the_summary_stored_first():
+    conn = MagicMock()
+    inserted = MagicMock()
+    inserted.scalar.return_value = None
+    stored = MagicMock()
+    stored.scalar.return_value = "stored first"
+    conn.execute = AsyncMock(side_effect=[inserted, stored])
+    summary_data = {
+        "paper_id": 1,
+        "knowledge_level": "general",
+        "summarizer": "gemini_summarizer",
+        "summary": "s",
+        "content_key": "key",
+        "prompt_version": "v1",
+        "model": "gemini-2.5-flash",
+    }
+    assert await insert_summary(conn, summary_data) == "stored first"
+    assert conn.execute.await_count == 2
+
+
+async def test_insert_summaries_single_statement():
+    conn = make_db()
+    await insert_summaries(
+        conn,
+        [
+            {
+                "paper_id": 1,
+                "knowledge_level": level,
+                "summarizer": "gemini_summarizer",
+                "summary": level,
+            }
+            for level in ("general", "undergraduate", "researcher")
+        ],
+    )
+    conn.execute.assert_awaited_once()
+    statement = conn.execute.call_args.args[0]
+    assert "ON CONFLICT" in str(statement.compile(dialect=postgresql.dialect()))
+
+
+async def test_insert_summaries_empty():
+    conn = make_db()
+    await insert_summaries(conn, [])
+    conn.execute.assert_not_called()
+
+
+async def test_get_summary_candidates_match_versions_and_bands():
+    db = make_db()
+    db.execute.return_value.all.return_value = [("abstract", "summary")]
+    rows = await get_summary_candidates(
+        db,
+        1,
+        "2401.01234",
+        [7, 8],
+        "general",
+        "gemini_summarizer",
+        "v1",
+        "gemini-2.5-flash",
+        20,
+    )
+    assert rows == [("abstract", "summary")]
+    compiled = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "papers.arxiv_id = " in compiled
+    assert "papers.abstract_bands && " in compiled
+    # Only summaries of the current prompts and model are reused.
+    assert "summaries.prompt_version = " in compiled
+    assert "summaries.model = " in compiled
+
+
+async def test_get_summary_candidates_without_identity():
+    db = make_db()
+    assert (
+        await get_summary_candidates(db, 1, None, [], "general", "g", "v1", "m", 20)
+        == []
+    )
+    db.execute.assert_not_called()
+
+
+async def test_get_summaries_by_keys_empty_keys():
+    db = make_db()
+    assert await get_summaries_by_keys(db, []) == []
+    db.execute.assert_not_called()
+
+
+async def test_touch_summaries_empty_ids():
+    db = make_db()
+    await touch_summaries(db, [])
+    db.execute.assert_not_called()
+
+
+async def test_get_summaries_to_refresh_skips_queued_and_orders_by_recency():
+    db = make_db(all_rows=[FakeSummary(summary="s")])
+    rows = await get_summaries_to_refresh(
+        db,
+        "gemini_summarizer",
+        "v2",
+        "gemini-2.5-flash",
+        datetime.now(timezone.utc),
+        20,
+    )
+    assert len(rows) == 1
+    compiled = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "summaries.prompt_version != " in compiled
+    assert "NOT (EXISTS" in compiled
+    assert "ORDER BY summaries.last_served_at DESC" in compiled
@@ -0,0 +1,179 @@
+from contextlib import asynccontextmanager
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.harvest.harvester import Harvester
+from src.models.paper import Paper
+from src.processing.summarizer import Summarizer, summary_key
+
+pytestmark = pytest.mark.anyio
+
+
+def make_db_paper(paper_id):
+    return SimpleNamespace(
+        id=paper_id,
+        title=f"Paper {paper_id}",
+        abstract="Test abstract",
+        url=f"http://arxiv.org/abs/{paper_id}",
+        authors="Alice,Bob",
+        published_date=date(2023, 1, 1),
+    )
+
+
+def make_paper(paper_id):
+    return Paper.model_validate(make_db_paper(paper_id))
+
+
+def stored_summaries(paper_id, content_key=None):
+    """Stands in for get_summaries_for_papers, with one summary per level."""
+
+    def get_summaries_for_papers(db, paper_ids, level, summarizer):
+        key = content_key or summary_key(
+            "Test abstract", level, Summarizer.GEMINI_SUMMARIZER
+        )
+        return [SimpleNamespace(paper_id=paper_id, content_key=key)]
+
+    return get_summaries_for_papers
+
+
+subscription = SimpleNamespace(id=1, topic="llm", source="arxiv", max_results=2)
+
+
+@pytest.fixture
+def fake_db():
+    db = MagicMock()
+    db.rollback = AsyncMock()
+    db.commit = AsyncMock()
+    return db
+
+
+@pytest.fixture
+def harvester(fake_db):
+    @asynccontextmanager
+    async def session_factory():
+        yield fake_db
+
+    return Harvester(
+        session_factory=session_factory,
+        interval_seconds=3600,
+        concurrency=2,
+        max_summaries_per_run=100,
+    )
+
+
+@pytest.fixture
+def source():
+    source = MagicMock()
+    source.fetch_papers_async = AsyncMock(return_value=[make_paper(1), make_paper(2)])
+    return source
+
+
+async def test_run_once_harvests_due_topics(harvester, source):
+    with (
+        patch(
+            "src.harvest.harvester.claim_due_subscription",
+            side_effect=[subscription, None],
+        ),
+        patch.dict("src.harvest.harvester.SOURCES", {"arxiv": source}),
+        patch(
+            "src.harvest.harvester.PaperService.store_papers",
+            return_value=[make_db_paper(1), make_db_paper(2)],
+        ),
+        patch("src.harvest.harvester.search_cache") as mock_cache,
+        patch(
+            "src.harvest.harvester.get_summaries_for_papers",
+            side_effect=stored_summaries(1),
+        ),
+        patch(
+            "src.harvest.harvester.PaperService.generate_summary_once",
+            return_value="Generated summary",
+        ) as mock_generate,
+    ):
+        mock_cache.prime = AsyncMock()
+        report = await harvester.run_once()
+
+    source.fetch_papers_async.assert_awaited_once_with("llm", 2)
+    mock_cache.prime.assert_awaited_once()
+    # Paper 1 is already summarized at every level, paper 2 at none.
+    assert mock_generate.await_count == 3
+    assert {call.args[1].id for call in mock_generate.call_args_list} == {2}
+    assert report.topics == 1
+    assert report.papers == 2
+    assert report.summaries_generated == 3
+    assert not report.budget_exhausted
+
+
+async def test_run_once_regenerates_summaries_of_older_prompts(harvester, source):
+    with (
+        patch(
+            "src.harvest.harvester.claim_due_subscription",
+            side_effect=[subscription, None],
+        ),
+        patch.dict("src.harvest.harvester.SOURCES", {"arxiv": source}),
+        patch(
+            "src.harvest.harvester.PaperService.store_papers",
+            return_value=[make_db_paper(1)],
+        ),
+        patch("src.harvest.harvester.search_cache") as mock_cache,
+        patch(
+            "src.harvest.harvester.get_summaries_for_papers",
+            side_effect=stored_summaries(1, content_key="previous-version-key"),
+        ),
+        patch(
+            "src.harvest.harvester.PaperService.generate_summary_once",
+            return_value="Generated summary",
+        ) as mock_generate,
+    ):
+        mock_cache.prime = AsyncMock()
+        report = await harvester.run_once()
+
+    assert mock_generate.await_count == 3
+    assert report.summaries_generated == 3
+
+
+async def test_run_once_respects_summary_budget(harvester, source):
+    harvester.max_summaries_per_run = 4
+    with (
+        patch(
+            "src.harvest.harvester.claim_due_subscription",
+            side_effect=[subscription, subscription, None],
+        ),
+        patch.dict("src.harvest.harvester.SOURCES", {"arxiv": source}),
+        patch(
+            "src.harvest.harvester.PaperService.store_papers",
+            return_value=[make_db_paper(1), make_db_paper(2)],
+        ),
+        patch("src.harvest.harvester.search_cache") as mock_cache,
+        patch("src.harvest.harvester.get_summaries_for_papers", return_value=[]),
+        patch(
+            "src.harvest.harvester.PaperService.generate_summary_once",
+            side_effect=["ok", RuntimeError("quota"), "ok", "ok"],
+        ) as mock_generate,
+    ):
+        mock_cache.prime = AsyncMock()
+        report = await harvester.run_once()
+
+    assert mock_generate.await_count == 4
+    assert report.summaries_generated == 3
+    assert report.summaries_failed == 1
+    assert report.budget_exhausted
+
+
+async def test_run_once_continues_after_failed_topic(harvester, fake_db, source):
+    source.fetch_papers_async.side_effect = [RuntimeError("arXiv down"), []]
+    with (
+        patch(
+            "src.harvest.harvester.claim_due_subscription",
+            side_effect=[subscription, subscription, None],
+        ),
+        patch.dict("src.harvest.harvester.SOURCES", {"arxiv": source}),
+        patch("src.harvest.harvester.PaperService.store_papers", return_value=[]),
+        patch("src.harvest.harvester.search_cache") as mock_cache,
+        patch("src.harvest.harvester.get_summaries_for_papers", return_value=[]),
+    ):
+        mock_cache.prime = AsyncMock()
+        report = await harvester.run_once()
+
+    fake_db.rollback.assert_awaited_once()
+    assert report.topics == 1
@@ -0,0 +1,117 @@
+import json
+from contextlib import asynccontextmanager
+from datetime import date
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.ingest.loader import Checkpoint, SnapshotIngester, to_copy_row
+from src.models.paper import Paper
+from src.similarity.minhash import band_hashes
+
+pytestmark = pytest.mark.anyio
+
+
+def write_snapshot(path, count):
+    with open(path, "w") as f:
+        for index in range(count):
+            record = {
+                "id": f"0001.{index:04d}",
+                "title": f"Paper {index}",
+                "abstract": "Test abstract",
+                "authors": "Alice and Bob",
+                "versions": [{"version": "v1", "created": "2023-01-01"}],
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+def make_engine():
+    conn = MagicMock()
+
+    @asynccontextmanager
+    async def begin():
+        yield conn
+
+    engine = MagicMock()
+    engine.begin = begin
+    return engine
+
+
+def test_to_copy_row_matches_stored_papers():
+    paper = Paper(
+        title="Test Paper",
+        abstract="Test abstract",
+        url="http://arxiv.org/abs/1234.5678v1",
+        authors=["Alice", "Bob"],
+        published_date="2023-01-01",
+    )
+    assert to_copy_row(paper) == (
+        "Test Paper",
+        "Test abstract",
+        "http://arxiv.org/abs/1234.5678v1",
+        "Alice,Bob",
+        date(2023, 1, 1),
+        "1234.5678",
+        band_hashes("Test abstract"),
+    )
+
+
+def test_checkpoint_survives_reloading(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path)
+    checkpoint.save("snapshot.json", 120)
+    checkpoint.save("other.xml", 3, complete=True)
+
+    reloaded = Checkpoint(path)
+    assert reloaded.position("snapshot.json") == 120
+    assert not reloaded.is_complete("snapshot.json")
+    assert reloaded.is_complete("other.xml")
+    assert reloaded.position("unknown.json") == 0
+
+
+async def test_ingest_loads_batches_and_checkpoints_each(tmp_path):
+    snapshot = str(tmp_path / "snapshot.json")
+    write_snapshot(snapshot, 5)
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+    copy_papers = AsyncMock(side_effect=lambda conn, rows: len(rows))
+
+    with patch("src.ingest.loader.copy_papers", copy_papers):
+        report = await SnapshotIngester(make_engine(), checkpoint, 2).ingest([snapshot])
+
+    assert [len(call.args[1]) for call in copy_papers.await_args_list] == [2, 2, 1]
+    assert report.records == 5 and report.inserted == 5
+    assert checkpoint.is_complete(snapshot)
+
+
+async def test_ingest_resumes_after_a_failed_batch(tmp_path):
+    snapshot = str(tmp_path / "snapshot.json")
+    write_snapshot(snapshot, 5)
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    copy_papers = AsyncMock(side_effect=[2, RuntimeError("connection lost"), 2, 1])
+
+    with patch("src.ingest.loader.copy_papers", copy_papers):
+        with pytest.raises(RuntimeError):
+            await SnapshotIngester(
+                make_engine(), Checkpoint(checkpoint_path), 2
+            ).ingest([snapshot])
+        report = await SnapshotIngester(
+            make_engine(), Checkpoint(checkpoint_path), 2
+        ).ingest([snapshot])
+
+    # The second run starts with the batch that failed.
+    resumed = copy_papers.await_args_list[2].args[1]
+    assert [row[0] for row in resumed] == ["Paper 2", "Paper 3"]
+    assert report.records == 3
+    assert Checkpoint(checkpoint_path).is_complete(snapshot)
+
+
+async def test_ingest_skips_completed_snapshots(tmp_path):
+    snapshot = str(tmp_path / "snapshot.json")
+    write_snapshot(snapshot, 2)
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.save(snapshot, 100, complete=True)
+    copy_papers = AsyncMock()
+
+    with patch("src.ingest.loader.copy_papers", copy_papers):
+        report = await SnapshotIngester(make_engine(), checkpoint, 2).ingest([snapshot])
+
+    copy_papers.assert_not_awaited()
+    assert report.records == 0
@@ -0,0 +1,155 @@
+import gzip
+import json
+import pytest
+from src.ingest.snapshot import iter_snapshot, snapshot_format
+
+
+def json_record(arxiv_id, **overrides):
+    record = {
+        "id": arxiv_id,
+        "title": "Attention  Is All\n  You Need",
+        "abstract": "  The dominant sequence\ntransduction models.\n",
+        "authors": "Ashish Vaswani, Noam Shazeer and Niki Parmar",
+        "authors_parsed": [
+            ["Vaswani", "Ashish", ""],
+            ["Shazeer", "Noam", ""],
+            ["Parmar", "Niki", "Jr."],
+        ],
+        "versions": [
+            {"version": "v1", "created": "Mon, 12 Jun 2017 17:57:34 GMT"},
+            {"version": "v2", "created": "Wed, 2 Aug 2023 00:41:18 GMT"},
+        ],
+        "update_date": "2023-08-02",
+    }
+    record.update(overrides)
+    return record
+
+
+OAI_SNAPSHOT = """<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+  <ListRecords>
+    <record>
+      <header><identifier>oai:arXiv.org:1706.03762</identifier></header>
+      <metadata>
+        <arXivRaw xmlns="http://arxiv.org/OAI/arXivRaw/">
+          <id>1706.03762</id>
+          <title>Attention Is All
+  You Need</title>
+          <authors>Ashish Vaswani, Noam Shazeer and Niki Parmar</authors>
+          <abstract>The dominant sequence transduction models.</abstract>
+          <version version="v1"><date>Mon, 12 Jun 2017 17:57:34 GMT</date></version>
+          <version version="v7"><date>Wed, 2 Aug 2023 00:41:18 GMT</date></version>
+        </arXivRaw>
+      </metadata>
+    </record>
+    <record>
+      <header status="deleted"><identifier>oai:arXiv.org:0704.0002</identifier></header>
+    </record>
+    <record>
+      <header><identifier>oai:arXiv.org:0704.0001</identifier></header>
+      <metadata>
+        <arXiv xmlns="http://arxiv.org/OAI/arXiv/">
+          <id>0704.0001</id>
+          <created>2007-04-02</created>
+          <authors>
+            <author><keyname>Bal&#225;zs</keyname><forenames>C.</forenames></author>
+            <author><keyname>Yuan</keyname><forenames>C. -P.</forenames></author>
+          </authors>
+          <title>Calculation of prompt diphoton production</title>
+          <abstract>A fully differential calculation.</abstract>
+        </arXiv>
+      </metadata>
+    </record>
+  </ListRecords>
+</OAI-PMH>
+"""
+
+
+def write_json_lines(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+
+
+def test_snapshot_format_from_extension():
+    assert snapshot_format("arxiv-metadata.json") == "jsonl"
+    assert snapshot_format("arxiv-metadata.jsonl.gz") == "jsonl"
+    assert snapshot_format("ListRecords-0001.xml.gz") == "oai"
+    with pytest.raises(ValueError):
+        snapshot_format("papers.csv")
+
+
+def test_json_lines_are_normalized_like_arxiv_search(tmp_path):
+    path = tmp_path / "snapshot.json"
+    write_json_lines(path, [json_record("1706.03762")])
+
+    [(paper, _)] = list(iter_snapshot(str(path)))
+
+    assert paper.title == "Attention Is All You Need"
+    assert paper.abstract == "The dominant sequence transduction models."
+    assert paper.url == "http://arxiv.org/abs/1706.03762v2"
+    assert paper.authors == ["Ashish Vaswani", "Noam Shazeer", "Niki Parmar Jr."]
+    assert paper.published_date == "2017-06-12"
+
+
+def test_json_lines_without_parsed_authors_split_the_author_string(tmp_path):
+    path = tmp_path / "snapshot.json"
+    write_json_lines(path, [json_record("1706.03762", authors_parsed=None)])
+
+    [(paper, _)] = list(iter_snapshot(str(path)))
+
+    assert paper.authors == ["Ashish Vaswani", "Noam Shazeer", "Niki Parmar"]
+
+
+def test_json_lines_resume_from_a_yielded_offset(tmp_path):
+    path = tmp_path / "snapshot.json.gz"
+    with gzip.open(path, "wt") as f:
+        for arxiv_id in ("0001.0001", "0001.0002", "0001.0003"):
+            f.write(json.dumps(json_record(arxiv_id)) + "\n")
+
+    records = iter_snapshot(str(path))
+    next(records)
+    _, offset = next(records)
+    records.close()
+
+    resumed = [paper.url for paper, _ in iter_snapshot(str(path), offset)]
+    assert resumed == ["http://arxiv.org/abs/0001.0003v2"]
+
+
+def test_malformed_json_lines_are_yielded_as_none(tmp_path):
+    path = tmp_path / "snapshot.json"
+    write_json_lines(path, ["{not json", {"id": "0001.0001"}, json_record("0001.0002")])
+
+    papers = [paper for paper, _ in iter_snapshot(str(path))]
+
+    assert papers[:2] == [None, None]
+    assert papers[2].url == "http://arxiv.org/abs/0001.0002v2"
+
+
+def test_oai_records_in_both_metadata_formats(tmp_path):
+    path = tmp_path / "ListRecords.xml"
+    path.write_text(OAI_SNAPSHOT)
+
+    records = list(iter_snapshot(str(path)))
+
+    assert [position for _, position in records] == [1, 2, 3]
+    raw, deleted, plain = (paper for paper, _ in records)
+    assert raw.title == "Attention Is All You Need"
+    assert raw.url == "http://arxiv.org/abs/1706.03762v7"
+    assert raw.authors == ["Ashish Vaswani", "Noam Shazeer", "Niki Parmar"]
+    assert raw.published_date == "2017-06-12"
+    assert deleted is None
+    assert plain.url == "http://arxiv.org/abs/0704.0001"
+    assert plain.authors == ["C. Balázs", "C. -P. Yuan"]
+    assert plain.published_date == "2007-04-02"
+
+
+def test_oai_records_resume_after_the_records_read(tmp_path):
+    path = tmp_path / "ListRecords.xml"
+    path.write_text(OAI_SNAPSHOT)
+
+    resumed = list(iter_snapshot(str(path), 2))
+
+    assert len(resumed) == 1
+    assert resumed[0][0].url == "http://arxiv.org/abs/0704.0001"
+    assert resumed[0][1] == 3
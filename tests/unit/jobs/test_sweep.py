@@ -0,0 +1,58 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import pytest
+from unittest.mock import MagicMock, patch
+from src.jobs.sweep import ResummarizeSweep
+
+pytestmark = pytest.mark.anyio
+
+
+def make_summary(paper_id):
+    return SimpleNamespace(
+        id=paper_id,
+        paper_id=paper_id,
+        knowledge_level="general",
+        summarizer="gemini_summarizer",
+    )
+
+
+@pytest.fixture
+def sweep():
+    @asynccontextmanager
+    async def session_factory():
+        yield MagicMock()
+
+    return ResummarizeSweep(
+        session_factory=session_factory,
+        interval_seconds=60,
+        batch_size=2,
+        hot_seconds=3600,
+    )
+
+
+async def test_run_once_queues_jobs_for_hot_stale_summaries(sweep):
+    with (
+        patch(
+            "src.jobs.sweep.get_summaries_to_refresh",
+            return_value=[make_summary(1), make_summary(2)],
+        ) as mock_get,
+        patch("src.jobs.sweep.create_summary_job") as mock_queue,
+    ):
+        queued = await sweep.run_once()
+
+    assert queued == 2
+    # Only the remote summarizer is swept, against its current version.
+    mock_get.assert_awaited_once()
+    args = mock_get.call_args.args
+    assert args[1:4] == ("gemini_summarizer", "v1", "gemini-2.5-flash")
+    assert args[5] == 2
+    assert [call.args[1]["paper_id"] for call in mock_queue.call_args_list] == [1, 2]
+
+
+async def test_run_once_without_stale_summaries(sweep):
+    with (
+        patch("src.jobs.sweep.get_summaries_to_refresh", return_value=[]),
+        patch("src.jobs.sweep.create_summary_job") as mock_queue,
+    ):
+        assert await sweep.run_once() == 0
+    mock_queue.assert_not_awaited()
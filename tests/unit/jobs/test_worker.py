@@ -0,0 +1,103 @@
+from contextlib import asynccontextmanager
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.jobs.worker import JobWorker
+
+pytestmark = pytest.mark.anyio
+
+fake_db_paper = SimpleNamespace(
+    id=1,
+    title="Test Paper",
+    abstract="Test abstract",
+    url="http://arxiv.org/abs/1234.5678",
+    authors="Alice,Bob",
+    published_date=date(2023, 1, 1),
+)
+
+
+def make_db_job(attempts=1):
+    return SimpleNamespace(
+        id="job-1",
+        paper_id=1,
+        knowledge_level="general",
+        summarizer="gemini_summarizer",
+        attempts=attempts,
+    )
+
+
+@pytest.fixture
+def fake_db():
+    db = MagicMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+@pytest.fixture
+def worker(fake_db):
+    @asynccontextmanager
+    async def session_factory():
+        yield fake_db
+
+    return JobWorker(
+        session_factory=session_factory,
+        concurrency=1,
+        poll_seconds=0.01,
+        stale_after_seconds=60,
+        max_attempts=3,
+        retry_backoff_seconds=10,
+    )
+
+
+async def test_run_once_empty_queue(worker):
+    with patch("src.jobs.worker.claim_summary_job", return_value=None):
+        assert await worker.run_once() is False
+
+
+async def test_run_once_generates_summary(worker):
+    with (
+        patch("src.jobs.worker.claim_summary_job", return_value=make_db_job()),
+        patch("src.jobs.worker.get_paper_by_id", return_value=fake_db_paper),
+        patch(
+            "src.jobs.worker.PaperService.generate_summary_once", return_value="s"
+        ) as mock_generate,
+        patch("src.jobs.worker.finish_summary_job") as mock_finish,
+    ):
+        assert await worker.run_once() is True
+    mock_generate.assert_awaited_once()
+    assert mock_finish.call_args.args[1:] == ("job-1", "succeeded")
+
+
+async def test_run_once_retries_with_backoff(worker):
+    with (
+        patch("src.jobs.worker.claim_summary_job", return_value=make_db_job(2)),
+        patch("src.jobs.worker.get_paper_by_id", return_value=fake_db_paper),
+        patch(
+            "src.jobs.worker.PaperService.generate_summary_once",
+            side_effect=RuntimeError("quota"),
+        ),
+        patch("src.jobs.worker.retry_summary_job") as mock_retry,
+        patch("src.jobs.worker.finish_summary_job") as mock_finish,
+    ):
+        await worker.run_once()
+    mock_retry.assert_awaited_once()
+    assert mock_retry.call_args.args[1:] == ("job-1", 20, "quota")
+    mock_finish.assert_not_awaited()
+
+
+async def test_run_once_fails_after_max_attempts(worker):
+    with (
+        patch("src.jobs.worker.claim_summary_job", return_value=make_db_job(3)),
+        patch("src.jobs.worker.get_paper_by_id", return_value=fake_db_paper),
+        patch(
+            "src.jobs.worker.PaperService.generate_summary_once",
+            side_effect=RuntimeError("quota"),
+        ),
+        patch("src.jobs.worker.retry_summary_job") as mock_retry,
+        patch("src.jobs.worker.finish_summary_job") as mock_finish,
+    ):
+        await worker.run_once()
+    mock_retry.assert_not_awaited()
+    assert mock_finish.call_args.args[1:] == ("job-1", "failed")
+    assert mock_finish.call_args.kwargs["error"] == "quota"
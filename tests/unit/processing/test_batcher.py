@@ -0,0 +1,130 @@
+import asyncio
+import json
+import re
+
+import pytest
+from src.models.paper import Paper
+from src.models.knowledge_level import KnowledgeLevel
+from src.processing.base import AbstractSummarizer
+from src.processing import summarizer as summarizer_module
+from src.processing.batcher import SummaryBatcher
+from src.processing.summarizer import Summarizer, SummarizerRegistry
+from src.resilience import Overloaded
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeBatchSummarizer(AbstractSummarizer):
+    """Answers batch prompts with one summary per abstract, minus skipped ones."""
+
+    def __init__(self, skip=(), malformed=False, batch_error=None):
+        self.skip = set(skip)
+        self.malformed = malformed
+        self.batch_error = batch_error
+        self.prompts = []
+
+    async def summarize(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        indexes = [int(i) for i in re.findall(r"^\[(\d+)\]$", prompt, re.MULTILINE)]
+        if not indexes:
+            return "Single summary"
+        if self.batch_error is not None:
+            raise self.batch_error
+        if self.malformed:
+            return "not json"
+        return json.dumps(
+            {
+                "summaries": [
+                    {"index": i, "summary": f"Summary {i}"}
+                    for i in indexes
+                    if i not in self.skip
+                ]
+            }
+        )
+
+
+def make_paper(n: int) -> Paper:
+    return Paper(
+        title=f"Paper {n}",
+        abstract=f"Abstract {n}",
+        url=f"http://arxiv.org/abs/{n}",
+        authors=["Alice"],
+        published_date="2023-01-01",
+    )
+
+
+@pytest.fixture
+def use_backend(monkeypatch):
+    def install(backend: FakeBatchSummarizer) -> FakeBatchSummarizer:
+        registry = SummarizerRegistry({Summarizer.GEMINI_SUMMARIZER: lambda: backend})
+        monkeypatch.setattr(summarizer_module, "summarizer_registry", registry)
+        return backend
+
+    return install
+
+
+async def test_full_batch_is_sent_as_one_call(use_backend):
+    backend = use_backend(FakeBatchSummarizer())
+    batcher = SummaryBatcher(max_batch_size=3, max_wait_seconds=60)
+    results = await asyncio.gather(
+        *(batcher.summarize(make_paper(n), KnowledgeLevel.GENERAL) for n in range(3))
+    )
+    assert [r.summary for r in results] == ["Summary 0", "Summary 1", "Summary 2"]
+    assert [r.url for r in results] == [make_paper(n).url for n in range(3)]
+    assert len(backend.prompts) == 1
+
+
+async def test_partial_batch_is_sent_after_window(use_backend):
+    backend = use_backend(FakeBatchSummarizer())
+    batcher = SummaryBatcher(max_batch_size=10, max_wait_seconds=0.01)
+    results = await asyncio.gather(
+        *(batcher.summarize(make_paper(n), KnowledgeLevel.GENERAL) for n in range(2))
+    )
+    assert [r.summary for r in results] == ["Summary 0", "Summary 1"]
+    assert len(backend.prompts) == 1
+
+
+async def test_levels_are_batched_separately(use_backend):
+    backend = use_backend(FakeBatchSummarizer())
+    batcher = SummaryBatcher(max_batch_size=2, max_wait_seconds=60)
+    await asyncio.gather(
+        batcher.summarize(make_paper(0), KnowledgeLevel.GENERAL),
+        batcher.summarize(make_paper(1), KnowledgeLevel.RESEARCHER),
+        batcher.summarize(make_paper(2), KnowledgeLevel.GENERAL),
+        batcher.summarize(make_paper(3), KnowledgeLevel.RESEARCHER),
+    )
+    assert len(backend.prompts) == 2
+
+
+async def test_missing_item_falls_back_to_single_call(use_backend):
+    backend = use_backend(FakeBatchSummarizer(skip={1}))
+    batcher = SummaryBatcher(max_batch_size=3, max_wait_seconds=60)
+    results = await asyncio.gather(
+        *(batcher.summarize(make_paper(n), KnowledgeLevel.GENERAL) for n in range(3))
+    )
+    assert [r.summary for r in results] == ["Summary 0", "Single summary", "Summary 2"]
+    assert len(backend.prompts) == 2
+    assert "Abstract 1" in backend.prompts[1]
+
+
+async def test_unparsable_response_falls_back_for_every_item(use_backend):
+    backend = use_backend(FakeBatchSummarizer(malformed=True))
+    batcher = SummaryBatcher(max_batch_size=2, max_wait_seconds=60)
+    results = await asyncio.gather(
+        *(batcher.summarize(make_paper(n), KnowledgeLevel.GENERAL) for n in range(2))
+    )
+    assert [r.summary for r in results] == ["Single summary", "Single summary"]
+    assert len(backend.prompts) == 3
+
+
+async def test_failed_batch_call_fails_every_item_without_single_calls(use_backend):
+    backend = use_backend(
+        FakeBatchSummarizer(batch_error=Overloaded("model overloaded", 1.0))
+    )
+    batcher = SummaryBatcher(max_batch_size=3, max_wait_seconds=60)
+    results = await asyncio.gather(
+        *(batcher.summarize(make_paper(n), KnowledgeLevel.GENERAL) for n in range(3)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, Overloaded) for result in results)
+    assert len(backend.prompts) == 1
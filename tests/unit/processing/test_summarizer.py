@@ -0,0 +1,200 @@
+import httpx
+import pytest
+from src.models.paper import Paper
+from src.models.knowledge_level import KnowledgeLevel
+from src.processing.base import AbstractSummarizer
+from src.processing import summarizer as summarizer_module
+from src.processing.extractive_summarizer import ExtractiveSummarizer
+from src.processing.prompts import PROMPT_VERSIONS, build_prompt
+from src.resilience import DeadlineExceeded
+from src.processing.summarizer import (
+    Summarizer,
+    SummarizerRegistry,
+    is_upstream_failure,
+    summarize_paper,
+    summarize_paper_all_levels,
+    summary_key,
+)
+
+
+class FakeSummarizer(AbstractSummarizer):
+    instances = 0
+
+    def __init__(self):
+        FakeSummarizer.instances += 1
+        self.closed = False
+
+    async def summarize(self, prompt: str) -> str:
+        return "Fake summary"
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def registry():
+    FakeSummarizer.instances = 0
+    return SummarizerRegistry({Summarizer.GEMINI_SUMMARIZER: FakeSummarizer})
+
+
+def test_registry_reuses_instance(registry):
+    first = registry.get(Summarizer.GEMINI_SUMMARIZER)
+    second = registry.get(Summarizer.GEMINI_SUMMARIZER)
+    assert first is second
+    assert FakeSummarizer.instances == 1
+
+
+def test_registry_startup_creates_backends(registry):
+    registry.startup()
+    assert FakeSummarizer.instances == 1
+    registry.get(Summarizer.GEMINI_SUMMARIZER)
+    assert FakeSummarizer.instances == 1
+
+
+def test_registry_startup_tolerates_failing_backend():
+    def broken():
+        raise RuntimeError("missing credentials")
+
+    registry = SummarizerRegistry({Summarizer.GEMINI_SUMMARIZER: broken})
+    registry.startup()
+    with pytest.raises(RuntimeError):
+        registry.get(Summarizer.GEMINI_SUMMARIZER)
+
+
+def test_registry_unknown_summarizer():
+    registry = SummarizerRegistry({})
+    with pytest.raises(ValueError, match="Unsupported summarizer"):
+        registry.get(Summarizer.GEMINI_SUMMARIZER)
+
+
+def test_registry_version_without_creating_backend(registry, monkeypatch):
+    monkeypatch.setattr(summarizer_module.settings, "SUMMARY_PROMPT_VERSION", "v2")
+    assert registry.version(Summarizer.GEMINI_SUMMARIZER) == ("v2", "unknown")
+    assert FakeSummarizer.instances == 0
+
+
+def test_is_upstream_failure_only_for_model_errors():
+    gemini = Summarizer.GEMINI_SUMMARIZER
+    assert is_upstream_failure(gemini, DeadlineExceeded("too slow"))
+    assert is_upstream_failure(gemini, httpx.ConnectError("refused"))
+    assert not is_upstream_failure(gemini, RuntimeError("pool timeout"))
+    assert not is_upstream_failure(
+        Summarizer.EXTRACTIVE_SUMMARIZER, httpx.ConnectError("refused")
+    )
+
+
+def test_summary_key_ignores_whitespace_but_not_versions(monkeypatch):
+    key = summary_key("Test  abstract\n", "general", Summarizer.GEMINI_SUMMARIZER)
+    assert key == summary_key("Test abstract", "general", Summarizer.GEMINI_SUMMARIZER)
+    assert key != summary_key(
+        "Test abstract", "researcher", Summarizer.GEMINI_SUMMARIZER
+    )
+    monkeypatch.setattr(summarizer_module.settings, "SUMMARY_PROMPT_VERSION", "v2")
+    assert key != summary_key("Test abstract", "general", Summarizer.GEMINI_SUMMARIZER)
+
+
+def test_summary_key_of_prompt_free_backend_ignores_prompt_version(monkeypatch):
+    key = summary_key("Test abstract", "general", Summarizer.EXTRACTIVE_SUMMARIZER)
+    monkeypatch.setattr(summarizer_module.settings, "SUMMARY_PROMPT_VERSION", "v2")
+    assert key == summary_key(
+        "Test abstract", "general", Summarizer.EXTRACTIVE_SUMMARIZER
+    )
+    assert not ExtractiveSummarizer.uses_prompts
+
+
+def test_build_prompt_uses_configured_prompt_version(monkeypatch):
+    monkeypatch.setitem(
+        PROMPT_VERSIONS,
+        "v2",
+        {level: f"New {level.value} instructions." for level in KnowledgeLevel},
+    )
+    monkeypatch.setattr(summarizer_module.settings, "SUMMARY_PROMPT_VERSION", "v2")
+    prompt = build_prompt("Test abstract", KnowledgeLevel.GENERAL)
+    assert prompt.startswith("New general instructions.")
+
+    monkeypatch.setattr(summarizer_module.settings, "SUMMARY_PROMPT_VERSION", "v9")
+    with pytest.raises(ValueError, match="Unknown prompt version"):
+        build_prompt("Test abstract", KnowledgeLevel.GENERAL)
+
+
+@pytest.mark.anyio
+async def test_registry_shutdown_closes_backends(registry):
+    instance = registry.get(Summarizer.GEMINI_SUMMARIZER)
+    await registry.shutdown()
+    assert instance.closed
+    assert registry.get(Summarizer.GEMINI_SUMMARIZER) is not instance
+
+
+@pytest.mark.anyio
+async def test_summarize_paper_uses_registered_backend(registry, monkeypatch):
+    paper = Paper(
+        title="Test Paper",
+        abstract="Test abstract",
+        url="http://arxiv.org/abs/1234.5678",
+        authors=["Alice", "Bob"],
+        published_date="2023-01-01",
+    )
+    monkeypatch.setattr(summarizer_module, "summarizer_registry", registry)
+    result = await summarize_paper(paper, KnowledgeLevel.GENERAL)
+    assert result.summary == "Fake summary"
+    assert result.url == paper.url
+
+
+class FakeMultiLevelSummarizer(AbstractSummarizer):
+    def __init__(self, response: str):
+        self.response = response
+        self.prompts = []
+
+    async def summarize(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.response
+
+
+def multi_level_registry(response: str) -> SummarizerRegistry:
+    backend = FakeMultiLevelSummarizer(response)
+    return SummarizerRegistry({Summarizer.GEMINI_SUMMARIZER: lambda: backend})
+
+
+MULTI_LEVEL_RESPONSE = (
+    '{"general": "Plain", "undergraduate": "Student", "researcher": "Expert"}'
+)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "response", [MULTI_LEVEL_RESPONSE, f"```json\n{MULTI_LEVEL_RESPONSE}\n```"]
+)
+async def test_summarize_paper_all_levels_single_call(response, monkeypatch):
+    paper = Paper(
+        title="Test Paper",
+        abstract="Test abstract",
+        url="http://arxiv.org/abs/1234.5678",
+        authors=["Alice", "Bob"],
+        published_date="2023-01-01",
+    )
+    registry = multi_level_registry(response)
+    monkeypatch.setattr(summarizer_module, "summarizer_registry", registry)
+    result = await summarize_paper_all_levels(paper)
+    assert result == {
+        KnowledgeLevel.GENERAL: "Plain",
+        KnowledgeLevel.UNDERGRADUATE: "Student",
+        KnowledgeLevel.RESEARCHER: "Expert",
+    }
+    prompts = registry.get(Summarizer.GEMINI_SUMMARIZER).prompts
+    assert len(prompts) == 1
+    assert prompts[0].count("Test abstract") == 1
+
+
+@pytest.mark.anyio
+async def test_summarize_paper_all_levels_rejects_missing_level(monkeypatch):
+    paper = Paper(
+        title="Test Paper",
+        abstract="Test abstract",
+        url="http://arxiv.org/abs/1234.5678",
+        authors=["Alice", "Bob"],
+        published_date="2023-01-01",
+    )
+    registry = multi_level_registry('{"general": "Plain", "researcher": "Expert"}')
+    monkeypatch.setattr(summarizer_module, "summarizer_registry", registry)
+    with pytest.raises(ValueError):
+        await summarize_paper_all_levels(paper)
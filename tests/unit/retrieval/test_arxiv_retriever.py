@@ -0,0 +1,85 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.retrieval.arxiv_retriever import ArxivSource
+
+pytestmark = pytest.mark.anyio
+
+
+def fake_result(index):
+    return SimpleNamespace(
+        title=f"Paper {index}",
+        summary=f"Abstract\nof paper {index}.",
+        entry_id=f"http://arxiv.org/abs/2401.{index:05d}",
+        authors=[SimpleNamespace(name="Alice"), SimpleNamespace(name="Bob")],
+        published=datetime(2024, 1, 1),
+    )
+
+
+def fake_client(total, requested):
+    """A client whose results record how many results have been pulled."""
+
+    def results(search):
+        for index in range(total):
+            requested.append(index)
+            yield fake_result(index)
+
+    client = MagicMock()
+    client.results.side_effect = results
+    return client
+
+
+@patch("src.retrieval.arxiv_retriever.settings.ARXIV_PAGE_SIZE", 2)
+def test_iter_papers_yields_pages_lazily():
+    requested = []
+    source = ArxivSource()
+    with patch.object(source, "client", return_value=fake_client(5, requested)):
+        pages = source.iter_papers("llm", max_results=5)
+
+        first = next(pages)
+        assert [paper.title for paper in first] == ["Paper 0", "Paper 1"]
+        assert first[0].abstract == "Abstract of paper 0."
+        assert first[0].published_date == "2024-01-01"
+        # The second page has not been pulled from the client yet.
+        assert requested == [0, 1]
+
+        assert [len(page) for page in pages] == [2, 1]
+
+
+@patch("src.retrieval.arxiv_retriever.settings.ARXIV_PAGE_SIZE", 100)
+def test_clients_are_reused_per_page_size():
+    source = ArxivSource(delay_seconds=0)
+    assert source.client(10) is source.client(10)
+    assert source.client(10).page_size == 10
+    assert source.client(10).delay_seconds == 0
+    assert source.client(100) is not source.client(10)
+
+
+@patch("src.retrieval.arxiv_retriever.settings.ARXIV_PAGE_SIZE", 100)
+@patch("src.retrieval.arxiv_retriever.settings.ARXIV_PAGE_SIZE_BUCKETS", [10, 25])
+def test_page_sizes_are_bucketed():
+    sizes = [ArxivSource.page_size(n) for n in (1, 10, 11, 25, 26, 500)]
+    assert sizes == [10, 10, 25, 25, 100, 100]
+
+
+@patch("src.retrieval.arxiv_retriever.settings.ARXIV_PAGE_SIZE", 100)
+@patch("src.retrieval.arxiv_retriever.settings.ARXIV_PAGE_SIZE_BUCKETS", [10])
+def test_small_searches_request_small_pages():
+    source = ArxivSource()
+    with patch.object(source, "client", return_value=fake_client(3, [])) as client:
+        papers = source.fetch_papers("llm", max_results=3)
+    assert len(papers) == 3
+    client.assert_called_once_with(10)
+
+
+async def test_iter_papers_async_pulls_pages_in_threads():
+    source = ArxivSource()
+    with (
+        patch("src.retrieval.arxiv_retriever.settings.ARXIV_PAGE_SIZE", 2),
+        patch.object(source, "client", return_value=fake_client(3, [])),
+    ):
+        pages = [page async for page in source.iter_papers_async("llm", 3)]
+    assert [len(page) for page in pages] == [2, 1]
@@ -0,0 +1,171 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.resilience import (
+    CircuitBreaker,
+    DeadlineExceeded,
+    ResiliencePolicy,
+    request_budget,
+)
+from src.retrieval.governor import (
+    FileTokenBucket,
+    GovernedSource,
+    UpstreamGovernor,
+    background_priority,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / "rate.json")
+
+
+def make_bucket(state_file, clock):
+    return FileTokenBucket(state_file, rate=1 / 3, capacity=1, clock=clock)
+
+
+def test_buckets_on_the_same_file_share_tokens(state_file, clock):
+    # Two buckets on one file stand in for two worker processes.
+    first, second = make_bucket(state_file, clock), make_bucket(state_file, clock)
+
+    assert first.take(allow_debt=True) == (True, 0.0)
+    taken, wait = second.take(allow_debt=True)
+    assert taken and wait == pytest.approx(3)
+    taken, wait = first.take(allow_debt=True)
+    assert taken and wait == pytest.approx(6)
+
+
+def test_tokens_refill_over_time(state_file, clock):
+    bucket = make_bucket(state_file, clock)
+    bucket.take(allow_debt=True)
+
+    clock.now += 3
+    assert bucket.take(allow_debt=True) == (True, pytest.approx(0))
+
+
+def test_background_requests_wait_behind_queued_interactive_ones(state_file, clock):
+    bucket = make_bucket(state_file, clock)
+    bucket.take(allow_debt=True)
+    bucket.take(allow_debt=True)
+
+    # One interactive request is queued, so the background request waits
+    # for both slots to pass without taking a token.
+    taken, wait = bucket.take(allow_debt=False)
+    assert not taken and wait == pytest.approx(6)
+
+    clock.now += 6
+    assert bucket.take(allow_debt=False) == (True, pytest.approx(0))
+
+
+def test_corrupt_state_file_resets_the_bucket(state_file, clock):
+    with open(state_file, "w") as f:
+        f.write("not json")
+    assert make_bucket(state_file, clock).take(allow_debt=False) == (True, 0.0)
+
+
+async def test_governor_sleeps_until_the_slot(state_file, clock, monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr("src.retrieval.governor.asyncio.sleep", fake_sleep)
+    governor = UpstreamGovernor("arxiv", make_bucket(state_file, clock))
+
+    await governor.acquire()
+    await governor.acquire()
+    with background_priority():
+        await governor.acquire()
+
+    assert sleeps == [pytest.approx(3), pytest.approx(3)]
+
+
+async def test_queued_searches_do_not_time_out_or_open_the_circuit(state_file):
+    # Eight searches at ten per second take 0.7s to be let through, well
+    # past the 0.2s that each attempt may take.
+    bucket = FileTokenBucket(state_file, rate=10, capacity=1)
+    source = MagicMock()
+    source.fetch_papers_async = AsyncMock(return_value=[])
+    governed = GovernedSource(source, UpstreamGovernor("arxiv", bucket))
+    policy = ResiliencePolicy(
+        "arxiv",
+        timeout_seconds=0.2,
+        max_attempts=1,
+        backoff_seconds=0,
+        backoff_max_seconds=0,
+        hedge=False,
+        breaker=CircuitBreaker(failure_threshold=1, reset_seconds=60),
+    )
+
+    results = await asyncio.gather(
+        *(
+            policy.call(lambda n=n: governed.fetch_papers_async(f"topic {n}", 5))
+            for n in range(8)
+        )
+    )
+
+    assert results == [[]] * 8
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_cancelled_waiters_give_their_token_back(state_file, clock):
+    bucket = make_bucket(state_file, clock)
+    governor = UpstreamGovernor("arxiv", bucket)
+    await governor.acquire()
+
+    waiter = asyncio.create_task(governor.acquire())
+    await asyncio.sleep(0.05)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    # Only the first token is spent: the next caller waits one slot, not two.
+    assert bucket.take(allow_debt=True) == (True, pytest.approx(3))
+
+
+async def test_tokens_past_the_request_budget_are_given_back(state_file, clock):
+    bucket = make_bucket(state_file, clock)
+    governor = UpstreamGovernor("arxiv", bucket)
+    await governor.acquire()
+
+    with request_budget(1), pytest.raises(DeadlineExceeded):
+        await governor.acquire()
+    assert bucket.take(allow_debt=True) == (True, pytest.approx(3))
+
+
+async def test_governed_pages_each_take_a_token(state_file, clock, monkeypatch):
+    async def fake_sleep(seconds):
+        clock.now += seconds
+
+    monkeypatch.setattr("src.retrieval.governor.asyncio.sleep", fake_sleep)
+
+    async def pages(topic, max_results):
+        for index in range(3):
+            yield [index, index]
+
+    source = MagicMock()
+    source.iter_papers_async.side_effect = pages
+    governor = UpstreamGovernor("arxiv", make_bucket(state_file, clock))
+    governed = GovernedSource(source, governor)
+
+    start = clock.now
+    result = [page async for page in governed.iter_papers_async("llm", 4)]
+    # Iteration stops at max_results, without a token for a third page.
+    assert result == [[0, 0], [1, 1]]
+    assert clock.now - start == pytest.approx(3)
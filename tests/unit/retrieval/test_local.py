@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.models.paper import Paper
+from src.retrieval.local import HybridSource, LocalSource
+
+pytestmark = pytest.mark.anyio
+
+
+def make_paper(paper_id, published=None):
+    return Paper(
+        title=f"Paper {paper_id}",
+        abstract="Test abstract",
+        url=f"http://arxiv.org/abs/{paper_id}",
+        authors=["Alice", "Bob"],
+        published_date=(published or date.today()).isoformat(),
+    )
+
+
+def make_hybrid(local_papers=None, local_error=None):
+    local = MagicMock()
+    local.fetch_papers_async = AsyncMock(
+        return_value=local_papers, side_effect=local_error
+    )
+    remote = MagicMock()
+    remote.fetch_papers_async = AsyncMock(return_value=[make_paper("remote")])
+    return HybridSource(local, remote, timedelta(days=7)), local, remote
+
+
+async def test_local_source_searches_stored_papers():
+    db_paper = SimpleNamespace(
+        title="Paper 1",
+        abstract="Test abstract",
+        url="http://arxiv.org/abs/1",
+        authors="Alice,Bob",
+        published_date=date(2023, 1, 1),
+    )
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+    source = LocalSource(MagicMock(return_value=session))
+
+    with patch(
+        "src.retrieval.local.search_papers", AsyncMock(return_value=[db_paper])
+    ) as search:
+        papers = await source.fetch_papers_async("llm agents", 5)
+
+    search.assert_awaited_once_with(session, "llm agents", 5)
+    assert papers[0].authors == ["Alice", "Bob"]
+    assert papers[0].published_date == "2023-01-01"
+
+
+async def test_hybrid_serves_enough_fresh_local_papers():
+    local_papers = [make_paper(1), make_paper(2, date.today() - timedelta(days=30))]
+    hybrid, _, remote = make_hybrid(local_papers)
+
+    assert await hybrid.fetch_papers_async("llm", 2) == local_papers
+    remote.fetch_papers_async.assert_not_awaited()
+
+
+@pytest.mark.parametrize(
+    "local_papers",
+    [
+        [make_paper(1)],
+        [make_paper(1, date.today() - timedelta(days=8))] * 2,
+    ],
+    ids=["too_few", "stale"],
+)
+async def test_hybrid_searches_remotely_when_local_papers_fall_short(local_papers):
+    hybrid, _, remote = make_hybrid(local_papers)
+
+    papers = await hybrid.fetch_papers_async("llm", 2)
+
+    assert papers == [make_paper("remote")]
+    remote.fetch_papers_async.assert_awaited_once_with("llm", 2)
+
+
+async def test_hybrid_searches_remotely_when_local_search_fails():
+    hybrid, _, remote = make_hybrid(local_error=RuntimeError("db down"))
+
+    assert await hybrid.fetch_papers_async("llm", 2) == [make_paper("remote")]
+
+
+async def test_hybrid_pages_come_from_the_remote_source_on_fallback():
+    async def pages(topic, max_results):
+        yield [make_paper("remote-1")]
+        yield [make_paper("remote-2")]
+
+    hybrid, _, remote = make_hybrid([])
+    remote.iter_papers_async = pages
+
+    result = [page async for page in hybrid.iter_papers_async("llm", 2)]
+
+    assert result == [[make_paper("remote-1")], [make_paper("remote-2")]]
@@ -0,0 +1,18 @@
+import pytest
+from src.retrieval.normalize import canonical_arxiv_id
+
+
+@pytest.mark.parametrize(
+    "url, arxiv_id",
+    [
+        ("http://arxiv.org/abs/2401.01234v2", "2401.01234"),
+        ("http://arxiv.org/abs/2401.01234", "2401.01234"),
+        ("https://arxiv.org/pdf/2401.01234v1.pdf", "2401.01234"),
+        ("http://arxiv.org/abs/0704.0001v1", "0704.0001"),
+        ("http://arxiv.org/abs/hep-th/9901001v3", "hep-th/9901001"),
+        ("http://arxiv.org/abs/math.GT/0309136v1", "math.GT/0309136"),
+        ("https://example.org/papers/42", None),
+    ],
+)
+def test_canonical_arxiv_id(url, arxiv_id):
+    assert canonical_arxiv_id(url) == arxiv_id
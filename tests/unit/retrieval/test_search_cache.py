@@ -0,0 +1,227 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from prometheus_client import REGISTRY
+from src.models.paper import Paper
+from src.retrieval import factory
+from src.retrieval.cache import (
+    CacheEntry,
+    InMemorySearchCache,
+    PostgresSearchCache,
+    SearchCache,
+    make_cache_key,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_paper(title="Test Paper"):
+    return Paper(
+        title=title,
+        abstract="Test abstract",
+        url="http://arxiv.org/abs/1234.5678",
+        authors=["Alice", "Bob"],
+        published_date="2023-01-01",
+    )
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return SearchCache(InMemorySearchCache(10), ttl=60, stale_ttl=300, clock=clock)
+
+
+def test_cache_key_normalizes_topic():
+    assert make_cache_key("arxiv", "  Large  Language\tModels ", 5) == make_cache_key(
+        "ARXIV", "large language models", 5
+    )
+    assert make_cache_key("arxiv", "llm", 5) != make_cache_key("arxiv", "llm", 10)
+
+
+async def test_fresh_entry_is_served_from_cache(cache):
+    loader = AsyncMock(return_value=[make_paper()])
+    first = await cache.fetch("arxiv", "LLM", 5, loader)
+    second = await cache.fetch("arxiv", "llm", 5, loader)
+    assert first == second
+    loader.assert_awaited_once()
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+async def test_stale_entry_is_served_while_refreshing(cache, clock):
+    loader = AsyncMock(side_effect=[[make_paper("old")], [make_paper("new")]])
+    await cache.fetch("arxiv", "llm", 5, loader)
+    clock.now += 120
+
+    stale = await cache.fetch("arxiv", "llm", 5, loader)
+    assert stale[0].title == "old"
+    assert cache.stats.stale_hits == 1
+
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    refreshed = await cache.fetch("arxiv", "llm", 5, loader)
+    assert refreshed[0].title == "new"
+    assert cache.stats.refreshes == 1
+
+
+async def test_expired_entry_is_a_miss(cache, clock):
+    loader = AsyncMock(side_effect=[[make_paper("old")], [make_paper("new")]])
+    await cache.fetch("arxiv", "llm", 5, loader)
+    clock.now += 1000
+    result = await cache.fetch("arxiv", "llm", 5, loader)
+    assert result[0].title == "new"
+    assert cache.stats.misses == 2
+
+
+async def test_failed_refresh_keeps_serving_stale(cache, clock):
+    loader = AsyncMock(side_effect=[[make_paper("old")], RuntimeError("arXiv down")])
+    await cache.fetch("arxiv", "llm", 5, loader)
+    clock.now += 120
+    await cache.fetch("arxiv", "llm", 5, loader)
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert cache.stats.refresh_errors == 1
+    result = await cache.fetch("arxiv", "llm", 5, loader)
+    assert result[0].title == "old"
+
+
+async def test_in_memory_backend_evicts_least_recently_used(clock):
+    cache = SearchCache(InMemorySearchCache(2), ttl=60, clock=clock)
+    loader = AsyncMock(return_value=[make_paper()])
+    await cache.fetch("arxiv", "a", 5, loader)
+    await cache.fetch("arxiv", "b", 5, loader)
+    await cache.fetch("arxiv", "a", 5, loader)
+    await cache.fetch("arxiv", "c", 5, loader)
+    assert len(cache.backend) == 2
+
+    await cache.fetch("arxiv", "a", 5, loader)
+    assert cache.stats.hits == 2
+    await cache.fetch("arxiv", "b", 5, loader)
+    assert loader.await_count == 4
+
+
+async def test_lookups_are_exported_as_metrics(cache):
+    def lookups(result):
+        return (
+            REGISTRY.get_sample_value("search_cache_lookups_total", {"result": result})
+            or 0
+        )
+
+    before = lookups("hit"), lookups("miss")
+    loader = AsyncMock(return_value=[make_paper()])
+    await cache.fetch("arxiv", "metrics", 5, loader)
+    await cache.fetch("arxiv", "metrics", 5, loader)
+    assert (lookups("hit"), lookups("miss")) == (before[0] + 1, before[1] + 1)
+
+
+async def test_prime_stores_every_prefix_at_once(cache, clock):
+    papers = [make_paper(f"Paper {n}") for n in range(3)]
+    cache.backend.set_many = AsyncMock(wraps=cache.backend.set_many)
+    await cache.prime("arxiv", "llm", 3, papers)
+    cache.backend.set_many.assert_awaited_once()
+
+    loader = AsyncMock()
+    assert await cache.fetch("arxiv", "llm", 2, loader) == papers[:2]
+    loader.assert_not_called()
+
+
+def make_postgres_cache(row=None):
+    db = MagicMock()
+    result = MagicMock()
+    result.first.return_value = row
+    db.execute = AsyncMock(return_value=result)
+    db.commit = AsyncMock()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db
+
+    return PostgresSearchCache(session_factory, max_entries=10), db
+
+
+def cached_row(accessed_ago: float):
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        papers=[make_paper().model_dump()],
+        fetched_at=now,
+        accessed_at=now - timedelta(seconds=accessed_ago),
+    )
+
+
+async def test_postgres_hit_records_access_only_once_per_interval():
+    backend, db = make_postgres_cache(cached_row(accessed_ago=1))
+    entry = await backend.get("key")
+    assert entry.papers == [make_paper()]
+    assert db.execute.await_count == 1
+    db.commit.assert_not_called()
+
+    backend, db = make_postgres_cache(cached_row(accessed_ago=120))
+    await backend.get("key")
+    assert db.execute.await_count == 2
+    db.commit.assert_awaited_once()
+
+
+async def test_postgres_set_many_writes_and_prunes_in_one_transaction():
+    backend, db = make_postgres_cache()
+    await backend.set_many(
+        {
+            f"key{n}": CacheEntry(papers=[make_paper()], fetched_at=1000.0)
+            for n in range(5)
+        }
+    )
+    # One upsert of every entry and one prune.
+    assert db.execute.await_count == 2
+    db.commit.assert_awaited_once()
+
+
+async def test_factory_serves_repeated_searches_from_cache(monkeypatch, cache):
+    source = AsyncMock()
+    source.fetch_papers_async.return_value = [make_paper()]
+    monkeypatch.setitem(factory.SOURCES, "fake", source)
+    monkeypatch.setattr(factory, "search_cache", cache)
+
+    await factory.fetch_papers("llm", max_results=5, source="fake")
+    await factory.fetch_papers("llm", max_results=5, source="fake")
+    source.fetch_papers_async.assert_awaited_once_with("llm", 5)
+
+
+async def test_factory_coalesces_identical_searches(monkeypatch):
+    papers = [make_paper()]
+    release = asyncio.Event()
+
+    async def slow_fetch(topic, max_results):
+        await release.wait()
+        return papers
+
+    source = AsyncMock()
+    source.fetch_papers_async.side_effect = slow_fetch
+    monkeypatch.setitem(factory.SOURCES, "fake", source)
+
+    tasks = [
+        asyncio.create_task(factory.fetch_from_source("fake", topic, 5))
+        for topic in ("llm", "LLM", " llm ")
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [papers] * 3
+    source.fetch_papers_async.assert_awaited_once_with("llm", 5)
+
+
+async def test_factory_unknown_source():
+    with pytest.raises(ValueError, match="Unknown source"):
+        await factory.fetch_papers("llm", source="missing")
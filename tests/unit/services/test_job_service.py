@@ -0,0 +1,101 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.models.job import JobStatus
+from src.models.knowledge_level import KnowledgeLevel
+from src.services.job_service import JobService, job_events
+
+pytestmark = pytest.mark.anyio
+
+fake_db_paper = SimpleNamespace(
+    id=1,
+    title="Test Paper",
+    abstract="Test abstract",
+    url="http://arxiv.org/abs/1234.5678",
+    authors="Alice,Bob",
+    published_date=date(2023, 1, 1),
+)
+
+
+def make_db_job(status="pending"):
+    return SimpleNamespace(
+        id="job-1",
+        paper_id=1,
+        knowledge_level="general",
+        summarizer="gemini_summarizer",
+        status=status,
+        attempts=0,
+        error=None,
+        created_at=None,
+        finished_at=None,
+    )
+
+
+@pytest.fixture
+def fake_db():
+    db = MagicMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+async def test_submit_returns_cached_summary(fake_db):
+    with (
+        patch(
+            "src.services.job_service.PaperService.cached_summary",
+            return_value="Cached",
+        ),
+        patch("src.services.job_service.create_summary_job") as mock_create,
+    ):
+        job, summary = await JobService.submit_summary_job(
+            fake_db, fake_db_paper, KnowledgeLevel.GENERAL
+        )
+    assert job is None
+    assert summary.summary == "Cached"
+    mock_create.assert_not_awaited()
+
+
+async def test_submit_queues_job(fake_db):
+    with (
+        patch(
+            "src.services.job_service.PaperService.cached_summary", return_value=None
+        ),
+        patch(
+            "src.services.job_service.create_summary_job", return_value=make_db_job()
+        ) as mock_create,
+    ):
+        job, summary = await JobService.submit_summary_job(
+            fake_db, fake_db_paper, KnowledgeLevel.GENERAL
+        )
+    assert summary is None
+    assert job.status == JobStatus.PENDING
+    assert mock_create.call_args.args[1]["paper_id"] == 1
+
+
+async def test_get_job_waits_until_finished(fake_db):
+    with (
+        patch(
+            "src.services.job_service.get_summary_job",
+            side_effect=[make_db_job("running"), make_db_job("succeeded")],
+        ),
+        patch("src.services.job_service.get_paper_by_id", return_value=fake_db_paper),
+        patch(
+            "src.services.job_service.get_summary",
+            return_value=SimpleNamespace(summary="Done"),
+        ),
+    ):
+        waiter = asyncio.ensure_future(JobService.get_job(fake_db, "job-1", wait=10))
+        await asyncio.sleep(0)
+        job_events.job_finished("job-1")
+        job = await asyncio.wait_for(waiter, 1)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result.summary == "Done"
+    fake_db.rollback.assert_awaited_once()
+
+
+async def test_get_job_returns_pending_when_wait_elapses(fake_db):
+    with patch("src.services.job_service.get_summary_job", return_value=make_db_job()):
+        job = await JobService.get_job(fake_db, "job-1", wait=0.01)
+    assert job.status == JobStatus.PENDING
+    assert job.result is None
@@ -1,14 +1,44 @@
+import asyncio
+from datetime import date, datetime, timezone
+from contextlib import asynccontextmanager
 from types import SimpleNamespace
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from src.services.paper_service import PaperService
 from src.models.paper import Paper, PaperSummary
 from src.models.knowledge_level import KnowledgeLevel
+from src.processing.summarizer import Summarizer, summary_key
+from src.resilience import CircuitOpenError, Overloaded
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def no_reusable_summaries():
+    with patch(
+        "src.services.paper_service.get_summary_candidates", return_value=[]
+    ) as mock_candidates:
+        yield mock_candidates
+
+
+@pytest.fixture(autouse=True)
+def no_stored_summaries():
+    """Nothing stored under any content key, and no stale summaries."""
+    with (
+        patch("src.services.paper_service.get_summary_by_key", return_value=None),
+        patch("src.services.paper_service.get_summaries_by_keys", return_value=[]),
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch("src.services.paper_service.touch_summaries") as mock_touch,
+    ):
+        yield mock_touch
 
 
 @pytest.fixture
 def fake_db():
-    return MagicMock()
+    db = MagicMock()
+    db.commit = AsyncMock()
+    db.in_transaction.return_value = True
+    return db
 
 
 @pytest.fixture
@@ -22,13 +52,23 @@ def fake_paper():
     )
 
 
+@asynccontextmanager
+async def fake_connection(db):
+    yield SimpleNamespace()
+
+
+def stored_as_given(conn, summary_data):
+    return summary_data["summary"]
+
+
 fake_db_paper = SimpleNamespace(
     id=1,
     title="Test Paper",
     abstract="Test abstract",
     url="http://arxiv.org/abs/1234.5678",
+    arxiv_id="1234.5678",
     authors="Alice,Bob",
-    published_date="2023-01-01",
+    published_date=date(2023, 1, 1),
 )
 
 fake_cached = SimpleNamespace(
@@ -38,47 +78,200 @@ fake_cached = SimpleNamespace(
     url="http://arxiv.org/abs/1234.5678",
     authors="Alice,Bob",
     published_date="2023-01-01",
+    paper_id=1,
+    knowledge_level="general",
+    summarizer="gemini_summarizer",
     summary="Cached summary",
+    last_served_at=datetime.now(timezone.utc),
 )
 
 
-def test_get_or_create_paper_creates_new(fake_db, fake_paper):
-    with (
-        patch("src.services.paper_service.get_paper_by_url", return_value=None),
-        patch("src.services.paper_service.create_paper", return_value=fake_db_paper),
-    ):
-        result = PaperService.get_or_create_paper(fake_db, fake_paper)
-        assert result == fake_db_paper
-
-
-def test_get_or_create_paper_returns_existing(fake_db, fake_paper):
+async def test_get_or_create_paper_upserts_the_paper(fake_db, fake_paper):
     with patch(
-        "src.services.paper_service.get_paper_by_url", return_value=fake_db_paper
-    ):
-        result = PaperService.get_or_create_paper(fake_db, fake_paper)
-        assert result == fake_db_paper
+        "src.services.paper_service.upsert_papers", return_value=[fake_db_paper]
+    ) as mock_upsert:
+        result = await PaperService.get_or_create_paper(fake_db, fake_paper)
+    assert result == fake_db_paper
+    [row] = mock_upsert.call_args.args[1]
+    assert row["url"] == fake_paper.url
 
 
-def test_get_papers_and_store(fake_db, fake_paper):
-    with patch.object(PaperService, "get_or_create_paper", return_value=fake_db_paper):
+async def test_get_papers_and_store(fake_db, fake_paper):
+    with patch(
+        "src.services.paper_service.upsert_papers", return_value=[fake_db_paper]
+    ) as mock_upsert:
         papers = [fake_paper]
-        result = PaperService.get_papers_and_store(fake_db, papers)
+        result = await PaperService.get_papers_and_store(fake_db, papers)
         assert isinstance(result, list)
         assert result[0].title == fake_paper.title
         assert result[0].authors == ["Alice", "Bob"]
+        mock_upsert.assert_awaited_once()
+        row = mock_upsert.call_args.args[1][0]
+        assert row["authors"] == "Alice,Bob"
+        assert row["published_date"] == date(2023, 1, 1)
+
+
+async def test_get_related_papers_in_score_order(fake_db):
+    related = SimpleNamespace(**{**vars(fake_db_paper), "id": 2})
+    index = MagicMock()
+    index.refresh = AsyncMock()
+    index.related.return_value = [(2, 3.5)]
+    with (
+        patch("src.services.paper_service.similarity_index", index),
+        patch(
+            "src.services.paper_service.get_papers_by_ids", return_value=[related]
+        ) as mock_get,
+    ):
+        result = await PaperService.get_related_papers(fake_db, fake_db_paper, 5)
+
+    # The index is refreshed in the background, not on the request path.
+    index.refresh.assert_not_awaited()
+    index.related.assert_called_once_with((1, "Test Paper", "Test abstract"), 5)
+    mock_get.assert_awaited_once_with(fake_db, [2])
+    assert result[0].id == 2 and result[0].score == 3.5
+    assert result[0].authors == ["Alice", "Bob"]
+
+
+async def test_get_or_create_summary_reuses_unchanged_version(
+    fake_db, fake_paper, no_reusable_summaries
+):
+    no_reusable_summaries.return_value = [("Test abstract", "Earlier summary")]
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.create_summary",
+            side_effect=lambda db, data: SimpleNamespace(**data),
+        ) as mock_create,
+        patch("src.services.paper_service.summarize_paper") as mock_summarize,
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
+
+    assert result.summary == "Earlier summary"
+    assert mock_create.call_args.args[1]["paper_id"] == fake_db_paper.id
+    mock_summarize.assert_not_called()
+    args = no_reusable_summaries.call_args.args
+    assert args[1:3] == (1, "1234.5678")
+
 
+async def test_get_or_create_summary_regenerates_changed_version(
+    fake_db, fake_paper, no_reusable_summaries
+):
+    no_reusable_summaries.return_value = [
+        ("An entirely different abstract about galaxies", "Earlier summary")
+    ]
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch(
+            "src.services.paper_service.summarize_paper",
+            return_value=SimpleNamespace(summary="New summary"),
+        ),
+        patch("src.services.paper_service.insert_summary", side_effect=stored_as_given),
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
 
-def test_get_or_create_summary_cached(fake_db, fake_paper):
-    with patch("src.services.paper_service.get_summary", return_value=fake_cached):
-        result = PaperService.get_or_create_summary(
+    assert result.summary == "New summary"
+
+
+async def test_get_or_create_summary_cached(fake_db, fake_paper, no_stored_summaries):
+    with patch(
+        "src.services.paper_service.get_summary_by_key", return_value=fake_cached
+    ) as mock_get:
+        result = await PaperService.get_or_create_summary(
             fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
         )
         assert isinstance(result, PaperSummary)
         assert result.summary == "Cached summary"
         assert result.authors == ["Alice", "Bob"]
+    assert mock_get.call_args.args[1] == summary_key(
+        "Test abstract", "general", Summarizer.GEMINI_SUMMARIZER
+    )
+    # Served recently enough not to be recorded again.
+    no_stored_summaries.assert_awaited_once_with(fake_db, [])
+
+
+async def test_get_or_create_summary_copies_identical_abstracts_summary(
+    fake_db, fake_paper
+):
+    other = SimpleNamespace(**{**vars(fake_cached), "id": 7, "paper_id": 2})
+    with (
+        patch("src.services.paper_service.get_summary_by_key", return_value=other),
+        patch("src.services.paper_service.create_summary") as mock_create,
+        patch("src.services.paper_service.summarize_paper") as mock_summarize,
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
+    assert result.summary == "Cached summary"
+    stored = mock_create.call_args.args[1]
+    assert stored["paper_id"] == 1 and stored["content_key"] == summary_key(
+        "Test abstract", "general", Summarizer.GEMINI_SUMMARIZER
+    )
+    mock_summarize.assert_not_called()
+
+
+async def test_get_or_create_summary_serves_stale_and_queues_job(
+    fake_db, fake_paper, no_stored_summaries
+):
+    stale = SimpleNamespace(**{**vars(fake_cached), "last_served_at": None})
+    with (
+        patch("src.services.paper_service.get_summary", return_value=stale),
+        patch(
+            "src.services.paper_service.create_summary_job",
+            return_value=SimpleNamespace(id="job-1"),
+        ) as mock_queue,
+        patch("src.services.paper_service.summarize_paper") as mock_summarize,
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
+    assert result.summary == "Cached summary"
+    assert result.degraded == "stale"
+    assert mock_queue.call_args.args[1] == {
+        "paper_id": 1,
+        "knowledge_level": "general",
+        "summarizer": "gemini_summarizer",
+    }
+    no_stored_summaries.assert_awaited_once_with(fake_db, [1])
+    mock_summarize.assert_not_called()
 
 
-def test_get_or_create_summary_new(fake_db, fake_paper):
+async def test_get_or_create_summary_regenerates_stale_when_not_serving_it(
+    fake_db, fake_paper
+):
+    with (
+        patch("src.services.paper_service.settings.SUMMARY_SERVE_STALE", False),
+        patch("src.services.paper_service.get_summary", return_value=fake_cached),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch(
+            "src.services.paper_service.summarize_paper",
+            return_value=SimpleNamespace(summary="New summary"),
+        ),
+        patch(
+            "src.services.paper_service.insert_summary", side_effect=stored_as_given
+        ) as mock_insert,
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
+    assert result.summary == "New summary"
+    assert result.degraded is None
+    assert mock_insert.call_args.args[1]["prompt_version"] == "v1"
+
+
+async def test_get_or_create_summary_new(fake_db, fake_paper):
     fake_summary_obj = PaperSummary(
         title=fake_paper.title,
         authors=fake_paper.authors,
@@ -88,13 +281,657 @@ def test_get_or_create_summary_new(fake_db, fake_paper):
     )
     with (
         patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
         patch(
             "src.services.paper_service.summarize_paper", return_value=fake_summary_obj
         ),
-        patch("src.services.paper_service.create_summary") as mock_create_summary,
+        patch(
+            "src.services.paper_service.insert_summary", side_effect=stored_as_given
+        ) as mock_insert_summary,
     ):
-        result = PaperService.get_or_create_summary(
+        result = await PaperService.get_or_create_summary(
             fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
         )
         assert result == fake_summary_obj
-        mock_create_summary.assert_called_once()
+        mock_insert_summary.assert_awaited_once()
+        assert mock_insert_summary.call_args.args[1]["summary"] == "Generated summary"
+
+
+async def test_generate_summary_once_holds_no_connection_during_model_call(
+    fake_db, fake_paper
+):
+    events = []
+
+    @asynccontextmanager
+    async def recording_connection(db):
+        events.append("connect")
+        yield SimpleNamespace()
+        events.append("release")
+
+    async def summarize(paper, knowledge_level, summarizer):
+        events.append("model")
+        return SimpleNamespace(summary="Generated summary")
+
+    fake_db.commit.side_effect = lambda: events.append("commit")
+    with (
+        patch("src.services.paper_service.summary_connection", recording_connection),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch("src.services.paper_service.summarize_paper", side_effect=summarize),
+        patch("src.services.paper_service.insert_summary", side_effect=stored_as_given),
+    ):
+        await PaperService.generate_summary_once(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
+    # The session's connection is back in the pool, and the connections used
+    # to check and store the summary are released around the model call.
+    assert events == [
+        "commit",
+        "connect",
+        "release",
+        "model",
+        "connect",
+        "release",
+    ]
+
+
+async def test_generate_summary_once_returns_summary_stored_first(fake_db, fake_paper):
+    with (
+        patch("src.services.paper_service.summary_connection", fake_connection),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch(
+            "src.services.paper_service.summarize_paper",
+            return_value=SimpleNamespace(summary="Generated summary"),
+        ),
+        patch(
+            "src.services.paper_service.insert_summary",
+            return_value="Stored by another worker",
+        ),
+    ):
+        result = await PaperService.generate_summary_once(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
+    assert result == "Stored by another worker"
+
+
+async def test_get_or_create_summary_generated_by_other_worker(fake_db, fake_paper):
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch(
+            "src.services.paper_service.get_summary_text",
+            return_value="Summary from another worker",
+        ),
+        patch("src.services.paper_service.summarize_paper") as mock_summarize,
+        patch(
+            "src.services.paper_service.insert_summary", side_effect=stored_as_given
+        ) as mock_insert_summary,
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
+        assert result.summary == "Summary from another worker"
+        mock_summarize.assert_not_awaited()
+        # Stored for this paper in case it was another paper's.
+        stored = mock_insert_summary.call_args.args[1]
+        assert stored["paper_id"] == 1
+        assert stored["summary"] == "Summary from another worker"
+
+
+async def test_get_or_create_summary_coalesces_concurrent_requests(fake_db, fake_paper):
+    release = asyncio.Event()
+
+    async def slow_summarize(paper, level, summarizer):
+        await release.wait()
+        return PaperSummary(
+            title=paper.title,
+            authors=paper.authors,
+            published_date=paper.published_date,
+            url=paper.url,
+            summary="Generated summary",
+        )
+
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch(
+            "src.services.paper_service.summarize_paper", side_effect=slow_summarize
+        ) as mock_summarize,
+        patch(
+            "src.services.paper_service.insert_summary", side_effect=stored_as_given
+        ) as mock_insert_summary,
+    ):
+        requests = [
+            asyncio.ensure_future(
+                PaperService.get_or_create_summary(
+                    fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+                )
+            )
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*requests)
+        assert [r.summary for r in results] == ["Generated summary"] * 5
+        assert mock_summarize.await_count == 1
+        mock_insert_summary.assert_awaited_once()
+
+
+async def test_get_or_create_summaries_mixes_cached_and_generated(fake_db, fake_paper):
+    other_paper = fake_paper.model_copy(update={"url": "http://arxiv.org/abs/9999"})
+    other_db_paper = SimpleNamespace(**{**vars(fake_db_paper), "id": 2})
+    other_db_paper.url = other_paper.url
+    other_db_paper.abstract = "Another abstract"
+    cached_row = SimpleNamespace(
+        id=1,
+        paper_id=1,
+        summary="Cached summary",
+        content_key=summary_key(
+            "Test abstract", "general", Summarizer.GEMINI_SUMMARIZER
+        ),
+        last_served_at=datetime.now(timezone.utc),
+    )
+    generated = PaperSummary(
+        title=other_paper.title,
+        authors=other_paper.authors,
+        published_date=other_paper.published_date,
+        url=other_paper.url,
+        summary="Generated summary",
+    )
+    with (
+        patch(
+            "src.services.paper_service.upsert_papers",
+            return_value=[fake_db_paper, other_db_paper],
+        ),
+        patch(
+            "src.services.paper_service.get_summaries_by_keys",
+            return_value=[cached_row],
+        ),
+        patch("src.services.paper_service.get_summaries_for_papers", return_value=[]),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch(
+            "src.services.paper_service.summarize_paper", return_value=generated
+        ) as mock_summarize,
+        patch(
+            "src.services.paper_service.insert_summary", side_effect=stored_as_given
+        ) as mock_insert,
+    ):
+        result = await PaperService.get_or_create_summaries(
+            fake_db, [fake_paper, other_paper], KnowledgeLevel.GENERAL
+        )
+        assert [s.summary for s in result] == ["Cached summary", "Generated summary"]
+        assert result[1].url == other_paper.url
+        mock_summarize.assert_awaited_once_with(
+            other_paper, KnowledgeLevel.GENERAL, Summarizer.GEMINI_SUMMARIZER
+        )
+        assert mock_insert.call_args.args[1] == {
+            "paper_id": 2,
+            "knowledge_level": "general",
+            "summarizer": "gemini_summarizer",
+            "summary": "Generated summary",
+            "content_key": summary_key(
+                "Another abstract", "general", Summarizer.GEMINI_SUMMARIZER
+            ),
+            "prompt_version": "v1",
+            "model": "gemini-2.5-flash",
+        }
+
+
+async def test_get_or_create_summaries_serves_stale_summaries(fake_db, fake_paper):
+    stale_row = SimpleNamespace(
+        id=1,
+        paper_id=1,
+        knowledge_level="general",
+        summarizer="gemini_summarizer",
+        summary="Stale summary",
+        last_served_at=datetime.now(timezone.utc),
+    )
+    with (
+        patch("src.services.paper_service.upsert_papers", return_value=[fake_db_paper]),
+        patch(
+            "src.services.paper_service.get_summaries_for_papers",
+            return_value=[stale_row],
+        ),
+        patch(
+            "src.services.paper_service.create_summary_job",
+            return_value=SimpleNamespace(id="job-1"),
+        ) as mock_queue,
+        patch("src.services.paper_service.summarize_paper") as mock_summarize,
+    ):
+        result = await PaperService.get_or_create_summaries(
+            fake_db, [fake_paper], KnowledgeLevel.GENERAL
+        )
+    assert [(s.summary, s.degraded) for s in result] == [("Stale summary", "stale")]
+    mock_queue.assert_awaited_once()
+    mock_summarize.assert_not_called()
+
+
+async def test_get_or_create_summaries_stores_successes_before_raising(
+    fake_db, fake_paper
+):
+    other_paper = fake_paper.model_copy(update={"url": "http://arxiv.org/abs/9999"})
+    other_db_paper = SimpleNamespace(**{**vars(fake_db_paper), "id": 2})
+    other_db_paper.url = other_paper.url
+    other_db_paper.abstract = "Another abstract"
+    generated = PaperSummary(
+        title=fake_paper.title,
+        authors=fake_paper.authors,
+        published_date=fake_paper.published_date,
+        url=fake_paper.url,
+        summary="Generated summary",
+    )
+
+    def fake_summarize(paper, level, summarizer):
+        if paper.url == other_paper.url:
+            raise RuntimeError("LLM failure")
+        return generated
+
+    with (
+        patch(
+            "src.services.paper_service.upsert_papers",
+            return_value=[fake_db_paper, other_db_paper],
+        ),
+        patch("src.services.paper_service.get_summaries_for_papers", return_value=[]),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch("src.services.paper_service.summarize_paper", side_effect=fake_summarize),
+        patch(
+            "src.services.paper_service.insert_summary", side_effect=stored_as_given
+        ) as mock_insert,
+        patch("src.services.paper_service.settings.SUMMARY_FALLBACKS", []),
+    ):
+        with pytest.raises(RuntimeError, match="LLM failure"):
+            await PaperService.get_or_create_summaries(
+                fake_db, [fake_paper, other_paper], KnowledgeLevel.GENERAL
+            )
+        stored = [call.args[1]["paper_id"] for call in mock_insert.call_args_list]
+        assert stored == [1]
+
+
+@asynccontextmanager
+async def fake_session():
+    yield MagicMock()
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+async def test_stream_summary_cached():
+    with (
+        patch("src.services.paper_service.AsyncSessionLocal", fake_session),
+        patch(
+            "src.services.paper_service.get_summary_by_key", return_value=fake_cached
+        ),
+        patch("src.services.paper_service.summarize_paper_stream") as mock_stream,
+    ):
+        events = await collect(
+            PaperService.stream_summary(fake_db_paper, KnowledgeLevel.GENERAL)
+        )
+    assert events == [("summary", {"summary": "Cached summary", "cached": True})]
+    mock_stream.assert_not_called()
+
+
+async def test_stream_summary_serves_stale_summary(fake_paper):
+    stale = SimpleNamespace(
+        id=1,
+        paper_id=1,
+        knowledge_level="general",
+        summarizer="gemini_summarizer",
+        summary="Old summary",
+        last_served_at=None,
+    )
+    with (
+        patch("src.services.paper_service.AsyncSessionLocal", fake_session),
+        patch("src.services.paper_service.get_summary", return_value=stale),
+        patch(
+            "src.services.paper_service.create_summary_job",
+            return_value=SimpleNamespace(id=7),
+        ) as mock_job,
+        patch("src.services.paper_service.summarize_paper_stream") as mock_stream,
+    ):
+        events = await collect(
+            PaperService.stream_summary(fake_db_paper, KnowledgeLevel.GENERAL)
+        )
+    assert events == [
+        (
+            "summary",
+            {"summary": "Old summary", "cached": True, "degraded": "stale"},
+        )
+    ]
+    mock_job.assert_awaited_once()
+    mock_stream.assert_not_called()
+
+
+async def test_stream_summary_new_stores_assembled_text():
+    async def fake_stream(paper, knowledge_level, summarizer):
+        for chunk in ["Generated ", "summary"]:
+            yield chunk
+
+    with (
+        patch("src.services.paper_service.AsyncSessionLocal", fake_session),
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch("src.services.paper_service.summarize_paper_stream", fake_stream),
+        patch(
+            "src.services.paper_service.insert_summary", side_effect=stored_as_given
+        ) as mock_insert,
+    ):
+        events = await collect(
+            PaperService.stream_summary(fake_db_paper, KnowledgeLevel.GENERAL)
+        )
+    assert events == [
+        ("token", {"text": "Generated "}),
+        ("token", {"text": "summary"}),
+        ("summary", {"summary": "Generated summary", "cached": False}),
+    ]
+    stored = mock_insert.call_args.args[1]
+    assert stored["paper_id"] == 1
+    assert stored["summary"] == "Generated summary"
+
+
+async def test_stream_summary_coalesces_concurrent_streams():
+    release = asyncio.Event()
+    calls = []
+
+    async def slow_stream(paper, knowledge_level, summarizer):
+        calls.append(1)
+        yield "Generated "
+        await release.wait()
+        yield "summary"
+
+    with (
+        patch("src.services.paper_service.AsyncSessionLocal", fake_session),
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch("src.services.paper_service.get_summary_text", return_value=None),
+        patch("src.services.paper_service.summarize_paper_stream", slow_stream),
+        patch(
+            "src.services.paper_service.insert_summary", side_effect=stored_as_given
+        ) as mock_insert,
+    ):
+        streams = [
+            asyncio.ensure_future(
+                collect(
+                    PaperService.stream_summary(fake_db_paper, KnowledgeLevel.GENERAL)
+                )
+            )
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        leader, *followers = await asyncio.gather(*streams)
+
+    final = ("summary", {"summary": "Generated summary", "cached": False})
+    assert leader == [
+        ("token", {"text": "Generated "}),
+        ("token", {"text": "summary"}),
+        final,
+    ]
+    assert followers == [[final], [final]]
+    assert len(calls) == 1
+    mock_insert.assert_awaited_once()
+
+
+async def test_get_or_create_summary_multi_level_stores_all_levels(fake_db, fake_paper):
+    generated = {
+        KnowledgeLevel.GENERAL: "Plain",
+        KnowledgeLevel.UNDERGRADUATE: "Student",
+        KnowledgeLevel.RESEARCHER: "Expert",
+    }
+    stored = {
+        summary_key("Test abstract", level.value, Summarizer.GEMINI_SUMMARIZER): text
+        for level, text in generated.items()
+    }
+    with (
+        patch("src.services.paper_service.settings.SUMMARY_MULTI_LEVEL_ENABLED", True),
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch(
+            "src.services.paper_service.get_summary_texts_by_keys",
+            side_effect=[{}, stored],
+        ),
+        patch(
+            "src.services.paper_service.summarize_paper_all_levels",
+            return_value=generated,
+        ) as mock_summarize,
+        patch("src.services.paper_service.summarize_paper") as mock_single,
+        patch("src.services.paper_service.insert_summaries") as mock_insert,
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.UNDERGRADUATE
+        )
+    assert result.summary == "Student"
+    mock_summarize.assert_awaited_once()
+    mock_single.assert_not_called()
+    mock_insert.assert_awaited_once()
+    rows = mock_insert.call_args.args[1]
+    assert {row["content_key"] for row in rows} == set(stored)
+
+
+async def test_generate_all_levels_once_keeps_existing_levels(fake_db, fake_paper):
+    keys = {
+        level.value: summary_key(
+            "Test abstract", level.value, Summarizer.GEMINI_SUMMARIZER
+        )
+        for level in KnowledgeLevel
+    }
+    existing = {keys["general"]: "Existing"}
+    generated = {
+        KnowledgeLevel.GENERAL: "Plain",
+        KnowledgeLevel.UNDERGRADUATE: "Student",
+        KnowledgeLevel.RESEARCHER: "Expert",
+    }
+    with (
+        patch(
+            "src.services.paper_service.summary_connection",
+            fake_connection,
+        ),
+        patch(
+            "src.services.paper_service.get_summary_texts_by_keys",
+            side_effect=[
+                existing,
+                {
+                    keys["general"]: "Existing",
+                    keys["undergraduate"]: "Student",
+                    keys["researcher"]: "Expert",
+                },
+            ],
+        ),
+        patch(
+            "src.services.paper_service.summarize_paper_all_levels",
+            return_value=generated,
+        ),
+        patch("src.services.paper_service.insert_summaries") as mock_insert,
+    ):
+        result = await PaperService.generate_all_levels_once(
+            fake_db, fake_db_paper, fake_paper
+        )
+    assert result["general"] == "Existing"
+    rows = mock_insert.call_args.args[1]
+    assert [row["summary"] for row in rows] == ["Existing", "Student", "Expert"]
+
+
+async def test_get_or_create_summary_extractive_skips_generation(fake_db, fake_paper):
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch("src.services.paper_service.summary_connection") as mock_connection,
+        patch(
+            "src.services.paper_service.create_summary",
+            side_effect=lambda db, data: SimpleNamespace(**data),
+        ) as mock_create,
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db,
+            fake_db_paper,
+            fake_paper,
+            KnowledgeLevel.GENERAL,
+            Summarizer.EXTRACTIVE_SUMMARIZER,
+        )
+    mock_connection.assert_not_called()
+    stored = mock_create.call_args.args[1]
+    assert stored["summarizer"] == "extractive_summarizer"
+    assert result.summary == stored["summary"] == "Test abstract"
+
+
+async def test_get_or_create_summaries_extractive_generates_in_one_pass(
+    fake_db, fake_paper
+):
+    other_paper = fake_paper.model_copy(update={"url": "http://arxiv.org/abs/9999"})
+    other_db_paper = SimpleNamespace(**{**vars(fake_db_paper), "id": 2})
+    other_db_paper.url = other_paper.url
+    with (
+        patch(
+            "src.services.paper_service.upsert_papers",
+            return_value=[fake_db_paper, other_db_paper],
+        ),
+        patch("src.services.paper_service.get_summaries_for_papers", return_value=[]),
+        patch(
+            "src.services.paper_service.summarize_papers",
+            return_value=["First", "Second"],
+        ) as mock_summarize,
+        patch("src.services.paper_service.create_summaries") as mock_create,
+        patch("src.services.paper_service.summary_connection") as mock_connection,
+    ):
+        result = await PaperService.get_or_create_summaries(
+            fake_db,
+            [fake_paper, other_paper],
+            KnowledgeLevel.GENERAL,
+            Summarizer.EXTRACTIVE_SUMMARIZER,
+        )
+    assert [s.summary for s in result] == ["First", "Second"]
+    mock_summarize.assert_awaited_once()
+    mock_connection.assert_not_called()
+    rows = mock_create.call_args.args[1]
+    assert [(row["paper_id"], row["summarizer"]) for row in rows] == [
+        (1, "extractive_summarizer"),
+        (2, "extractive_summarizer"),
+    ]
+
+
+async def test_get_or_create_summary_falls_back_to_closest_stored_level(
+    fake_db, fake_paper
+):
+    stored = {"general": "General summary", "undergraduate": "Undergraduate summary"}
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.PaperService.generate_summary_once",
+            side_effect=TimeoutError("model timed out"),
+        ),
+        patch("src.services.paper_service.get_summary_texts", return_value=stored),
+        patch(
+            "src.services.paper_service.settings.SUMMARY_FALLBACKS",
+            ["other_level", "abstract"],
+        ),
+        patch("src.services.paper_service.create_summary") as mock_create,
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.RESEARCHER
+        )
+    assert result.summary == "Undergraduate summary"
+    assert result.degraded == "other_level"
+    mock_create.assert_not_called()
+
+
+async def test_get_or_create_summary_falls_back_to_abstract(fake_db, fake_paper):
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.PaperService.generate_summary_once",
+            side_effect=CircuitOpenError("Circuit is open"),
+        ),
+        patch("src.services.paper_service.get_summary_texts", return_value={}),
+        patch(
+            "src.services.paper_service.settings.SUMMARY_FALLBACKS",
+            ["other_level", "abstract"],
+        ),
+    ):
+        result = await PaperService.get_or_create_summary(
+            fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+        )
+    assert result.summary == "Test abstract"
+    assert result.degraded == "abstract"
+
+
+async def test_get_or_create_summary_raises_without_fallbacks(fake_db, fake_paper):
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.PaperService.generate_summary_once",
+            side_effect=Overloaded("Summarizer overloaded", retry_after=10),
+        ),
+        patch("src.services.paper_service.settings.SUMMARY_FALLBACKS", []),
+    ):
+        with pytest.raises(Overloaded):
+            await PaperService.get_or_create_summary(
+                fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+            )
+
+
+async def test_get_or_create_summary_raises_failures_of_its_own(fake_db, fake_paper):
+    with (
+        patch("src.services.paper_service.get_summary", return_value=None),
+        patch(
+            "src.services.paper_service.PaperService.generate_summary_once",
+            side_effect=RuntimeError("connection pool exhausted"),
+        ),
+        patch(
+            "src.services.paper_service.settings.SUMMARY_FALLBACKS",
+            ["other_level", "abstract"],
+        ),
+        patch("src.services.paper_service.get_summary_texts") as mock_texts,
+    ):
+        with pytest.raises(RuntimeError, match="connection pool exhausted"):
+            await PaperService.get_or_create_summary(
+                fake_db, fake_db_paper, fake_paper, KnowledgeLevel.GENERAL
+            )
+    mock_texts.assert_not_called()
+
+
+async def test_stream_and_store_papers_stores_each_page(fake_paper):
+    other_paper = fake_paper.model_copy(update={"url": "http://arxiv.org/abs/9999"})
+
+    async def pages():
+        yield [fake_paper]
+        yield [other_paper]
+
+    with (
+        patch("src.services.paper_service.AsyncSessionLocal", fake_session),
+        patch(
+            "src.services.paper_service.PaperService.get_papers_and_store",
+            side_effect=lambda db, page: page,
+        ) as mock_store,
+    ):
+        papers = await collect(PaperService.stream_and_store_papers(pages()))
+    assert papers == [fake_paper, other_paper]
+    assert [call.args[1] for call in mock_store.call_args_list] == [
+        [fake_paper],
+        [other_paper],
+    ]
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from src.services.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    tasks = [asyncio.ensure_future(flights.do("key", work)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*tasks) == ["result"] * 10
+    assert calls == 1
+    assert len(flights) == 0
+
+
+async def test_errors_propagate_to_all_callers_and_are_not_cached():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def succeed():
+        return "ok"
+
+    assert await flights.do("key", succeed) == "ok"
+
+
+async def test_follower_takes_over_when_leader_is_cancelled():
+    flights = SingleFlight()
+    started = asyncio.Event()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await asyncio.sleep(0.01)
+        return calls
+
+    leader = asyncio.ensure_future(flights.do("key", work))
+    await started.wait()
+    follower = asyncio.ensure_future(flights.do("key", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == 2
@@ -0,0 +1,173 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.similarity.index import SimilarityIndex, build_index
+
+pytestmark = pytest.mark.anyio
+
+PAPERS = [
+    (1, "Graph neural networks", "Message passing over molecular graphs."),
+    (2, "Molecular graph networks", "Neural message passing predicts molecules."),
+    (3, "Protein folding", "Predicting protein structure from sequences."),
+    (4, "Galaxy surveys", "Redshift catalogues of distant galaxies."),
+]
+
+
+def make_session_factory(batches):
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+    return MagicMock(return_value=session), AsyncMock(side_effect=batches)
+
+
+def make_index(directory, max_catch_up=1000):
+    return SimilarityIndex(
+        str(directory), buckets=1024, query_terms=32, max_catch_up=max_catch_up
+    )
+
+
+@pytest.fixture(autouse=True)
+def few_papers_to_catch_up():
+    with (
+        patch("src.similarity.index.count_papers_after", return_value=1) as count,
+        patch("src.similarity.index.get_paper_ids_created_since", return_value=[]),
+    ):
+        yield count
+
+
+def test_related_ranks_similar_papers_and_excludes_the_paper(tmp_path):
+    index = make_index(tmp_path)
+    index.add(PAPERS)
+
+    related = index.related(PAPERS[0], k=2)
+
+    assert [paper_id for paper_id, _ in related] == [2]
+    assert related[0][1] > 0
+
+
+def test_related_keeps_the_k_best(tmp_path):
+    index = make_index(tmp_path)
+    index.add(PAPERS + [(5, "Graph networks", "Graph neural message passing.")])
+
+    related = index.related(PAPERS[0], k=1)
+
+    assert len(related) == 1
+    assert related[0][0] in (2, 5)
+
+
+def test_related_on_an_empty_index(tmp_path):
+    assert make_index(tmp_path).related(PAPERS[0], k=5) == []
+
+
+async def test_built_index_is_mapped_and_new_papers_caught_up(tmp_path):
+    session_factory, read = make_session_factory([PAPERS[:3], [], [PAPERS[3]], []])
+
+    with patch("src.similarity.index.get_paper_texts_after", read):
+        await build_index(session_factory, str(tmp_path), 1024)
+        index = make_index(tmp_path)
+        await index.refresh(session_factory)
+
+    assert len(index.base) == 3 and len(index.delta) == 1
+    # Catching up reads the papers stored after the build.
+    assert read.await_args_list[2].args[1] == 3
+    assert index.related(PAPERS[0], k=3)[0][0] == 2
+
+    fresh = make_index(tmp_path)
+    fresh.add(PAPERS)
+    assert index.related(PAPERS[3], k=3) == fresh.related(PAPERS[3], k=3)
+
+
+async def test_rebuilt_index_replaces_caught_up_papers(tmp_path):
+    session_factory, read = make_session_factory(
+        [PAPERS[:2], [], [PAPERS[2]], [], PAPERS[:3], [], []]
+    )
+
+    with patch("src.similarity.index.get_paper_texts_after", read):
+        await build_index(session_factory, str(tmp_path), 1024)
+        index = make_index(tmp_path)
+        await index.refresh(session_factory)
+        assert len(index.delta) == 1
+
+        await build_index(session_factory, str(tmp_path), 1024)
+        await index.refresh(session_factory)
+
+    assert len(index.base) == 3 and index.delta is None
+    assert index.last_paper_id == 3
+
+
+async def test_catch_up_rebuilds_the_delta_once(tmp_path):
+    session_factory, read = make_session_factory([PAPERS[:2], PAPERS[2:], []])
+    index = make_index(tmp_path)
+
+    with (
+        patch("src.similarity.index.get_paper_texts_after", read),
+        patch.object(index, "_rebuild_delta") as rebuild,
+    ):
+        await index.refresh(session_factory)
+
+    rebuild.assert_called_once()
+    assert index.last_paper_id == 4
+
+
+async def test_catch_up_is_refused_past_the_threshold(tmp_path, few_papers_to_catch_up):
+    few_papers_to_catch_up.return_value = 6
+    session_factory, read = make_session_factory([PAPERS, []])
+    index = make_index(tmp_path, max_catch_up=5)
+
+    with patch("src.similarity.index.get_paper_texts_after", read):
+        await index.refresh(session_factory)
+
+    read.assert_not_awaited()
+    assert index.delta is None
+
+
+async def test_papers_are_read_without_holding_the_lock(tmp_path):
+    index = make_index(tmp_path)
+    locked = []
+
+    async def read(db, after_id, limit):
+        locked.append(index._lock.locked())
+        return [PAPERS[0]] if after_id == 0 else []
+
+    session_factory, _ = make_session_factory([])
+    with patch("src.similarity.index.get_paper_texts_after", read):
+        await index.refresh(session_factory)
+
+    assert locked == [False, False]
+    assert index.delta.paper_ids.tolist() == [1]
+
+
+async def test_run_forever_keeps_refreshing_after_errors(tmp_path):
+    index = make_index(tmp_path)
+    index.refresh_seconds = 0
+    refresh = AsyncMock(
+        side_effect=[RuntimeError("database down"), None, asyncio.CancelledError()]
+    )
+    with patch.object(index, "refresh", refresh):
+        with pytest.raises(asyncio.CancelledError):
+            await index.run_forever(MagicMock())
+    assert refresh.await_count == 3
+
+
+async def test_papers_committed_behind_the_watermark_are_indexed(tmp_path):
+    session_factory, read = make_session_factory([[PAPERS[0], PAPERS[2]], [], []])
+    late = SimpleNamespace(id=2, title=PAPERS[1][1], abstract=PAPERS[1][2])
+    index = make_index(tmp_path)
+
+    with (
+        patch("src.similarity.index.get_paper_texts_after", read),
+        patch(
+            "src.similarity.index.get_paper_ids_created_since",
+            return_value=[1, 2, 3],
+        ) as recent,
+        patch("src.similarity.index.get_papers_by_ids", return_value=[late]) as get,
+    ):
+        await index.refresh(session_factory)
+        # Paper 2 commits after paper 3 was read.
+        await index.refresh(session_factory)
+
+    recent.assert_awaited_once()
+    assert recent.call_args.args[2] == 3
+    get.assert_awaited_once_with(session_factory.return_value, [2])
+    assert sorted(index.delta.paper_ids.tolist()) == [1, 2, 3]
@@ -0,0 +1,31 @@
+from src.similarity.minhash import BANDS, band_hashes, jaccard
+
+ABSTRACT = (
+    "We present a new method for training large language models with "
+    "reinforcement learning from human feedback, and report state of the art "
+    "results on summarization and dialogue benchmarks."
+)
+
+
+def test_near_identical_abstracts_share_bands():
+    revised = ABSTRACT.replace("report", "we report")
+    assert jaccard(ABSTRACT, revised) > 0.8
+    assert set(band_hashes(ABSTRACT)) & set(band_hashes(revised))
+
+
+def test_unrelated_abstracts_share_no_bands():
+    other = "Galaxy redshift surveys map the large scale structure of the universe."
+    assert jaccard(ABSTRACT, other) == 0
+    assert not set(band_hashes(ABSTRACT)) & set(band_hashes(other))
+
+
+def test_bands_are_stable_and_numbered():
+    bands = band_hashes(ABSTRACT)
+    assert bands == band_hashes(ABSTRACT)
+    assert [band >> 32 for band in bands] == list(range(BANDS))
+    assert max(bands) < 2**63
+
+
+def test_text_without_words_has_no_bands():
+    assert band_hashes(" ... ") == []
+    assert len(band_hashes("Short")) == BANDS
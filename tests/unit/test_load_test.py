@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.load_test import parse_args
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+
+@pytest.mark.parametrize(
+    "argv", [[], ["--database-url", "sqlite+aiosqlite:///load.db"]]
+)
+def test_load_test_requires_postgres(argv, monkeypatch):
+    monkeypatch.delenv("LOAD_TEST_DATABASE_URL", raising=False)
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("LOAD_TEST_DATABASE_URL"),
+    reason="needs an ephemeral Postgres database in LOAD_TEST_DATABASE_URL",
+)
+def test_load_test_smoke():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.load_test",
+            "--requests",
+            "20",
+            "--concurrency",
+            "4",
+            "--source-ms",
+            "1",
+            "--summarizer-ms",
+            "1",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    total = next(
+        line for line in result.stdout.splitlines() if line.startswith("total")
+    )
+    assert total.split()[2] == "0.0"  # no errors
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.metrics import observe_llm_call, observe_repository
+
+pytestmark = pytest.mark.anyio
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+async def test_observe_repository_records_duration():
+    @observe_repository
+    async def fake_repository_call():
+        return "row"
+
+    before = sample(
+        "db_repository_duration_seconds_count", function="fake_repository_call"
+    )
+    assert await fake_repository_call() == "row"
+    assert fake_repository_call.__name__ == "fake_repository_call"
+    after = sample(
+        "db_repository_duration_seconds_count", function="fake_repository_call"
+    )
+    assert after == before + 1
+
+
+async def test_observe_llm_call_counts_errors_and_releases_in_flight():
+    labels = {"summarizer": "fake_summarizer", "model": "fake-model"}
+    errors_before = sample("upstream_errors_total", upstream="fake_summarizer")
+    with pytest.raises(RuntimeError):
+        async with observe_llm_call(**labels):
+            assert sample("llm_calls_in_flight", **labels) == 1
+            raise RuntimeError("boom")
+    assert sample("llm_calls_in_flight", **labels) == 0
+    assert sample("llm_call_duration_seconds_count", **labels) == 1
+    assert (
+        sample("upstream_errors_total", upstream="fake_summarizer") == errors_before + 1
+    )
+
+
+def test_metrics_aggregate_across_processes(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    increment = (
+        "from src.metrics import PAPERS_STORED; "
+        "PAPERS_STORED.labels(outcome='inserted').inc(2)"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", increment], cwd=ROOT, env=env, check=True)
+
+    render = (
+        "from src.metrics import render_metrics; print(render_metrics()[0].decode())"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", render],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert 'papers_stored_total{outcome="inserted"} 4.0' in output
@@ -0,0 +1,295 @@
+import asyncio
+
+import pytest
+
+from src.resilience import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    Overloaded,
+    ResiliencePolicy,
+    request_budget,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def make_policy(**overrides):
+    options = {
+        "timeout_seconds": 1.0,
+        "max_attempts": 3,
+        "backoff_seconds": 0.001,
+        "backoff_max_seconds": 0.001,
+        "hedge": False,
+        "breaker": CircuitBreaker(failure_threshold=5, reset_seconds=60),
+    }
+    options.update(overrides)
+    return ResiliencePolicy("fake_upstream", **options)
+
+
+class FlakyUpstream:
+    """Fails the first `failures` calls, then answers after `delays` seconds."""
+
+    def __init__(self, failures=0, delays=(0,)):
+        self.failures = failures
+        self.delays = list(delays)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("upstream failure")
+        delay = self.delays[min(self.calls - 1, len(self.delays) - 1)]
+        await asyncio.sleep(delay)
+        return f"answer {self.calls}"
+
+
+async def test_retries_until_success():
+    upstream = FlakyUpstream(failures=2)
+    assert await make_policy().call(upstream) == "answer 3"
+    assert upstream.calls == 3
+
+
+async def test_gives_up_after_max_attempts():
+    upstream = FlakyUpstream(failures=5)
+    with pytest.raises(RuntimeError, match="upstream failure"):
+        await make_policy(max_attempts=2).call(upstream)
+    assert upstream.calls == 2
+
+
+async def test_does_not_retry_value_errors():
+    calls = []
+
+    async def invalid():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await make_policy().call(invalid)
+    assert len(calls) == 1
+
+
+async def test_value_errors_do_not_open_the_circuit():
+    async def invalid():
+        raise ValueError("bad request")
+
+    policy = make_policy(breaker=CircuitBreaker(failure_threshold=1, reset_seconds=60))
+    with pytest.raises(ValueError):
+        await policy.call(invalid)
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+    assert policy.breaker.failures == 0
+
+
+async def test_slow_attempts_time_out_as_deadline_exceeded():
+    upstream = FlakyUpstream(delays=(1.0,))
+    with pytest.raises(DeadlineExceeded):
+        await make_policy(timeout_seconds=0.01, max_attempts=2).call(upstream)
+    assert upstream.calls == 2
+
+
+async def test_request_budget_bounds_attempt_deadline():
+    upstream = FlakyUpstream(delays=(1.0,))
+    with request_budget(0.02):
+        with pytest.raises(DeadlineExceeded):
+            await make_policy(timeout_seconds=10, max_attempts=100).call(upstream)
+    # Retries stop once the budget is spent.
+    assert upstream.calls < 100
+
+
+async def test_hedges_slow_request_and_returns_first_answer():
+    policy = make_policy(hedge=True)
+    for _ in range(policy.latency.MIN_SAMPLES):
+        policy.latency.record(0.01)
+    # The first request stalls, the hedged one answers quickly.
+    upstream = FlakyUpstream(delays=(1.0, 0))
+
+    assert await policy.call(upstream) == "answer 2"
+    assert upstream.calls == 2
+
+
+async def test_circuit_opens_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    policy = make_policy(breaker=breaker, max_attempts=1)
+    upstream = FlakyUpstream(failures=10)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await policy.call(upstream)
+    with pytest.raises(CircuitOpenError):
+        await policy.call(upstream)
+    assert upstream.calls == 2
+
+
+async def test_circuit_closes_after_successful_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    policy = make_policy(breaker=breaker, max_attempts=1)
+
+    with pytest.raises(RuntimeError):
+        await policy.call(FlakyUpstream(failures=1))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert await policy.call(FlakyUpstream()) == "answer 1"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+def make_limiter(**overrides):
+    options = {
+        "initial_limit": 2,
+        "min_limit": 1,
+        "max_limit": 4,
+        "backoff": 0.5,
+        "latency_target_seconds": 1.0,
+        "max_queue": 10,
+        "max_wait_seconds": 1.0,
+    }
+    options.update(overrides)
+    return AdaptiveConcurrencyLimiter("fake_upstream", **options)
+
+
+async def hold_slots(limiter, count):
+    """Take `count` slots and return an event that releases them."""
+    release = asyncio.Event()
+    entered = asyncio.Event()
+    held = 0
+
+    async def hold():
+        nonlocal held
+        async with limiter.slot():
+            held += 1
+            if held == count:
+                entered.set()
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()) for _ in range(count)]
+    await entered.wait()
+    return release, tasks
+
+
+async def test_limiter_grows_additively_while_saturated_and_healthy():
+    limiter = make_limiter()
+    release, tasks = await hold_slots(limiter, 2)
+    release.set()
+    await asyncio.gather(*tasks)
+    # A healthy call adds 1 / limit when the limit was in use: the first
+    # release finds both slots taken, the second only its own.
+    assert limiter.limit == pytest.approx(2 + 1 / 2)
+
+
+async def test_limiter_does_not_grow_when_idle():
+    limiter = make_limiter()
+    async with limiter.slot():
+        pass
+    assert limiter.limit == 2
+
+
+async def test_limiter_cuts_once_per_burst_of_rate_limit_errors():
+    limiter = make_limiter(initial_limit=4)
+
+    async def rate_limited():
+        async with limiter.slot():
+            await asyncio.sleep(0)
+            raise RateLimited()
+
+    results = await asyncio.gather(
+        *(rate_limited() for _ in range(4)), return_exceptions=True
+    )
+    assert all(isinstance(result, RateLimited) for result in results)
+    # All four were in flight when the first error cut the limit.
+    assert limiter.limit == 2
+
+
+async def test_limiter_cuts_on_timeouts_but_not_on_other_errors():
+    limiter = make_limiter(initial_limit=4)
+    with pytest.raises(RuntimeError):
+        async with limiter.slot():
+            raise RuntimeError("bad response")
+    assert limiter.limit == 4
+
+    with pytest.raises(DeadlineExceeded):
+        async with limiter.slot():
+            raise DeadlineExceeded("no budget left")
+    assert limiter.limit == 4
+
+    with pytest.raises(asyncio.TimeoutError):
+        async with limiter.slot():
+            raise asyncio.TimeoutError()
+    assert limiter.limit == 2
+
+
+async def test_limiter_queues_callers_above_the_limit():
+    limiter = make_limiter(initial_limit=1)
+    release, tasks = await hold_slots(limiter, 1)
+
+    queued = asyncio.create_task(limiter.slot().__aenter__())
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 1 and len(limiter._waiters) == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    await queued
+    assert limiter.in_flight == 1 and not limiter._waiters
+
+
+async def test_limiter_sheds_when_the_queue_is_full_or_the_wait_too_long():
+    limiter = make_limiter(initial_limit=1, max_queue=1, max_wait_seconds=0.01)
+    release, tasks = await hold_slots(limiter, 1)
+
+    waiting = asyncio.create_task(limiter._acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(Overloaded, match="queue_full"):
+        await limiter._acquire()
+    with pytest.raises(Overloaded, match="timeout"):
+        await waiting
+
+    assert not limiter._waiters and limiter.in_flight == 1
+    release.set()
+    await asyncio.gather(*tasks)
+    assert limiter.in_flight == 0
+
+
+async def test_shed_calls_are_not_retried_or_counted_by_the_breaker():
+    limiter = make_limiter(initial_limit=1, max_queue=0)
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    policy = make_policy(breaker=breaker, limiter=limiter)
+    release, tasks = await hold_slots(limiter, 1)
+
+    upstream = FlakyUpstream()
+    with pytest.raises(Overloaded):
+        await policy.call(upstream)
+    assert upstream.calls == 0
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+async def test_running_out_of_budget_leaves_breaker_and_limiter_unchanged(
+    monkeypatch,
+):
+    limiter = make_limiter(initial_limit=2)
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    policy = make_policy(breaker=breaker, limiter=limiter)
+
+    # The budget runs out by the time a slot is taken.
+    budgets = iter([1.0, 0.0])
+    monkeypatch.setattr("src.resilience.remaining_budget", lambda: next(budgets))
+    upstream = FlakyUpstream()
+    with pytest.raises(DeadlineExceeded):
+        await policy.call(upstream)
+    assert upstream.calls == 0
+    monkeypatch.undo()
+
+    # Or inside the attempt, e.g. while waiting for an upstream token.
+    async def out_of_budget():
+        raise DeadlineExceeded("no budget left")
+
+    with pytest.raises(DeadlineExceeded):
+        await policy.call(out_of_budget)
+
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+    assert limiter.limit == 2 and limiter.in_flight == 0
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import pytest
+
+from src.tracing import (
+    InMemorySpanExporter,
+    JsonLinesSpanExporter,
+    Tracer,
+    current_trace_id,
+    traced,
+    tracer,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    return exporter
+
+
+@traced
+async def fake_service_call():
+    return await asyncio.to_thread(fake_blocking_fetch)
+
+
+@traced
+def fake_blocking_fetch():
+    return current_trace_id()
+
+
+async def test_spans_nest_across_layers_and_threads(exporter):
+    with tracer.span("routes.fake", trace_id="request-1"):
+        assert await fake_service_call() == "request-1"
+
+    fetch, service, route = exporter.spans
+    assert [span.name for span in exporter.spans] == [
+        "test_tracing.fake_blocking_fetch",
+        "test_tracing.fake_service_call",
+        "routes.fake",
+    ]
+    assert {span.trace_id for span in exporter.spans} == {"request-1"}
+    assert route.parent_id is None
+    assert service.parent_id == route.span_id
+    assert fetch.parent_id == service.span_id
+
+
+async def test_span_records_error(exporter):
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("bad input")
+    assert exporter.spans[0].error == "ValueError: bad input"
+
+
+async def test_unsampled_trace_records_nothing(exporter, monkeypatch):
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+    with tracer.span("routes.fake") as span:
+        assert span is None
+        assert await fake_service_call() is None
+    assert exporter.spans == []
+
+
+def test_tracer_without_exporter_is_disabled():
+    disabled = Tracer(None, sample_rate=1.0)
+    with disabled.span("anything") as span:
+        assert span is None
+
+
+def test_json_lines_exporter_writes_one_span_per_line(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    file_tracer = Tracer(JsonLinesSpanExporter(str(path)), sample_rate=1.0)
+    with file_tracer.span("parent", trace_id="t1", topic="AI"):
+        with file_tracer.span("child"):
+            pass
+    file_tracer.exporter.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["child", "parent"]
+    assert lines[1]["attributes"] == {"topic": "AI"}
+    assert lines[0]["parent_id"] == lines[1]["span_id"]